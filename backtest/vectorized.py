@@ -0,0 +1,354 @@
+"""
+Vectorized bar-level backtest of the rule-based strategy (research / screening).
+Every indicator and decision column of the live loop is computed for the whole history
+at once with NumPy, bar for bar as main.py evaluates them on each strategy bar:
+ContextEngine, DecayEngine, VolatilityEngine, VWAP (session VWAP when volume is given,
+else the 20-bar price mean), the metrics layer (leading / lagging / PDR / combined score),
+rule_based_decision and the step-1 confidence gate (VIX regime + opening penalty).
+Lookbacks restart each session, like a fresh process each morning.
+
+Exits follow PositionManager's spot levels: SL = entry -/+ stop, target = 1.5R, trailing
+SL at 1% from the best close, evaluated on bar closes, flat at the session's last bar.
+Exit paths for all candidate entries are computed as (entries x horizon) arrays. Only the
+one-position-at-a-time / daily-limit selection walks the candidate list.
+PnL is spot points x qty x pnl_delta (option premium ~ delta x spot move).
+
+Usage: python -m backtest.vectorized bars.csv   (columns: ts, close[, vix, volume])
+"""
+import sys
+from datetime import datetime
+import numpy as np
+from config.settings import (
+    LOT_SIZE,
+    MAX_TRADES,
+    MAX_DAILY_LOSS,
+    VIX_ULTRA_LOW,
+    VIX_NORMAL_LOW,
+    VIX_SPIKING,
+    CONFIDENCE_ULTRA_LOW,
+    CONFIDENCE_NORMAL_LOW,
+    CONFIDENCE_SPIKING,
+    CONFIDENCE_PANIC,
+    OPENING_VOLATILITY_THRESHOLD_PCT,
+    MARKET_OPEN_HOUR,
+    MARKET_OPEN_MINUTE,
+    MARKET_CLOSE_HOUR,
+    MARKET_CLOSE_MINUTE,
+)
+from engines.contextual_risk import IST
+
+# Column codes (strings in the live engines)
+HOLD, TRADE_CE, TRADE_PE = 0, 1, 2
+WAIT, RANGE, UPTREND, DOWNTREND = 0, 1, 2, 3
+UNKNOWN, WEAK, SUPPORTIVE = 0, 1, 2
+
+PDR_WINDOW_SEC = 300
+EXIT_CHUNK = 4096  # candidate entries per exit-path block
+
+
+def _lag(x, k):
+    """x shifted k bars back (NaN-free: the first k values repeat x[0])."""
+    out = np.empty_like(x)
+    out[k:] = x[:-k]
+    out[:k] = x[0]
+    return out
+
+
+def _rolling_sum(x, k):
+    c = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    out = np.zeros(len(x))
+    out[k - 1:] = c[k:] - c[:-k]
+    return out
+
+
+def sessions(ts):
+    """(session id per bar, bar index within its session, IST minute of day)."""
+    local = ts + datetime.fromtimestamp(ts[0], IST).utcoffset().total_seconds()
+    day = np.floor(local / 86400)
+    new = np.concatenate(([True], day[1:] != day[:-1]))
+    sid = np.cumsum(new) - 1
+    k = np.arange(len(ts)) - np.flatnonzero(new)[sid]
+    minute = (local % 86400) // 60
+    return sid, k, minute
+
+
+def compute_signals(
+    ts,
+    close,
+    vix=None,
+    volume=None,
+    participation=None,
+    option_ltp=None,
+    lms=5.0,
+    ivs=7.5,
+    decision_every_sec=None,
+):
+    """
+    All indicator and decision columns for bars (ts, close). Returns dict of arrays.
+    participation: scalar or array of breadth 0-1; None (unknown) blocks entries, as in
+        rule_based_decision.
+    option_ltp: premium series for the PDR penalty (0 penalty when None).
+    decision_every_sec: decide only on bars on this clock grid (None = every bar).
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    c = np.asarray(close, dtype=np.float64)
+    n = len(c)
+    sid, k, minute = sessions(ts)
+    length = k + 1  # len(prices) in the live loop
+
+    # ContextEngine: 20-bar move, 30 bars of history
+    move = c - _lag(c, 19)
+    context = np.select([length < 30, move > 40, move < -40], [WAIT, UPTREND, DOWNTREND], RANGE)
+    # DecayEngine: 5-bar impulse > 20
+    impulse = np.abs(c - _lag(c, 4))
+    decay_ok = (length >= 10) & (impulse > 20)
+    volume_impulse = np.where(length >= 5, impulse, 0.0)
+
+    # VolatilityEngine: VIX up vs previous pass
+    if vix is None:
+        v = np.full(n, np.nan)
+        vol_status = np.full(n, UNKNOWN)
+    else:
+        v = np.asarray(vix, dtype=np.float64)
+        vol_status = np.where(v > _lag(v, 1), SUPPORTIVE, WEAK)
+        vol_status[0] = UNKNOWN
+
+    # VWAP: session VWAP with volume, else 20-bar mean (StructureEngine fallback)
+    if volume is not None:
+        vol = np.asarray(volume, dtype=np.float64)
+        pv = np.cumsum(c * vol)
+        cv = np.cumsum(vol)
+        starts = np.flatnonzero(k == 0)
+        pv_base = np.concatenate(([0.0], pv))[starts][sid]
+        cv_base = np.concatenate(([0.0], cv))[starts][sid]
+        sess_cv = cv - cv_base
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(sess_cv > 0, (pv - pv_base) / sess_cv, c)
+    else:
+        vwap = np.where(length > 20, _rolling_sum(c, 20) / 20, c)
+    bull = c > vwap
+    bear = c < vwap
+
+    # Metrics layer
+    part = np.broadcast_to(np.asarray(np.nan if participation is None else participation, dtype=np.float64), (n,))
+    part_pts = np.where(np.isnan(part), 7.5, np.minimum(15, part * 15))
+    # VIX momentum: SUPPORTIVE (10) when VIX rose since the previous bar, as vol_status
+    vix_pts = np.where(vol_status == SUPPORTIVE, 10, 5)
+    vol_pts = np.minimum(10, volume_impulse * 0.1)
+    lead = part_pts + vix_pts + vol_pts + np.minimum(15, ivs) + np.minimum(10, lms) + np.where(bull, 5, 0)
+
+    d = np.diff(c, prepend=c[0])
+    gains = _rolling_sum(np.maximum(d, 0), 14) / 14
+    losses = _rolling_sum(np.maximum(-d, 0), 14) / 14
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+    rsi = np.where(length >= 15, rsi, 50.0)
+    ma_bull = (length >= 21) & (_rolling_sum(c, 9) / 9 > _rolling_sum(c, 21) / 21)
+    prev = _lag(c, 1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = np.where(prev > 0, (c - prev) / prev, 0.0)
+    mean_r = _rolling_sum(r, 20) / 20
+    var = np.maximum(_rolling_sum(r * r, 20) / 20 - mean_r * mean_r, 0)
+    hv = np.where(length >= 21, np.sqrt(var * 252) * 100, 0.0)
+    lag_pts = np.where((rsi >= 40) & (rsi <= 70), 12, 6) + np.where(ma_bull, 12, 0) + np.minimum(11, hv)
+
+    if option_ltp is None:
+        pdr = np.zeros(n)
+    else:
+        o = np.asarray(option_ltp, dtype=np.float64)
+        first = np.searchsorted(ts, ts - PDR_WINDOW_SEC, "left")
+        old = o[first]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            drop = np.where(old > 0, (old - o) / old, 0.0)
+        pdr = -np.minimum(10, np.trunc(drop * 25))
+        pdr = np.where(first < np.arange(n), pdr, 0)
+
+    score = (np.minimum(65, lead) / 65 * 0.65 + np.minimum(35, lag_pts) / 35 * 0.35) * 100 + pdr
+
+    # rule_based_decision
+    supportive = vol_status == SUPPORTIVE
+    ce = (context == UPTREND) & (part > 0.6) & supportive & decay_ok & bull
+    pe = (context == DOWNTREND) & (part < 0.4) & supportive & decay_ok & bear
+    blocked = (pdr <= -5) | (score < 30)
+    action = np.select([blocked, ce, pe], [HOLD, TRADE_CE, TRADE_PE], HOLD)
+    confidence = np.select([pdr <= -5, action != HOLD], [45, 72], 50)
+
+    # Step 1 gate: VIX regime threshold + opening-volatility penalty; market hours
+    open_min = MARKET_OPEN_HOUR * 60 + MARKET_OPEN_MINUTE
+    close_min = MARKET_CLOSE_HOUR * 60 + MARKET_CLOSE_MINUTE
+    threshold = np.select(
+        [np.isnan(v), v <= VIX_ULTRA_LOW, v <= VIX_NORMAL_LOW, v <= VIX_SPIKING],
+        [CONFIDENCE_NORMAL_LOW, CONFIDENCE_ULTRA_LOW, CONFIDENCE_NORMAL_LOW, CONFIDENCE_SPIKING],
+        CONFIDENCE_PANIC,
+    )
+    opening = (minute >= open_min) & (minute <= open_min + 30)
+    threshold = threshold + np.where(opening, OPENING_VOLATILITY_THRESHOLD_PCT, 0)
+    in_hours = (minute >= open_min) & (minute <= close_min)
+    tradeable = (action != HOLD) & (confidence >= threshold) & in_hours
+    if decision_every_sec:
+        step = np.diff(ts, prepend=ts[0] - decision_every_sec)
+        tradeable &= (ts % decision_every_sec) < np.maximum(step, 1e-9)
+
+    return {
+        "ts": ts,
+        "close": c,
+        "session": sid,
+        "context": context,
+        "decay_ok": decay_ok,
+        "vol_status": vol_status,
+        "vwap": vwap,
+        "bull": bull,
+        "bear": bear,
+        "rsi": rsi,
+        "ma_bull": ma_bull,
+        "hv": hv,
+        "leading": lead,
+        "lagging": lag_pts,
+        "pdr": pdr,
+        "score": score,
+        "action": action,
+        "confidence": confidence,
+        "threshold": threshold,
+        "tradeable": tradeable,
+        "momentum": impulse,
+    }
+
+
+def exit_paths(close, session, entries, side, stop, target_ratio=1.5, max_hold_bars=375):
+    """
+    Exit bar and reason for every candidate entry at once.
+    side: +1 long (CE) / -1 short (PE). Returns (exit_idx, reason) with reason
+    0 = session end / horizon, 1 = stop, 2 = trailing stop, 3 = target.
+    """
+    n = len(close)
+    exit_idx = np.empty(len(entries), dtype=np.int64)
+    reason = np.empty(len(entries), dtype=np.int8)
+    offsets = np.arange(1, max_hold_bars + 1)
+    for lo in range(0, len(entries), EXIT_CHUNK):
+        e = entries[lo:lo + EXIT_CHUNK]
+        s = side[lo:lo + EXIT_CHUNK, None]
+        entry = close[e][:, None]
+        dist = stop[lo:lo + EXIT_CHUNK, None]
+        idx = np.minimum(e[:, None] + offsets, n - 1)
+        valid = (e[:, None] + offsets < n) & (session[idx] == session[e][:, None])
+        path = close[idx]
+        # Direction-normalised: long view of a short is the negated price
+        p = path * s
+        best = np.maximum.accumulate(np.where(valid, p, -np.inf), axis=1)
+        sl0 = entry * s - dist
+        trail = np.where(s > 0, 0.99, 1.01) * best  # PositionManager.trail: 1% from the best close
+        sl = np.maximum(sl0, trail)
+        stop_hit = valid & (p <= sl)
+        target_hit = valid & (p >= entry * s + dist * target_ratio)
+        hit = stop_hit | target_hit
+        any_hit = hit.any(axis=1)
+        first = np.argmax(hit, axis=1)
+        last_valid = valid.sum(axis=1) - 1
+        k = np.where(any_hit, first, np.maximum(last_valid, 0))
+        rows = np.arange(len(e))
+        exit_idx[lo:lo + EXIT_CHUNK] = np.where(last_valid >= 0, idx[rows, k], e)
+        trailed = sl[rows, k] > sl0[:, 0]
+        reason[lo:lo + EXIT_CHUNK] = np.select(
+            [~any_hit, target_hit[rows, k], trailed], [0, 3, 2], 1
+        )
+    return exit_idx, reason
+
+
+def run_backtest(
+    bars,
+    capital=200000,
+    risk_pct=0.01,
+    lot_size=LOT_SIZE,
+    target_ratio=1.5,
+    max_hold_bars=375,
+    max_trades_per_day=MAX_TRADES,
+    max_daily_loss=MAX_DAILY_LOSS,
+    pnl_delta=0.5,
+    **signal_kwargs,
+):
+    """
+    bars: DataFrame or dict with ts (epoch sec), close and optional vix, volume,
+    participation, option_ltp columns. Returns {"signals", "trades", "equity",
+    "drawdown", "summary"}.
+    """
+    cols = {name: np.asarray(bars[name]) for name in ("vix", "volume", "participation", "option_ltp") if name in bars}
+    if "participation" in cols:
+        signal_kwargs["participation"] = cols.pop("participation")
+    sig = compute_signals(bars["ts"], bars["close"], **cols, **signal_kwargs)
+    close, session = sig["close"], sig["session"]
+
+    cand = np.flatnonzero(sig["tradeable"])
+    side = np.where(sig["action"][cand] == TRADE_CE, 1, -1)
+    stop = np.maximum(30, sig["momentum"][cand] * 0.5)  # main.py: stop_distance
+    exit_idx, reason = exit_paths(close, session, cand, side, stop, target_ratio, max_hold_bars)
+    qty = np.maximum((capital * risk_pct / stop // lot_size) * lot_size, lot_size)  # PositionSizer
+    points = (close[exit_idx] - close[cand]) * side
+    pnl = points * qty * pnl_delta
+
+    # One position at a time, per-session trade count and daily loss stop
+    take = np.zeros(len(cand), dtype=bool)
+    busy_until = -1
+    day, day_trades, day_pnl = -1, 0, 0.0
+    for i, t in enumerate(cand):
+        if t <= busy_until:
+            continue
+        if session[t] != day:
+            day, day_trades, day_pnl = session[t], 0, 0.0
+        if day_trades >= max_trades_per_day or day_pnl <= -max_daily_loss:
+            continue
+        take[i] = True
+        busy_until = exit_idx[i]
+        day_trades += 1
+        day_pnl += pnl[i]
+
+    trades = {
+        "entry_idx": cand[take],
+        "exit_idx": exit_idx[take],
+        "entry_ts": sig["ts"][cand[take]],
+        "exit_ts": sig["ts"][exit_idx[take]],
+        "side": np.where(side[take] > 0, "CE", "PE"),
+        "entry": close[cand[take]],
+        "exit": close[exit_idx[take]],
+        "qty": qty[take],
+        "points": points[take],
+        "pnl": pnl[take],
+        "reason": np.array(["eod", "sl", "trail", "target"])[reason[take]],
+    }
+    realized = np.zeros(len(close))
+    np.add.at(realized, trades["exit_idx"], trades["pnl"])
+    equity = capital + np.cumsum(realized)
+    drawdown = equity - np.maximum.accumulate(equity)
+    wins = trades["pnl"] > 0
+    gross_loss = -trades["pnl"][~wins].sum()
+    summary = {
+        "bars": len(close),
+        "sessions": int(session[-1] + 1) if len(close) else 0,
+        "signals": int(len(cand)),
+        "trades": int(take.sum()),
+        "win_rate": float(wins.mean()) if take.any() else 0.0,
+        "total_pnl": float(trades["pnl"].sum()),
+        "avg_pnl": float(trades["pnl"].mean()) if take.any() else 0.0,
+        "profit_factor": float(trades["pnl"][wins].sum() / gross_loss) if gross_loss > 0 else None,
+        "max_drawdown": float(drawdown.min()) if len(close) else 0.0,
+        "final_equity": float(equity[-1]) if len(close) else float(capital),
+    }
+    return {"signals": sig, "trades": trades, "equity": equity, "drawdown": drawdown, "summary": summary}
+
+
+def load_csv(path):
+    """Bars from CSV: ts as epoch seconds or a datetime string (IST if naive)."""
+    import pandas as pd
+
+    frame = pd.read_csv(path)
+    if not np.issubdtype(frame["ts"].dtype, np.number):
+        stamps = pd.to_datetime(frame["ts"])
+        if stamps.dt.tz is None:
+            stamps = stamps.dt.tz_localize(IST)
+        frame["ts"] = stamps.astype("int64") / 1e9
+    return frame
+
+
+if __name__ == "__main__":
+    result = run_backtest(load_csv(sys.argv[1]))
+    for key, value in result["summary"].items():
+        print(f"{key}: {value}")
@@ -4,6 +4,12 @@ INDEX = "NIFTY"
 # Dynamic risk (per spec)
 BASE_RISK = 0.01
 TRAIL_FACTOR = 0.5
+# Tick-level exits: a failed exit SELL is retried, then the position is re-armed
+EXIT_ORDER_ATTEMPTS = 3
+EXIT_RETRY_DELAY_SEC = 0.2
+# ... and its fill is confirmed: polled this often, remainder cancelled after EXIT_FILL_WAIT_SEC
+EXIT_FILL_POLL_SEC = 0.25
+EXIT_FILL_WAIT_SEC = 5
 DECAY_THRESHOLD = 0.6
 PARTICIPATION_STRONG = 0.65
 
@@ -31,14 +37,47 @@ DECISION_INTERVAL_HIGH_VOL = 90
 DECISION_INTERVAL_LOW_VOL = 240
 OPENING_VOLATILITY_THRESHOLD_PCT = 10  # +10% threshold penalty in opening
 
+# Decision service (engines/decision_service.py): providers run off the strategy loop.
+# DECISION_PROVIDER: "rule_based" or "stub" (configurable-latency test provider).
+DECISION_PROVIDER = "rule_based"
+DECISION_WORKERS = 2
+DECISION_DEADLINE_SEC = 5  # hard deadline; HOLD / CONFIDENCE_FALLBACK on timeout
+DECISION_CACHE_TTL_SEC = 60  # reuse a decision for the same quantized market context
+DECISION_CACHE_SIZE = 256
+DECISION_STUB_LATENCY_SEC = 1.5
+
 # Strike alignment (per spec: Delta >= 0.25, IV <= 25%)
 STRIKE_DELTA_MIN = 0.25
 STRIKE_IV_MAX_PCT = 25
 
+# Option chain basket (subscribed in SNAP_QUOTE) and Black-Scholes Greeks
+STRIKE_STEP = 50
+CHAIN_STRIKES_EACH_SIDE = 10  # ATM +- N strikes, CE and PE
+CHAIN_RECENTER_STRIKES = 3  # re-resolve the basket around ATM once ATM is this close to its edge
+RISK_FREE_RATE = 0.065
+GREEKS_SPOT_EPS = 0.05  # recompute a contract when spot moves more than this
+GREEKS_TTE_BUCKET_SEC = 60  # ...or when time to expiry crosses a bucket
+
+# Strike optimizer (StrikeEngine.rank): target |delta| by gamma mode, then cost weights.
+STRIKE_TARGET_DELTA_ATM = 0.5  # high-gamma (ATM) mode
+STRIKE_TARGET_DELTA_ITM = 0.6  # normal mode (ITM bias)
+STRIKE_MAX_PREMIUM_PCT = 0.25  # premium per lot must fit in this share of capital
+STRIKE_FALLBACKS = 2  # next-ranked contracts tried after a step-2 or order rejection
+STRIKE_W_DELTA = 10.0  # per 1.0 of |delta| error
+STRIKE_W_SPREAD = 1.0  # per 1% bid/ask spread (relative to mid)
+STRIKE_W_DEPTH = 2.0  # times 1 / (1 + resting lots on 5 levels)
+STRIKE_W_IV = 5.0  # per 1.0 (100 vol points) of IV
+
 # Circuit breaker
 MAX_TRADES = 1000
 MAX_DAILY_LOSS = 300000
 MIN_WIN_RATE_PCT = 40  # block if historical win rate in current conditions < 40%
+MAX_DRAWDOWN = 150000  # intraday equity drawdown from the high-water mark
+MAX_SIDE_EXPOSURE = 150000  # open premium notional per side (CE / PE)
+MAX_INSTRUMENT_NOTIONAL = 100000  # open premium notional per contract
+RISK_CAPITAL = 200000  # starting equity for the intraday curve (same as the sizer)
+RISK_CURVE_POINTS = 100000  # equity-curve samples kept (one per fill / mark)
+RISK_LATENCY_BUDGET_US = 5  # allow() / circuit_breaker_breached() p99 target (tools.bench_risk)
 
 # Angel One credentials (replace with env vars in production)
 API_KEY = "CPV4voXH"
@@ -52,5 +91,219 @@ LOT_SIZE = 65
 # When True: main.py places real orders via OrderManager (option symbol/token resolved from strike).
 LIVE_TRADING = False
 
+# Client accounts driven by this strategy instance (execution/account_fanout.py). Each
+# gets its own session, ApiGateway, PositionSizer capital, RiskGovernor, positions and
+# write-ahead log; the first one also serves the market feed and data lookups.
+# capital: sizer capital and risk equity. risk: RiskGovernor overrides (max_trades,
+# max_daily_loss, max_drawdown, max_side_exposure, max_instrument_notional).
+ACCOUNTS = [
+    {
+        "name": "primary",
+        "api_key": API_KEY,
+        "client_id": CLIENT_ID,
+        "password": PASSWORD,
+        "totp_secret": TOTP_SECRET,
+        "capital": 200000,
+        "risk": {},
+    },
+]
+FANOUT_WORKERS = 8  # concurrent order sends across accounts
+FANOUT_FILL_WAIT_SEC = 5  # poll live order status this long for the fill latency
+FANOUT_FILL_POLL_SEC = 0.25
+LATENCY_SAMPLES = 1024  # most recent samples kept per latency / skew series (exit trigger, fan-out ack / fill)
+
+# Paper exchange simulator (LIVE_TRADING = False): market orders fill against cached depth
+PAPER_LATENCY_MS = 25  # order-to-match latency (fill uses the depth snapshot at that time)
+PAPER_LATENCY_JITTER_MS = 15  # + uniform(0, jitter)
+PAPER_SLIPPAGE_TICKS = 1  # adverse ticks added to every fill level
+PAPER_TICK_SIZE = 0.05
+PAPER_ORDERS_KEPT = 10000  # settled paper orders kept for order_status (oldest dropped; open orders always kept)
+
+# WebSocket reconnect supervisor: exponential backoff between attempts (seconds).
+# RECONNECT_MAX_ATTEMPTS = None retries forever.
+RECONNECT_BASE_DELAY_SEC = 1
+RECONNECT_MAX_DELAY_SEC = 60
+RECONNECT_MAX_ATTEMPTS = None
+
+# Gap backfill after reconnect (getCandleData). Index candle tokens differ from WS tokens.
+SPOT_CANDLE_TOKEN = "99926000"  # Nifty 50 index
+VIX_CANDLE_TOKEN = "99926017"  # India VIX
+BACKFILL_CANDLE_INTERVAL = "ONE_MINUTE"
+# Backfill runs off the WS thread; its merge is handed to the feed thread (next tick), or
+# done by the backfill thread itself when no tick arrives within this many seconds.
+BACKFILL_MERGE_WAIT_SEC = 2
+
+# Tick-to-bar aggregation (clock-aligned OHLCV). Strategy runs on each STRATEGY_BAR_SEC close;
+# engine thresholds (e.g. 20-bar momentum > 40) were tuned on ~1s samples.
+BAR_TIMEFRAMES_SEC = (1, 60, 180, 300)
+BAR_HISTORY = 600  # bars kept per token/timeframe
+BAR_MAX_FILL = 600  # cap on flat bars forward-filled across a gap
+STRATEGY_BAR_SEC = 1
+
+# VWAP (engines/vwap.py): the index has no volume, so VWAP runs on the near-month
+# futures contract subscribed in QUOTE mode. VWAP_TOKEN = None resolves it via searchScrip.
+VWAP_TOKEN = None
+FUTURES_EXPIRY_DDMMMYY = None  # None = last Thursday of the current month
+VWAP_ROLLING_SEC = 900  # rolling VWAP window
+VWAP_BAND_STDDEV = 1.0  # band width in volume-weighted standard deviations
+
+# Market depth (SNAP_QUOTE 5 levels) history per token, and LMS windows
+DEPTH_HISTORY = 1200  # snapshots kept per token
+DEPTH_MAX_TOKENS = 64  # option tokens tracked (basket size)
+LMS_WINDOW_SEC = 300  # LMS lookback (per spec: 5 min)
+LMS_SHORT_SEC = 60  # recent sub-window compared against the rest of the lookback
+LMS_LIQUIDITY_GAIN = 25  # score points per 100% change in resting liquidity
+LMS_IMBALANCE_GAIN = 10  # score points per unit change in bid/ask imbalance
+
+# Feed health (data/cache/feed_health.py): per-token tick rate and staleness gate
+FEED_MAX_TOKENS = 128
+FEED_STALE_SEC = 5  # spot / VIX / futures: no tick for this long = stale
+FEED_OPTION_STALE_SEC = 30  # option contracts tick less often
+FEED_RATE_TAU_SEC = 10  # EWMA time constant for ticks/sec
+
+# Multi-process feed (data/angel/ingest_process.py): a forked ingest process owns the
+# WebSocket and publishes ticks to a shared-memory ring; False = single process.
+INGEST_PROCESS = False
+TICK_RING_CAPACITY = 65536  # records (~350 B each)
+INGEST_POLL_SEC = 0.0005  # reader sleep when the ring is empty
+
+# Structured event log (ops/event_log.py): JSON lines in logs/YYYY-MM-DD/events.jsonl
+EVENT_LOG_DIR = "logs"
+EVENT_LOG_CONSOLE = True  # also echo to stdout (from the writer thread, never the hot path)
+EVENT_LOG_REPEAT_SEC = 5  # min gap between identical WARNING/ERROR messages
+EVENT_LOG_QUEUE_MAX = 100000
+EVENT_LOG_FLUSH_SEC = 0.05
+EVENT_LOG_THROTTLE_KEYS = 4096  # (event, message) pairs tracked for rate limiting; oldest half pruned beyond this
+
+# Decision journal (ops/decision_journal.py): one line per strategy pass in
+# logs/YYYY-MM-DD/decisions.jsonl; `python -m tools.replay_journal` diffs a replay
+DECISION_JOURNAL = True
+DECISION_JOURNAL_BATCH = 32  # lines per write
+DECISION_JOURNAL_FLUSH_SEC = 10
+DECISION_JOURNAL_QUEUE_MAX = 10000
+
+# Write-ahead log (ops/wal.py): position enter/trail/exit, fills, trade count and PnL
+# overrides in logs/YYYY-MM-DD/state.wal, replayed into PositionManager/RiskGovernor at startup
+WAL_ENABLED = True
+WAL_FILE = "state.wal"
+WAL_GROUP_COMMIT_MS = 5  # records queued within this window share one write + fsync
+WAL_RETRY_SEC = 0.5  # a failed write + fsync is retried (same batch, in order) after this
+
+# Tick history: raw ticks to logs/YYYY-MM-DD/ticks.bin, compacted after the close into
+# a partitioned columnar store (data/store/tick_store.py; `python -m tools.compact_ticks`)
+TICK_RECORD = True
+TICK_RECORD_CHUNK = 4096  # records per write
+TICK_RECORD_FLUSH_SEC = 5
+TICK_STORE_DIR = "store/ticks"
+TICK_COMPACT_AT = "15:35"  # HH:MM IST; main.py compacts the day once after this
+
+# Runtime profiler (ops/profiler.py): `kill -USR1 <pid>` or create PROFILE_CONTROL_FILE
+PROFILE_MODE = "cprofile"  # or "sample" (stack sampler, folded stacks)
+PROFILE_DURATION_SEC = 30
+PROFILE_SAMPLE_MS = 5
+PROFILE_CONTROL_FILE = "logs/profile.request"  # None = signal trigger only
+PROFILE_CONTROL_POLL_SEC = 1
+PROFILE_TRACEMALLOC_FRAMES = 10
+PROFILE_TOP_N = 40
+
 # Option expiry for NFO (DDMMMYY e.g. "20FEB25"). If None, next Thursday is used.
 OPTION_EXPIRY_DDMMMYY = None
+
+# Index breadth (engines/breadth.py): constituents in QUOTE mode (nse_cm), weighted
+# advance/decline and % change vs previous close -> participation score 0-1.
+# (symbol, nse_cm token, index weight %); weights are normalized, refresh on rebalance.
+BREADTH_CONSTITUENTS = {
+    "NIFTY": [
+        ("HDFCBANK", "1333", 11.5), ("RELIANCE", "2885", 9.9), ("ICICIBANK", "4963", 7.8),
+        ("INFY", "1594", 5.9), ("ITC", "1660", 4.2), ("LT", "11483", 4.0),
+        ("TCS", "11536", 3.9), ("BHARTIARTL", "10604", 3.6), ("AXISBANK", "5900", 3.2),
+        ("SBIN", "3045", 2.9), ("KOTAKBANK", "1922", 2.6), ("M&M", "2031", 2.1),
+        ("HINDUNILVR", "1394", 2.1), ("BAJFINANCE", "317", 2.0), ("TATAMOTORS", "3456", 1.8),
+        ("NTPC", "11630", 1.7), ("SUNPHARMA", "3351", 1.7), ("MARUTI", "10999", 1.6),
+        ("HCLTECH", "7229", 1.6), ("POWERGRID", "14977", 1.4), ("TITAN", "3506", 1.4),
+        ("ASIANPAINT", "236", 1.3), ("TATASTEEL", "3499", 1.2), ("ULTRACEMCO", "11532", 1.2),
+        ("ONGC", "2475", 1.0), ("ADANIPORTS", "15083", 1.0), ("COALINDIA", "20374", 1.0),
+        ("BAJAJFINSV", "16675", 0.9), ("INDUSINDBK", "5258", 0.9), ("NESTLEIND", "17963", 0.9),
+        ("JSWSTEEL", "11723", 0.9), ("TECHM", "13538", 0.9), ("GRASIM", "1232", 0.9),
+        ("HINDALCO", "1363", 0.9), ("CIPLA", "694", 0.8), ("ADANIENT", "25", 0.8),
+        ("BAJAJ-AUTO", "16669", 0.8), ("WIPRO", "3787", 0.7), ("DRREDDY", "881", 0.7),
+        ("SBILIFE", "21808", 0.7), ("HDFCLIFE", "467", 0.6), ("BRITANNIA", "547", 0.6),
+        ("EICHERMOT", "910", 0.6), ("APOLLOHOSP", "157", 0.6), ("TATACONSUM", "3432", 0.6),
+        ("HEROMOTOCO", "1348", 0.6), ("SHRIRAMFIN", "4306", 0.6), ("BPCL", "526", 0.6),
+        ("DIVISLAB", "10940", 0.5), ("LTIM", "17818", 0.5),
+    ],
+    "BANKNIFTY": [
+        ("HDFCBANK", "1333", 28.0), ("ICICIBANK", "4963", 24.0), ("SBIN", "3045", 10.0),
+        ("KOTAKBANK", "1922", 9.0), ("AXISBANK", "5900", 9.0), ("INDUSINDBK", "5258", 6.0),
+        ("BANKBARODA", "4668", 3.0), ("FEDERALBNK", "1023", 2.5), ("PNB", "10666", 2.0),
+        ("IDFCFIRSTB", "11184", 2.0), ("AUBANK", "21238", 2.0), ("BANDHANBNK", "2263", 1.0),
+    ],
+}
+BREADTH_AD_WEIGHT = 0.5  # score = 0.5 + 0.5 x (w x A/D balance + (1 - w) x scaled % change)
+BREADTH_CHANGE_FULL_PCT = 1.0  # weighted % change that saturates its half of the score
+BREADTH_MIN_COVERAGE = 0.6  # index weight with a previous close before the score is defined
+
+# Shadow strategies (engines/shadow.py): rule variants paper-traded on live snapshots,
+# no orders. SHADOW_GRID axes are crossed (variant 0 = live thresholds).
+SHADOW_ENABLED = True
+SHADOW_GRID = {
+    "participation_band": (0.05, 0.1, 0.15, 0.2),
+    "min_score": (25, 30, 35, 40),
+    "confidence": (65, 72, 80),
+    "require_supportive": (0, 1),
+    "target_ratio": (1.0, 1.5, 2.0),
+}
+SHADOW_CAPITAL = 200000
+SHADOW_PNL_DELTA = 0.5  # premium move ~ delta x spot move
+SHADOW_QUEUE_MAX = 256
+SHADOW_REPORT_SEC = 300
+SHADOW_TOP_N = 10
+
+# Broker REST gateway (data/angel/api_gateway.py): token bucket per endpoint class,
+# (requests/sec, burst). A bucket admits at most rate + burst - 1 requests in any
+# 1-second window; kept below Angel One's per-second limits (in brackets).
+API_RATE_LIMITS = {
+    "order": (9, 9),  # place / modify / cancel [20]
+    "order_query": (0.9, 1),  # order book, trade book, order details [1]
+    "account": (0.9, 1),  # RMS limits, positions, holdings, profile [1-2]
+    "quote": (4, 4),  # LTP / market data [10]
+    "candle": (2, 1),  # historical candles [3]
+    "search": (0.9, 1),  # searchScrip [1]
+    "session": (0.9, 1),  # generateSession / generateToken [1]
+    "default": (0.9, 1),
+}
+API_ENDPOINT_CLASS = {
+    "placeOrder": "order",
+    "modifyOrder": "order",
+    "cancelOrder": "order",
+    "orderBook": "order_query",
+    "tradeBook": "order_query",
+    "individual_order_details": "order_query",
+    "rmsLimit": "account",
+    "position": "account",
+    "holding": "account",
+    "getProfile": "account",
+    "ltpData": "quote",
+    "getMarketData": "quote",
+    "getCandleData": "candle",
+    "searchScrip": "search",
+    "generateSession": "session",
+    "generateToken": "session",
+}
+API_PRIORITY = {"order": 0, "session": 0, "order_query": 1, "account": 2, "quote": 3, "candle": 4, "search": 4, "default": 5}
+API_WORKERS = 4
+# Extra workers only order and session calls run on, so they never queue behind slow reads
+API_RESERVED_WORKERS = 2
+API_CALL_TIMEOUT_SEC = 30
+API_QUEUE_WARN_SEC = 2  # log requests that waited longer than this for a token
+
+# Order slicing (execution/order_slicer.py): max quantity per order (exchange freeze
+# limit) by index; larger parents go out as concurrent child orders.
+FREEZE_QTY = {"NIFTY": 1800, "BANKNIFTY": 900}
+ORDER_SLICE_WORKERS = 8
+ORDER_SLICE_WAIT_SEC = 5  # live: poll child status this long for the parent's fill
+ORDER_BOOK_TTL_SEC = 0.5  # one orderBook call serves status lookups within this window
+
+# Order pre-staging (execution/order_staging.py): ready BUY/SELL payloads for ATM +- N
+# strikes (CE and PE) of the active expiry, rebuilt when the ATM strike moves.
+STAGE_STRIKES_EACH_SIDE = 3
@@ -1,6 +1,7 @@
 from SmartApi import SmartConnect
 import pyotp
 import time
+from ops.event_log import LOG
 
 
 class AngelSession:
@@ -25,9 +26,9 @@ class AngelSession:
                 jwt = data["data"]["jwtToken"]
                 feed = data["data"]["feedToken"]
 
-                print("Angel login success")
+                LOG.info("login", "Angel login success", client=self.client)
                 return obj, jwt, feed
 
             except Exception as e:
-                print("Retry login", e)
+                LOG.error("login_retry", str(e))
                 time.sleep(5)
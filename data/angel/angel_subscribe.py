@@ -1,24 +1,22 @@
+from ops.event_log import LOG
+
+
 class AngelSubscribe:
 
     def __init__(self, ws):
         self.ws = ws
 
     def core(self):
-        print("Subscribing to core data...")
+        LOG.info("subscribe", "Subscribing to core data", correlation_id="core")
         # SmartAPI subscribe expects token_list as list of dicts:
         # [{"exchangeType": 1, "tokens": ["26000", "26017", ...]}]
         # exchangeType: 1 = nse_cm, 2 = nse_fo
         token_list = [
             {
-                "exchangeType": 1,  # nse_cm (Nifty spot, India VIX, stocks)
+                "exchangeType": 1,  # nse_cm (Nifty spot, India VIX)
                 "tokens": [
                     "26000",   # Nifty spot
                     "26017",   # India VIX
-                    "2885",
-                    "1333",
-                    "4963",
-                    "1594",
-                    "11536",
                 ],
             },
         ]
@@ -28,3 +26,21 @@ class AngelSubscribe:
             mode=1,  # LTP
             token_list=token_list,
         )
+
+    def quote(self, tokens, exchange_type=2, correlation_id="quote"):
+        """QUOTE mode (LTP + OHLC + volume) for tokens, e.g. the VWAP futures contract."""
+        LOG.info("subscribe", "Subscribing QUOTE", correlation_id=correlation_id, tokens=len(tokens))
+        self.ws.subscribe(
+            correlation_id=correlation_id,
+            mode=2,  # QUOTE
+            token_list=[{"exchangeType": exchange_type, "tokens": list(tokens)}],
+        )
+
+    def depth(self, tokens, exchange_type=2, correlation_id="depth"):
+        """SNAP_QUOTE mode (adds 5-level best bid/ask depth) for option tokens."""
+        LOG.info("subscribe", "Subscribing SNAP_QUOTE", correlation_id=correlation_id, tokens=len(tokens))
+        self.ws.subscribe(
+            correlation_id=correlation_id,
+            mode=3,  # SNAP_QUOTE
+            token_list=[{"exchangeType": exchange_type, "tokens": list(tokens)}],
+        )
@@ -1,14 +1,16 @@
 from SmartApi.smartWebSocketV2 import SmartWebSocketV2
 from data.cache.market_cache import MARKET
-import time
+from ops.event_log import LOG
 
 
 class AngelWS:
     """
-    WebSocket client for Angel One with improved error handling and reconnection logic
+    WebSocket client for Angel One.
+    Reconnection is driven by ReconnectSupervisor (data/angel/ws_supervisor.py);
+    this class only tracks connection state and the current subscription set.
     """
 
-    def __init__(self, jwt, api_key, client, feed):
+    def __init__(self, jwt, api_key, client, feed, ws_factory=SmartWebSocketV2, sink=None):
         """
         Initialize WebSocket connection
 
@@ -17,21 +19,29 @@ class AngelWS:
             api_key: Angel One API key
             client: Client code
             feed: Feed token
+            ws_factory: SmartWebSocketV2-compatible class (override to point at a local fake server)
+            sink: fn(message) for each decoded tick (default MARKET.on_message;
+                the ingest process publishes to the shared-memory tick ring instead)
         """
         self.jwt = jwt
         self.api_key = api_key
         self.client = client
         self.feed = feed
+        self.ws_factory = ws_factory
+        self.sink = sink or MARKET.on_message
         self.ws = None
         self.is_connected = False
-        self.reconnect_attempts = 0
-        self.max_reconnect_attempts = 5
+        # correlation_id -> (mode, token_list); re-sent on every reconnect
+        self.subscriptions = {}
+        # Called from on_open (set by ReconnectSupervisor)
+        self.on_reconnect = None
 
     def on_open(self, ws):
         """Callback when WebSocket connection opens"""
-        print("WebSocket connection established")
+        LOG.info("ws_open", "WebSocket connection established")
         self.is_connected = True
-        self.reconnect_attempts = 0
+        if self.on_reconnect:
+            self.on_reconnect()
 
     def on_data(self, ws, message):
         """
@@ -42,52 +52,25 @@ class AngelWS:
             message: Market data message
         """
         try:
-            token = str(message.get("token", ""))
-
-            # Nifty Spot - Token: 26000
-            if token == "26000":
-                price = message.get("last_traded_price", 0) / 100
-                MARKET.update_spot(price)
-
-            # India VIX - Token: 26017
-            elif token == "26017":
-                price = message.get("last_traded_price", 0) / 100
-                MARKET.update_vix(price)
-
-            # Option contracts
-            else:
-                MARKET.update_option(token, message)
-
+            # Nifty spot (26000), India VIX (26017) and option contracts
+            self.sink(message)
         except Exception as e:
-            print("Error processing WebSocket message:", e)
+            LOG.error("ws_message_error", str(e))
 
-    def on_error(self, ws, error):
+    def on_error(self, ws, error=None):
         """Callback when an error occurs"""
-        print("WebSocket error:", error)
+        LOG.error("ws_error", str(error))
         self.is_connected = False
 
-    def on_close(self, ws, close_status_code, close_msg):
-        """Callback when WebSocket connection closes"""
-        print(f"WebSocket closed - Code: {close_status_code}, Message: {close_msg}")
+    def on_close(self, ws, close_status_code=None, close_msg=None):
+        """Callback when WebSocket connection closes (supervisor handles reconnect)"""
+        LOG.warning("ws_closed", "WebSocket closed", code=close_status_code, reason=close_msg)
         self.is_connected = False
 
-        # Auto-reconnect logic
-        if self.reconnect_attempts < self.max_reconnect_attempts:
-            self.reconnect_attempts += 1
-            print(
-                f"Attempting reconnect "
-                f"({self.reconnect_attempts}/{self.max_reconnect_attempts})..."
-            )
-            time.sleep(5)
-            try:
-                self.connect()
-            except Exception as e:
-                print("Reconnect failed:", e)
-
     def connect(self):
-        """Initialize and connect WebSocket"""
+        """Initialize and connect WebSocket. Blocks until the connection closes."""
         try:
-            self.ws = SmartWebSocketV2(
+            self.ws = self.ws_factory(
                 auth_token=self.jwt,
                 api_key=self.api_key,
                 client_code=self.client,
@@ -99,20 +82,56 @@ class AngelWS:
             self.ws.on_error = self.on_error
             self.ws.on_close = self.on_close
 
-            print("Initiating WebSocket connection...")
+            LOG.info("ws_connect", "Initiating WebSocket connection")
             self.ws.connect()
 
         except Exception as e:
-            print("Failed to connect WebSocket:", e)
+            LOG.error("ws_connect_failed", str(e))
+            self.is_connected = False
             raise
 
+    def subscribe(self, correlation_id, mode, token_list):
+        """Subscribe and remember the request so it can be replayed after reconnect."""
+        self.subscriptions[correlation_id] = (mode, token_list)
+        self.ws.subscribe(
+            correlation_id=correlation_id,
+            mode=mode,
+            token_list=_copy(token_list),
+        )
+
+    def resubscribe(self):
+        """Replay every tracked subscription on the current connection."""
+        for correlation_id, (mode, token_list) in list(self.subscriptions.items()):
+            self.ws.subscribe(
+                correlation_id=correlation_id,
+                mode=mode,
+                token_list=_copy(token_list),
+            )
+
+    def subscribed_tokens(self, exchange_type=None):
+        """All currently subscribed tokens, optionally filtered by exchangeType (2 = nse_fo)."""
+        tokens = []
+        for _, token_list in self.subscriptions.values():
+            for group in token_list:
+                if exchange_type is None or group.get("exchangeType") == exchange_type:
+                    tokens.extend(group.get("tokens", []))
+        return tokens
+
     def disconnect(self):
         """Gracefully disconnect WebSocket"""
         try:
             if self.ws and self.is_connected:
-                print("Disconnecting WebSocket...")
-                self.ws.close()
+                LOG.info("ws_disconnect", "Disconnecting WebSocket")
+                self.ws.close_connection()
                 self.is_connected = False
-                print("WebSocket disconnected successfully")
+                LOG.info("ws_disconnected", "WebSocket disconnected successfully")
         except Exception as e:
-            print("Error during WebSocket disconnect:", e)
+            LOG.error("ws_disconnect_error", str(e))
+
+
+def _copy(token_list):
+    """
+    Fresh token lists per request: SmartWebSocketV2 keeps them in a class-level dict and
+    extends them in place, which would grow our tracked set on every resubscribe.
+    """
+    return [dict(group, tokens=list(group["tokens"])) for group in token_list]
@@ -0,0 +1,288 @@
+"""
+Rate-limit-aware, prioritized gateway in front of SmartConnect (shared by all REST callers).
+- Each SmartConnect method maps to an endpoint class (API_ENDPOINT_CLASS) with its own
+  token bucket (API_RATE_LIMITS: requests/sec, burst), so a burst of lookups can never
+  spend the order budget.
+- Priority lanes (API_PRIORITY): a dispatcher thread always serves the most urgent
+  class with a token available first (orders ahead of order queries ahead of data). A
+  class that is out of tokens does not block the others.
+- Identical read requests (same method and arguments) queued or in flight share one
+  broker call. Orders and session calls are never coalesced.
+- Queue delay (enqueue -> dispatch) and service time are sampled per class (stats()).
+Calls run on a small worker pool, so a slow HTTP response does not stall dispatch.
+Order and session calls run on their own reserved workers (API_RESERVED_WORKERS) and
+never wait for a free worker behind candle / search calls.
+A call() that times out while still queued is cancelled and never sent; an order or
+session call that already went out is waited for (no timeout after dispatch: the
+caller must not lose track of an order the broker may have accepted).
+The gateway is a drop-in for SmartConnect: gateway.placeOrder(params) blocks and returns
+what SmartConnect returns (or raises what it raised). submit() returns a Future.
+Check against the local mock broker: python -m tools.mock_broker --check
+"""
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+import numpy as np
+from config.settings import (
+    API_RATE_LIMITS,
+    API_ENDPOINT_CLASS,
+    API_PRIORITY,
+    API_WORKERS,
+    API_RESERVED_WORKERS,
+    API_CALL_TIMEOUT_SEC,
+    API_QUEUE_WARN_SEC,
+)
+from ops.event_log import LOG
+
+DELAY_SAMPLES = 1024
+NEVER_COALESCE = ("order", "session")
+RESERVED = ("order", "session")  # classes served by the reserved workers
+
+
+class TokenBucket:
+    """rate tokens/sec refill up to burst. take() is non-blocking."""
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.clock = clock
+        self.tokens = float(burst)
+        self.ts = clock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.ts) * self.rate)
+        self.ts = now
+
+    def take(self, now=None):
+        self._refill(self.clock() if now is None else now)
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def wait_time(self, now=None):
+        """Seconds until one token is available."""
+        self._refill(self.clock() if now is None else now)
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class _ClassStats:
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.delayed = 0  # requests queued longer than 1 ms (waited for a token or a lane)
+        self.queue_delay = np.zeros(DELAY_SAMPLES)
+        self.service = np.zeros(DELAY_SAMPLES)
+        self.n = 0
+
+    def record(self, delay, service):
+        i = self.n % DELAY_SAMPLES
+        self.queue_delay[i] = delay
+        self.service[i] = service
+        self.n += 1
+
+    def report(self):
+        k = min(self.n, DELAY_SAMPLES)
+        out = {"calls": self.calls, "coalesced": self.coalesced, "errors": self.errors, "delayed": self.delayed}
+        if k:
+            d = self.queue_delay[:k] * 1000
+            s = self.service[:k] * 1000
+            out.update(
+                queue_p50_ms=round(float(np.percentile(d, 50)), 2),
+                queue_p99_ms=round(float(np.percentile(d, 99)), 2),
+                queue_max_ms=round(float(d.max()), 2),
+                service_p50_ms=round(float(np.percentile(s, 50)), 2),
+                service_p99_ms=round(float(np.percentile(s, 99)), 2),
+            )
+        return out
+
+
+class ApiGateway:
+
+    def __init__(
+        self,
+        api,
+        limits=API_RATE_LIMITS,
+        endpoint_class=API_ENDPOINT_CLASS,
+        priority=API_PRIORITY,
+        workers=API_WORKERS,
+        reserved_workers=API_RESERVED_WORKERS,
+        timeout_sec=API_CALL_TIMEOUT_SEC,
+        clock=time.monotonic,
+    ):
+        """api: SmartConnect (or anything with the same methods)."""
+        self.api = api
+        self.endpoint_class = endpoint_class
+        self.priority = priority
+        self.timeout_sec = timeout_sec
+        self.clock = clock
+        self.buckets = {name: TokenBucket(rate, burst, clock) for name, (rate, burst) in limits.items()}
+        self.lanes = {name: deque() for name in self.buckets}  # class -> pending requests (FIFO)
+        self.stats_by_class = {name: _ClassStats() for name in self.buckets}
+        self._order = sorted(self.buckets, key=lambda c: priority.get(c, priority.get("default", 9)))
+        self._inflight = {}  # coalescing key -> Future (queued or running)
+        self._waiters = {}  # Future -> number of call()ers blocked on it (coalesced reads)
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api")
+        self._reserved_pool = ThreadPoolExecutor(max_workers=reserved_workers, thread_name_prefix="api-order")
+        self._closed = False
+        self._thread = threading.Thread(target=self._dispatch, name="api-gateway", daemon=True)
+        self._thread.start()
+
+    # ---------- Caller side ----------
+
+    def classify(self, method):
+        cls = self.endpoint_class.get(method, "default")
+        return cls if cls in self.buckets else "default"
+
+    def submit(self, method, *args, **kwargs):
+        """Queue SmartConnect.method(*args, **kwargs). Returns a Future."""
+        cls = self.classify(method)
+        key = None
+        if cls not in NEVER_COALESCE:
+            key = (method, json.dumps([args, kwargs], sort_keys=True, default=str))
+        with self._cond:
+            if key is not None:
+                pending = self._inflight.get(key)
+                if pending is not None:
+                    self.stats_by_class[cls].coalesced += 1
+                    return pending
+            future = Future()
+            if key is not None:
+                self._inflight[key] = future
+            self.lanes[cls].append((self.clock(), method, args, kwargs, future, key))
+            self._cond.notify()
+        return future
+
+    def call(self, method, *args, **kwargs):
+        """
+        Blocking call through the gateway (raises the broker call's exception).
+        On timeout the request is cancelled if it has not been sent (once its last waiter
+        gives up); a dispatched order / session call is waited for to the end.
+        """
+        future = self.submit(method, *args, **kwargs)
+        with self._cond:
+            self._waiters[future] = self._waiters.get(future, 0) + 1
+        try:
+            return future.result(timeout=self.timeout_sec)
+        except FutureTimeout:
+            with self._cond:
+                last = self._waiters.get(future, 0) <= 1
+                if last and future.cancel():
+                    self._drop_locked(self.classify(method), future)
+                    raise
+            if self.classify(method) in RESERVED:
+                LOG.warning("api_call_slow", method, timeout_sec=self.timeout_sec)
+                return future.result()
+            raise
+        finally:
+            with self._cond:
+                n = self._waiters.pop(future, 1) - 1
+                if n > 0:
+                    self._waiters[future] = n
+
+    def __getattr__(self, name):
+        """
+        Drop-in for SmartConnect: REST methods listed in API_ENDPOINT_CLASS go through
+        call(); anything else (attributes, local helpers) is the SmartConnect one.
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        target = getattr(self.api, name)
+        if not callable(target) or name not in self.endpoint_class:
+            return target
+        return lambda *args, **kwargs: self.call(name, *args, **kwargs)
+
+    def stats(self):
+        with self._cond:
+            out = {cls: s.report() for cls, s in self.stats_by_class.items() if s.calls or s.coalesced}
+            out["queued"] = {cls: len(lane) for cls, lane in self.lanes.items() if lane}
+        return out
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=2)
+        self._pool.shutdown(wait=False)
+        self._reserved_pool.shutdown(wait=False)
+
+    # ---------- Dispatcher ----------
+
+    def _dispatch(self):
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                now = self.clock()
+                picked, wait = self._pick_locked(now)
+                if picked is None:
+                    self._cond.wait(wait)
+                    continue
+            self._start(picked[0], picked[1], now)
+
+    def _pick_locked(self, now):
+        """((cls, request), 0) for the most urgent class with work and a token, else (None, wait)."""
+        wait = None
+        for cls in self._order:
+            lane = self.lanes[cls]
+            if not lane:
+                continue
+            bucket = self.buckets[cls]
+            if bucket.take(now):
+                return (cls, lane.popleft()), 0.0
+            w = bucket.wait_time(now)
+            wait = w if wait is None else min(wait, w)
+        return None, wait
+
+    def _start(self, cls, request, now):
+        enq_ts, method, args, kwargs, future, key = request
+        delay = now - enq_ts
+        if delay > API_QUEUE_WARN_SEC:
+            LOG.warning("api_queue_delay", method, cls=cls, delay_ms=round(delay * 1000, 1))
+        if future.set_running_or_notify_cancel():
+            pool = self._reserved_pool if cls in RESERVED else self._pool
+            pool.submit(self._run, cls, method, args, kwargs, future, key, delay)
+        else:
+            self._forget(key, future)
+
+    def _run(self, cls, method, args, kwargs, future, key, delay):
+        t0 = self.clock()
+        try:
+            result = getattr(self.api, method)(*args, **kwargs)
+        except Exception as e:
+            self._finish(cls, key, future, delay, t0, error=True)
+            future.set_exception(e)
+            return
+        self._finish(cls, key, future, delay, t0)
+        future.set_result(result)
+
+    def _finish(self, cls, key, future, delay, t0, error=False):
+        with self._cond:
+            stats = self.stats_by_class[cls]
+            stats.calls += 1
+            stats.errors += error
+            stats.delayed += delay > 0.001
+            stats.record(delay, self.clock() - t0)
+            self._forget_locked(key, future)
+
+    def _drop_locked(self, cls, future):
+        """Take a cancelled request out of its lane (it would otherwise spend a token)."""
+        lane = self.lanes[cls]
+        for request in lane:
+            if request[4] is future:
+                lane.remove(request)
+                self._forget_locked(request[5], future)
+                return
+
+    def _forget(self, key, future):
+        with self._cond:
+            self._forget_locked(key, future)
+
+    def _forget_locked(self, key, future):
+        if key is not None and self._inflight.get(key) is future:
+            del self._inflight[key]
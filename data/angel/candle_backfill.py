@@ -0,0 +1,94 @@
+"""
+Candle backfill for data gaps (per spec data layer).
+After a WebSocket outage, fetch 1-minute candles from Angel One getCandleData for the
+gap window and merge candle closes into MARKET (spot, VIX, held options).
+"""
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from config.settings import SPOT_CANDLE_TOKEN, VIX_CANDLE_TOKEN, BACKFILL_CANDLE_INTERVAL
+from data.cache.market_cache import MARKET
+
+IST = ZoneInfo("Asia/Kolkata")
+
+# Seconds per getCandleData interval name
+INTERVAL_SECONDS = {
+    "ONE_MINUTE": 60,
+    "THREE_MINUTE": 180,
+    "FIVE_MINUTE": 300,
+}
+
+
+def _fmt(ts):
+    """Epoch seconds -> 'YYYY-MM-DD HH:MM' in IST (getCandleData format)."""
+    return datetime.fromtimestamp(ts, IST).strftime("%Y-%m-%d %H:%M")
+
+
+def _parse_ts(value):
+    """Candle timestamp ('2026-02-16T09:21:00+05:30') -> epoch seconds."""
+    return datetime.fromisoformat(value).timestamp()
+
+
+class CandleBackfill:
+    """
+    Fetches candles through the SmartConnect-compatible `api` (getCandleData) and
+    backfills a cache. `api` can be pointed at a local HTTP server for testing.
+    """
+
+    def __init__(self, api, cache=MARKET, interval=BACKFILL_CANDLE_INTERVAL):
+        self.api = api
+        self.cache = cache
+        self.interval = interval
+        self.interval_sec = INTERVAL_SECONDS.get(interval, 60)
+
+    def fetch(self, exchange, token, start_ts, end_ts):
+        """
+        Return [(ts, close)] for candles that close inside (start_ts, end_ts].
+        ts is the candle close time, so points line up with tick timestamps.
+        """
+        params = {
+            "exchange": exchange,
+            "symboltoken": str(token),
+            "interval": self.interval,
+            "fromdate": _fmt(start_ts - self.interval_sec),
+            "todate": _fmt(end_ts),
+        }
+        try:
+            result = self.api.getCandleData(params)
+        except Exception:
+            return []
+        if not result or not result.get("status") or not result.get("data"):
+            return []
+        points = []
+        for candle in result["data"]:
+            try:
+                close_ts = _parse_ts(candle[0]) + self.interval_sec
+                close = float(candle[4])
+            except (IndexError, TypeError, ValueError):
+                continue
+            if start_ts < close_ts <= end_ts:
+                points.append((close_ts, close))
+        return points
+
+    def fetch_gap(self, start_ts, end_ts, option_tokens=()):
+        """Candle points for the gap window: {spot, vix, options: {token: points}}. Network only."""
+        return {
+            "spot": self.fetch("NSE", SPOT_CANDLE_TOKEN, start_ts, end_ts),
+            "vix": self.fetch("NSE", VIX_CANDLE_TOKEN, start_ts, end_ts),
+            "options": {token: self.fetch("NFO", token, start_ts, end_ts) for token in option_tokens},
+        }
+
+    def merge(self, points):
+        """
+        Merge fetch_gap() points into the cache (run on the feed thread).
+        Returns dict of points inserted per series and the spot points themselves.
+        """
+        return {
+            "spot": self.cache.backfill_spot(points["spot"]),
+            "vix": self.cache.backfill_vix(points["vix"]),
+            "options": sum(self.cache.backfill_option(t, p) for t, p in points["options"].items()),
+            "spot_points": points["spot"],
+        }
+
+    def fill_gap(self, start_ts, end_ts, option_tokens=()):
+        """Fetch and merge in one call (see fetch_gap / merge)."""
+        return self.merge(self.fetch_gap(start_ts, end_ts, option_tokens))
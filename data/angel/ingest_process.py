@@ -0,0 +1,181 @@
+"""
+Multi-process feed topology (INGEST_PROCESS = True).
+A forked ingest process owns the SmartAPI WebSocket and publishes every decoded tick
+to a shared-memory TickRing (data/cache/tick_ring.py). In this process a pump thread
+reads the ring into MARKET, so strategy and metrics work never delays tick decoding.
+
+IngestProcess is a drop-in for AngelWS. ReconnectSupervisor drives connect(), so
+backoff, resubscribe and candle backfill all stay in the strategy process.
+AngelSubscribe requests are forwarded to the ingest process over a command queue.
+Further consumers (e.g. an analytics process) attach to the ring by `ring.name`
+with their own TickRingReader.
+The child is forked, not spawned: main.py runs at import time and must not re-run.
+It is forked at startup before any other thread exists (ApiGateway workers, profiler,
+event log writer), so it inherits no lock held mid-operation; the session credentials,
+which need the login, follow over the command queue (authenticate()).
+"""
+import multiprocessing as mp
+import queue
+import threading
+import time
+from config.settings import TICK_RING_CAPACITY, INGEST_POLL_SEC
+from data.cache.market_cache import MARKET
+from data.cache.tick_ring import TickRing, TickRingReader, decode
+from ops.event_log import LOG
+
+RING_STATS_EVERY_SEC = 60
+
+
+def _ingest_main(ring_name, commands, opens, closed):
+    """Ingest process: WebSocket -> TickRing. Waits for "auth", then connects once per "connect" command."""
+    from data.angel.angel_ws import AngelWS
+
+    ring = TickRing(ring_name, create=False)
+    cmd = commands.get()
+    if cmd[0] != "auth":
+        ring.close()
+        return
+    ws = AngelWS(*cmd[1:], sink=ring.publish)
+
+    def on_open():
+        with opens.get_lock():
+            opens.value += 1
+
+    ws.on_reconnect = on_open
+    connect_requests = queue.Queue()
+
+    def control():
+        while True:
+            cmd = commands.get()
+            if cmd[0] == "connect":
+                connect_requests.put(True)
+            elif cmd[0] == "subscribe":
+                try:
+                    ws.subscribe(cmd[1], cmd[2], cmd[3])
+                except Exception as e:
+                    LOG.error("ingest_subscribe_error", str(e), correlation_id=cmd[1])
+            elif cmd[0] == "close":
+                ws.disconnect()
+            elif cmd[0] == "stop":
+                ws.disconnect()
+                connect_requests.put(None)
+                return
+
+    threading.Thread(target=control, name="ingest-control", daemon=True).start()
+    while connect_requests.get():
+        try:
+            ws.connect()  # blocks until the socket closes
+        except Exception as e:
+            LOG.error("ingest_connect_failed", str(e))
+        closed.set()
+    ring.close()
+    LOG.close()
+
+
+class IngestProcess:
+
+    def __init__(
+        self,
+        capacity=TICK_RING_CAPACITY,
+        cache=MARKET,
+        poll_sec=INGEST_POLL_SEC,
+    ):
+        self.ring = TickRing(capacity=capacity)
+        self.reader = TickRingReader(self.ring)
+        self.cache = cache
+        self.poll_sec = poll_sec
+        self.is_connected = False
+        # correlation_id -> (mode, token_list); re-sent on every reconnect
+        self.subscriptions = {}
+        # Called when the ingest socket opens (set by ReconnectSupervisor)
+        self.on_reconnect = None
+        ctx = mp.get_context("fork")
+        self._commands = ctx.Queue()
+        self._opens = ctx.Value("q", 0)
+        self._closed = ctx.Event()
+        self._seen_opens = 0
+        self._stopped = False
+        self._authenticated = False
+        self.process = ctx.Process(
+            target=_ingest_main,
+            args=(self.ring.name, self._commands, self._opens, self._closed),
+            name="ingest",
+            daemon=True,
+        )
+
+    def start(self):
+        """Fork the ingest process (before other threads exist) and start pumping the ring into the cache."""
+        self.process.start()
+        threading.Thread(target=self._pump, name="tick-pump", daemon=True).start()
+        LOG.info("ingest_started", pid=self.process.pid, ring=self.ring.name, capacity=self.ring.capacity)
+
+    def authenticate(self, jwt, api_key, client, feed):
+        """Hand the feed session to the ingest process (after login)."""
+        self._commands.put(("auth", jwt, api_key, client, feed))
+        self._authenticated = True
+
+    def _pump(self):
+        while not self._stopped:
+            batch = self.reader.poll()
+            if not len(batch):
+                time.sleep(self.poll_sec)
+                continue
+            for record in batch:
+                try:
+                    self.cache.on_message(decode(record))
+                except Exception as e:
+                    LOG.error("tick_pump_error", str(e))
+            LOG.info("tick_ring", every=RING_STATS_EVERY_SEC, **self.reader.stats())
+
+    def connect(self):
+        """Ask the ingest process to connect; blocks until its socket closes (like AngelWS)."""
+        if not self.process.is_alive():
+            raise RuntimeError("Ingest process is not running")
+        if not self._authenticated:
+            raise RuntimeError("Ingest process has no feed session (authenticate() first)")
+        self._closed.clear()
+        self._commands.put(("connect",))
+        LOG.info("ws_connect", "Initiating WebSocket connection (ingest process)")
+        while not self._closed.wait(0.05):
+            if self._opens.value != self._seen_opens:
+                self._seen_opens = self._opens.value
+                LOG.info("ws_open", "WebSocket connection established (ingest process)")
+                self.is_connected = True
+                if self.on_reconnect:
+                    self.on_reconnect()
+            if not self.process.is_alive():
+                self.is_connected = False
+                raise RuntimeError("Ingest process exited")
+        self.is_connected = False
+
+    def subscribe(self, correlation_id, mode, token_list):
+        """Remember the request and forward it to the ingest socket (replayed on open if down)."""
+        self.subscriptions[correlation_id] = (mode, token_list)
+        if self.is_connected:
+            self._commands.put(("subscribe", correlation_id, mode, token_list))
+
+    def resubscribe(self):
+        for correlation_id, (mode, token_list) in list(self.subscriptions.items()):
+            self._commands.put(("subscribe", correlation_id, mode, token_list))
+
+    def subscribed_tokens(self, exchange_type=None):
+        """All currently subscribed tokens, optionally filtered by exchangeType (2 = nse_fo)."""
+        tokens = []
+        for _, token_list in self.subscriptions.values():
+            for group in token_list:
+                if exchange_type is None or group.get("exchangeType") == exchange_type:
+                    tokens.extend(group.get("tokens", []))
+        return tokens
+
+    def disconnect(self):
+        """Close the ingest socket (the process stays up for the next connect)."""
+        if self.process.is_alive():
+            self._commands.put(("close",))
+
+    def shutdown(self):
+        """Stop the ingest process and release the shared memory."""
+        self._stopped = True
+        if self.process.is_alive():
+            self._commands.put(("stop",))
+            self.process.join(timeout=2)
+        self.ring.close()
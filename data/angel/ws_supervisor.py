@@ -0,0 +1,159 @@
+"""
+WebSocket reconnect supervisor.
+Owns the AngelWS connect loop: exponential backoff with jitter between attempts,
+replays the tracked subscription set on every (re)connect, and before the strategy
+resumes backfills the data gap (spot, VIX, subscribed options) from broker candles.
+The candle fetches (~45 rate-limited getCandleData calls) run on their own thread so
+the socket keeps reading ticks; the fetched points are merged into the cache on the
+feed thread. Recovery time is measured per outage and kept in `last_report`.
+"""
+import random
+import threading
+import time
+from config.settings import (
+    BACKFILL_MERGE_WAIT_SEC,
+    RECONNECT_BASE_DELAY_SEC,
+    RECONNECT_MAX_DELAY_SEC,
+    RECONNECT_MAX_ATTEMPTS,
+)
+from data.cache.market_cache import MARKET
+from ops.event_log import LOG
+
+NSE_FO = 2  # exchangeType for option contracts
+
+
+class ReconnectSupervisor:
+
+    def __init__(
+        self,
+        ws_engine,
+        backfill=None,
+        cache=MARKET,
+        base_delay=RECONNECT_BASE_DELAY_SEC,
+        max_delay=RECONNECT_MAX_DELAY_SEC,
+        max_attempts=RECONNECT_MAX_ATTEMPTS,
+        sleep=time.sleep,
+        merge_wait=BACKFILL_MERGE_WAIT_SEC,
+    ):
+        """
+        ws_engine: AngelWS (connect() blocks until the socket closes).
+        backfill: CandleBackfill or None (no backfill, resubscribe only).
+        sleep: injectable for tests.
+        """
+        self.ws_engine = ws_engine
+        self.backfill = backfill
+        self.cache = cache
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self.sleep = sleep
+        self.merge_wait = merge_wait
+
+        self.recovering = False  # True from disconnect until backfill completes
+        self.recoveries = 0
+        self.last_report = None
+        self.attempt = 0
+        self._down_since = None
+        self._gap_start = None
+        self._stopped = False
+
+        ws_engine.on_reconnect = self._on_open
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff: base * 2^(attempt-1), capped, with +-25% jitter."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(0.75, 1.25)
+
+    def run(self):
+        """Connect loop; run in the WebSocket background thread."""
+        while not self._stopped:
+            try:
+                self.ws_engine.connect()
+            except Exception as e:
+                LOG.error("ws_connect_failed", str(e), attempt=self.attempt + 1)
+            if self._stopped:
+                break
+            self._mark_down()
+            self.attempt += 1
+            if self.max_attempts is not None and self.attempt > self.max_attempts:
+                LOG.error("ws_reconnect_gave_up", "Reconnect gave up", attempts=self.max_attempts)
+                break
+            delay = self.backoff_delay(self.attempt)
+            LOG.warning("ws_reconnect", "Reconnecting", delay_sec=round(delay, 2), attempt=self.attempt, every=0)
+            self.sleep(delay)
+
+    def stop(self):
+        """Stop reconnecting and close the current connection."""
+        self._stopped = True
+        self.ws_engine.disconnect()
+
+    def _mark_down(self):
+        """Record the start of an outage (first failed attempt only)."""
+        if self._down_since is not None:
+            return
+        self._down_since = time.time()
+        # Gap starts at the last tick actually received, not at socket close
+        self._gap_start = self.cache.last_tick_ts or self._down_since
+        self.recovering = True
+
+    def _on_open(self):
+        """Connection (re)opened: resubscribe, then backfill the gap if we were down."""
+        self.ws_engine.resubscribe()
+        if self._down_since is None:
+            return
+        outage = {
+            "gap_start": self._gap_start,
+            "gap_end": time.time(),
+            "down_since": self._down_since,
+            "attempts": self.attempt,
+        }
+        self._down_since = None
+        self._gap_start = None
+        self.attempt = 0
+        threading.Thread(target=self._backfill, args=(outage,), name="ws-backfill", daemon=True).start()
+
+    def _backfill(self, outage):
+        """Backfill thread: fetch the gap's candles, then merge them on the feed thread."""
+        points = None
+        if self.backfill is not None:
+            points = self.backfill.fetch_gap(
+                outage["gap_start"],
+                outage["gap_end"],
+                # NFO tokens minus routed instruments (the VWAP futures contract)
+                option_tokens=[t for t in self.ws_engine.subscribed_tokens(NSE_FO) if not self.cache.routed(t)],
+            )
+        merged = threading.Event()
+        once = threading.Lock()
+
+        def merge():
+            if once.acquire(blocking=False):
+                self._finish(outage, points)
+                merged.set()
+
+        self.cache.call_on_feed(merge)
+        if not merged.wait(self.merge_wait):
+            merge()  # feed is quiet: nothing else writes the cache
+
+    def _finish(self, outage, points):
+        filled = self.backfill.merge(points) if points is not None else {}
+        resumed = time.time()
+        self.last_report = {
+            "gap_start": outage["gap_start"],
+            "gap_end": outage["gap_end"],
+            "gap_sec": outage["gap_end"] - outage["gap_start"],
+            "attempts": outage["attempts"],
+            "backfill_sec": resumed - outage["gap_end"],
+            "recovery_sec": resumed - outage["down_since"],
+            "backfilled": {k: filled.get(k, 0) for k in ("spot", "vix", "options")},
+            "spot_points": filled.get("spot_points", []),
+        }
+        LOG.info(
+            "feed_recovered",
+            recovery_sec=round(self.last_report["recovery_sec"], 3),
+            gap_sec=round(self.last_report["gap_sec"], 1),
+            attempts=outage["attempts"],
+            backfilled=self.last_report["backfilled"],
+        )
+        self.recoveries += 1
+        if self._down_since is None:  # not down again meanwhile
+            self.recovering = False
@@ -0,0 +1,204 @@
+"""
+Tick-to-bar aggregator.
+Builds clock-aligned OHLCV bars (1s, 1m, 3m, 5m by default) incrementally per token.
+Closed bars are stored in NumPy ring buffers (BarSeries) and announced to
+registered on-close callbacks. Buckets with no ticks are forward-filled with flat
+bars at the previous close, so N bars always span N * timeframe seconds.
+Forward-filled bars are flagged; after a feed outage backfill() rewrites the flagged
+bars of the gap from broker candle points (the live ticks after the reconnect have
+already closed them, so replaying the points as ticks would only drop them as late).
+"""
+import threading
+import numpy as np
+from config.settings import BAR_TIMEFRAMES_SEC, BAR_HISTORY, BAR_MAX_FILL
+
+# Column order in a BarSeries row / closed-bar tuple
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+class BarSeries:
+    """Fixed-capacity ring buffer of closed bars: ts (bucket start), open, high, low, close, volume."""
+
+    def __init__(self, capacity=BAR_HISTORY):
+        self.capacity = capacity
+        self.data = np.zeros((capacity, 6), dtype=np.float64)
+        self.filled = np.zeros(capacity, dtype=bool)  # forward-filled (no tick in the bucket)
+        self.count = 0  # total bars ever written
+
+    def append(self, bar, filled=False):
+        i = self.count % self.capacity
+        self.data[i] = bar
+        self.filled[i] = filled
+        self.count += 1
+
+    def _slots(self):
+        """Ring indices of the stored bars, oldest first."""
+        end = self.count % self.capacity
+        return np.arange(end - len(self), end) % self.capacity
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def last(self, n=None):
+        """Last n bars (oldest first) as an (n, 6) array copy."""
+        size = len(self)
+        n = size if n is None else min(n, size)
+        if n == 0:
+            return self.data[:0].copy()
+        return self.data[self._slots()[size - n:]]
+
+    def column(self, col, n=None):
+        return self.last(n)[:, col]
+
+
+class _OpenBar:
+    __slots__ = ("bucket", "open", "high", "low", "close", "volume")
+
+    def __init__(self, bucket, price, volume):
+        self.bucket = bucket
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+
+    def as_tuple(self):
+        return (self.bucket, self.open, self.high, self.low, self.close, self.volume)
+
+
+class BarAggregator:
+
+    def __init__(self, timeframes=BAR_TIMEFRAMES_SEC, capacity=BAR_HISTORY, max_fill=BAR_MAX_FILL):
+        self.timeframes = tuple(timeframes)
+        self.capacity = capacity
+        self.max_fill = max_fill
+        self._series = {}  # (token, tf) -> BarSeries
+        self._open = {}  # (token, tf) -> _OpenBar
+        self._last_cum_volume = {}  # token -> cumulative day volume (quote mode)
+        self._callbacks = {}  # (token, tf) -> [fn(token, tf, bar)]; token None = any token
+        self._lock = threading.Lock()
+
+    def on_close(self, token, tf, fn):
+        """Register fn(token, tf, bar_tuple) for bars closing on token (None = all tokens)."""
+        self._callbacks.setdefault((token, tf), []).append(fn)
+
+    def on_tick(self, token, ts, price, cum_volume=None):
+        """
+        Feed one tick. cum_volume is the broker's cumulative day volume if available;
+        bar volume is its increase since the previous tick.
+        """
+        volume = 0
+        if cum_volume is not None:
+            prev = self._last_cum_volume.get(token)
+            if prev is not None and cum_volume >= prev:
+                volume = cum_volume - prev
+            self._last_cum_volume[token] = cum_volume
+        closed = []
+        with self._lock:
+            for tf in self.timeframes:
+                key = (token, tf)
+                bucket = ts - ts % tf
+                bar = self._open.get(key)
+                if bar is None:
+                    self._open[key] = _OpenBar(bucket, price, volume)
+                elif bucket > bar.bucket:
+                    self._close(key, bar, bucket, closed)
+                    self._open[key] = _OpenBar(bucket, price, volume)
+                elif bucket == bar.bucket:
+                    if price > bar.high:
+                        bar.high = price
+                    elif price < bar.low:
+                        bar.low = price
+                    bar.close = price
+                    bar.volume += volume
+                # bucket < bar.bucket: late tick for an already-closed bar, dropped
+        self._fire(closed)
+
+    def roll(self, now):
+        """Close open bars whose bucket has ended by `now` (quiet market, no new tick)."""
+        closed = []
+        with self._lock:
+            for key, bar in list(self._open.items()):
+                tf = key[1]
+                bucket = now - now % tf
+                if bucket > bar.bucket:
+                    self._close(key, bar, bucket, closed)
+                    # Next bar opens flat at the last close until a tick arrives
+                    self._open[key] = _OpenBar(bucket, bar.close, 0)
+        self._fire(closed)
+
+    def _close(self, key, bar, next_bucket, closed):
+        """Store bar and forward-fill empty buckets up to next_bucket (caller holds lock)."""
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = BarSeries(self.capacity)
+        tf = key[1]
+        row = bar.as_tuple()
+        series.append(row)
+        closed.append((key, row))
+        missing = int(round((next_bucket - bar.bucket) / tf)) - 1
+        start = bar.bucket + tf
+        if missing > self.max_fill:
+            start = next_bucket - self.max_fill * tf
+            missing = self.max_fill
+        c = bar.close
+        for i in range(missing):
+            row = (start + i * tf, c, c, c, c, 0.0)
+            series.append(row, filled=True)
+            closed.append((key, row))
+
+    def backfill(self, token, points):
+        """
+        Rewrite forward-filled bars from gap points [(ts, price)], e.g. 1m candle closes
+        stamped at the candle end. A point at ts belongs to the bar with bucket < ts <=
+        bucket + tf. Filled bars with points get their OHLC; filled bars between points
+        carry the last point's price flat. Bars built from live ticks, and the open bar,
+        are left alone; rewritten bars are not re-announced to on-close callbacks.
+        Returns the number of bars rewritten.
+        """
+        if not points:
+            return 0
+        points = sorted(points, key=lambda p: p[0])
+        ts = np.array([p[0] for p in points], dtype=np.float64)
+        px = np.array([p[1] for p in points], dtype=np.float64)
+        rewritten = 0
+        with self._lock:
+            for tf in self.timeframes:
+                series = self._series.get((token, tf))
+                if series is None:
+                    continue
+                carry = None
+                for i in series._slots():
+                    if not series.filled[i]:
+                        carry = None  # live data: the gap (if any) starts after this bar
+                        continue
+                    bucket = series.data[i, TS]
+                    lo, hi = np.searchsorted(ts, (bucket, bucket + tf), side="right")
+                    if hi > lo:
+                        seg = px[lo:hi]
+                        series.data[i, OPEN:CLOSE + 1] = (seg[0], seg.max(), seg.min(), seg[-1])
+                        carry = seg[-1]
+                    elif carry is not None:
+                        series.data[i, OPEN:CLOSE + 1] = carry
+                    else:
+                        continue
+                    rewritten += 1
+        return rewritten
+
+    def _fire(self, closed):
+        if not closed or not self._callbacks:
+            return
+        for (token, tf), row in closed:
+            for fn in self._callbacks.get((token, tf), ()):
+                fn(token, tf, row)
+            for fn in self._callbacks.get((None, tf), ()):
+                fn(token, tf, row)
+
+    def series(self, token, tf):
+        """BarSeries for token/timeframe, or None if no bar has closed yet."""
+        return self._series.get((token, tf))
+
+    def closes(self, token, tf, n=None):
+        """Last n close prices (oldest first) as a list, for the list-based engines."""
+        series = self._series.get((token, tf))
+        if series is None:
+            return []
+        with self._lock:
+            return series.column(CLOSE, n).tolist()
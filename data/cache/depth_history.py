@@ -0,0 +1,148 @@
+"""
+Per-token 5-level market depth history (for LMS, strike ranking and paper fills).
+All tokens share preallocated NumPy arrays so the whole basket can be scored in
+one vectorized pass:
+    ts[row, i]                  snapshot time
+    book[row, i, field, level]  field = BID_PX, BID_QTY, BID_ORDERS, ASK_PX, ASK_QTY, ASK_ORDERS
+    liquidity[row, i]           total resting qty (bid + ask, all levels)
+    imbalance[row, i]           (bid qty - ask qty) / liquidity
+Rows are assigned per token on first snapshot; each row is a ring buffer.
+"""
+import threading
+import numpy as np
+from config.settings import DEPTH_HISTORY, DEPTH_MAX_TOKENS
+
+LEVELS = 5
+BID_PX, BID_QTY, BID_ORDERS, ASK_PX, ASK_QTY, ASK_ORDERS = range(6)
+
+
+def parse_depth(tick):
+    """
+    Extract (bids, asks) as lists of (price, qty, orders) from a tick, or None.
+    Supports SmartAPI SNAP_QUOTE (best_5_buy_data / best_5_sell_data, prices in paise)
+    and the generic {"depth": {"buy": [...], "sell": [...]}} shape.
+    """
+    buys = tick.get("best_5_buy_data")
+    sells = tick.get("best_5_sell_data")
+    scale = 100.0
+    if buys is None and sells is None:
+        depth = tick.get("depth") or tick.get("market_depth")
+        if not depth:
+            return None
+        buys = depth.get("buy")
+        sells = depth.get("sell")
+        scale = 1.0
+    if not isinstance(buys, list) or not isinstance(sells, list):
+        return None
+
+    def levels(side):
+        return [
+            (
+                lvl.get("price", 0) / scale,
+                lvl.get("quantity", 0),
+                lvl.get("no of orders", lvl.get("orders", 0)),
+            )
+            for lvl in side[:LEVELS]
+        ]
+
+    return levels(buys), levels(sells)
+
+
+class DepthHistory:
+
+    def __init__(self, capacity=DEPTH_HISTORY, max_tokens=DEPTH_MAX_TOKENS):
+        self.capacity = capacity
+        self.max_tokens = max_tokens
+        self.ts = np.zeros((max_tokens, capacity), dtype=np.float64)
+        self.book = np.zeros((max_tokens, capacity, 6, LEVELS), dtype=np.float32)
+        self.liquidity = np.zeros((max_tokens, capacity), dtype=np.float64)
+        self.imbalance = np.zeros((max_tokens, capacity), dtype=np.float64)
+        self.count = np.zeros(max_tokens, dtype=np.int64)
+        self.rows = {}  # token -> row index
+        self.dropped_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, token, ts, bids, asks):
+        """Store one snapshot; bids/asks are up to 5 (price, qty, orders) tuples."""
+        with self._lock:
+            row = self.rows.get(token)
+            if row is None:
+                if len(self.rows) >= self.max_tokens:
+                    self.dropped_tokens += 1
+                    return
+                row = self.rows[token] = len(self.rows)
+            i = self.count[row] % self.capacity
+            snap = self.book[row, i]
+            snap[:] = 0
+            bid_total = ask_total = 0
+            for lvl, (px, qty, orders) in enumerate(bids):
+                snap[BID_PX, lvl] = px
+                snap[BID_QTY, lvl] = qty
+                snap[BID_ORDERS, lvl] = orders
+                bid_total += qty
+            for lvl, (px, qty, orders) in enumerate(asks):
+                snap[ASK_PX, lvl] = px
+                snap[ASK_QTY, lvl] = qty
+                snap[ASK_ORDERS, lvl] = orders
+                ask_total += qty
+            total = bid_total + ask_total
+            self.liquidity[row, i] = total
+            self.imbalance[row, i] = (bid_total - ask_total) / total if total else 0.0
+            self.ts[row, i] = ts
+            self.count[row] += 1
+
+    def latest(self, token):
+        """Most recent (6, 5) snapshot for token, or None."""
+        row = self.rows.get(token)
+        if row is None or self.count[row] == 0:
+            return None
+        return self.book[row, (self.count[row] - 1) % self.capacity].copy()
+
+    def last_ts(self, token):
+        """Timestamp of the most recent snapshot for token, or None."""
+        row = self.rows.get(token)
+        if row is None or self.count[row] == 0:
+            return None
+        return float(self.ts[row, (self.count[row] - 1) % self.capacity])
+
+    def latest_many(self, tokens):
+        """Latest (len(tokens), 6, 5) snapshots in one gather; rows with no depth are NaN."""
+        out = np.full((len(tokens), 6, LEVELS), np.nan, dtype=np.float32)
+        rows = np.array([self.rows.get(t, -1) for t in tokens], dtype=np.int64)
+        have = rows >= 0
+        have[have] = self.count[rows[have]] > 0
+        if have.any():
+            r = rows[have]
+            out[have] = self.book[r, (self.count[r] - 1) % self.capacity]
+        return out
+
+    def window(self, token, window_sec, now):
+        """(ts, book) for token within the last window_sec, oldest first."""
+        row = self.rows.get(token)
+        if row is None:
+            return self.ts[0, :0], self.book[0, :0]
+        n = min(int(self.count[row]), self.capacity)
+        end = int(self.count[row]) % self.capacity
+        idx = np.arange(end - n, end) % self.capacity
+        ts = self.ts[row, idx]
+        keep = ts >= now - window_sec
+        return ts[keep], self.book[row, idx][keep]
+
+    def at(self, token, ts):
+        """Latest (6, 5) snapshot at or before ts, or None (latency-aware paper fills)."""
+        row = self.rows.get(token)
+        if row is None or self.count[row] == 0:
+            return None
+        times = np.where((self.ts[row] > 0) & (self.ts[row] <= ts), self.ts[row], -np.inf)
+        i = int(np.argmax(times))
+        if times[i] == -np.inf:
+            return None
+        return self.book[row, i].copy()
+
+    def snapshot(self):
+        """(tokens in row order, ts, liquidity, imbalance) views over used rows for vectorized scoring."""
+        n = len(self.rows)
+        tokens = [None] * n
+        for token, row in self.rows.items():
+            tokens[row] = token
+        return tokens, self.ts[:n], self.liquidity[:n], self.imbalance[:n]
@@ -0,0 +1,122 @@
+"""
+Feed health per token: last update time, inter-arrival histogram and ticks/sec.
+MARKET calls on_tick for every spot, VIX and option tick; the work is O(1) over
+preallocated NumPy rows (no allocation once a token has a row):
+    last_ts[row]        wall-clock time of last tick
+    rate[row]           EWMA ticks/sec (time constant FEED_RATE_TAU_SEC)
+    hist[row, b]        inter-arrival count, bucket b = [2^(b-1), 2^b) ms (b = 0: < 1 ms)
+    max_age[row]        seconds without a tick before the token is stale
+A token that never ticked is stale. gate() is consulted by the validation chain
+before any entry.
+"""
+import math
+import threading
+import numpy as np
+from config.settings import FEED_MAX_TOKENS, FEED_STALE_SEC, FEED_RATE_TAU_SEC
+
+HIST_BUCKETS = 18  # last bucket: >= 65.5 s
+
+
+class FeedHealth:
+
+    def __init__(self, max_tokens=FEED_MAX_TOKENS, stale_sec=FEED_STALE_SEC, tau_sec=FEED_RATE_TAU_SEC):
+        self.max_tokens = max_tokens
+        self.stale_sec = stale_sec
+        self.tau_sec = tau_sec
+        self.last_ts = np.zeros(max_tokens, dtype=np.float64)
+        self.rate = np.zeros(max_tokens, dtype=np.float64)
+        self.count = np.zeros(max_tokens, dtype=np.int64)
+        self.max_gap = np.zeros(max_tokens, dtype=np.float64)
+        self.max_age = np.full(max_tokens, float(stale_sec), dtype=np.float64)
+        self.hist = np.zeros((max_tokens, HIST_BUCKETS), dtype=np.int64)
+        self.rows = {}  # token -> row index
+        self.dropped_tokens = 0
+        self._lock = threading.Lock()  # row assignment only (feed thread + watch callers)
+
+    def _row(self, token):
+        with self._lock:
+            row = self.rows.get(token)
+            if row is None:
+                if len(self.rows) >= self.max_tokens:
+                    self.dropped_tokens += 1
+                    return None
+                row = self.rows[token] = len(self.rows)
+            return row
+
+    def watch(self, token, max_age_sec=None):
+        """Track token before its first tick (so silence is detected) with its own stale threshold."""
+        row = self._row(token)
+        if row is not None:
+            self.max_age[row] = self.stale_sec if max_age_sec is None else max_age_sec
+
+    def on_tick(self, token, ts):
+        row = self.rows.get(token)
+        if row is None:
+            row = self._row(token)
+            if row is None:
+                return
+        last = self.last_ts[row]
+        if last > 0:
+            dt = ts - last
+            if dt < 0:
+                return  # out-of-order (e.g. replayed) tick
+            self.hist[row, min(int(dt * 1000).bit_length(), HIST_BUCKETS - 1)] += 1
+            if dt > self.max_gap[row]:
+                self.max_gap[row] = dt
+            self.rate[row] = self.rate[row] * math.exp(-dt / self.tau_sec) + 1.0 / self.tau_sec
+        self.last_ts[row] = ts
+        self.count[row] += 1
+
+    def age(self, token, now):
+        """Seconds since the last tick, or None if the token never ticked."""
+        row = self.rows.get(token)
+        if row is None or self.count[row] == 0:
+            return None
+        return float(now - self.last_ts[row])
+
+    def ticks_per_sec(self, token, now):
+        """EWMA tick rate, decayed to now."""
+        row = self.rows.get(token)
+        if row is None or self.count[row] == 0:
+            return 0.0
+        return float(self.rate[row] * math.exp(-max(0.0, now - self.last_ts[row]) / self.tau_sec))
+
+    def is_stale(self, token, now):
+        row = self.rows.get(token)
+        if row is None or self.count[row] == 0:
+            return True
+        return bool(now - self.last_ts[row] > self.max_age[row])
+
+    def stale_tokens(self, now):
+        """All tracked tokens currently stale (vectorized over rows)."""
+        n = len(self.rows)
+        stale = (self.count[:n] == 0) | (now - self.last_ts[:n] > self.max_age[:n])
+        if not stale.any():
+            return []
+        return [token for token, row in self.rows.items() if stale[row]]
+
+    def gate(self, tokens, now):
+        """(ok, reason): ok only if every token in tokens has ticked within its threshold."""
+        for token in tokens:
+            if token is None:
+                continue
+            if self.is_stale(token, now):
+                a = self.age(token, now)
+                if a is None:
+                    return False, f"No ticks for {token}"
+                return False, f"Stale feed {token} ({a:.1f}s)"
+        return True, "OK"
+
+    def report(self, token, now):
+        """Health summary for one token (status log / diagnostics)."""
+        row = self.rows.get(token)
+        if row is None:
+            return None
+        return {
+            "ticks": int(self.count[row]),
+            "age_sec": self.age(token, now),
+            "ticks_per_sec": round(self.ticks_per_sec(token, now), 3),
+            "max_gap_sec": float(self.max_gap[row]),
+            "stale": self.is_stale(token, now),
+            "hist_ms": self.hist[row].tolist(),
+        }
@@ -4,48 +4,135 @@ Holds spot, VIX, option chain (LTP, OI), and time-series for PDR/LMS per spec.
 """
 from collections import deque
 import time
+from data.cache.bar_aggregator import BarAggregator
+from data.cache.depth_history import DepthHistory, parse_depth
+from data.cache.feed_health import FeedHealth
 
 # 5 min of 1s ticks ≈ 300; keep last 300 for PDR/LMS (5 min window)
 PDR_LMS_WINDOW = 300
 
+SPOT_TOKEN = "26000"  # Nifty spot
+VIX_TOKEN = "26017"  # India VIX
+
+# Spot/VIX history kept for gap backfill after reconnect (ticks or 1m candle closes)
+SPOT_HISTORY_WINDOW = 3000
+
 
 class MarketCache:
     def __init__(self):
         self.spot = None
         self.vix = None
-        self.heavy = {}  # symbol -> LTP (for participation)
         self.option_chain = {}  # token -> { ltp, oi, depth, ... }
+        self.contracts = {}  # token -> {token, symbol, strike, side, expiry} for the subscribed basket
         # Put/Call OI for PCR (when available)
         self.put_oi_total = 0
         self.call_oi_total = 0
         # Time-series for PDR (premium decay) and LMS (liquidity momentum)
         self._option_ltp_history = {}  # token -> deque of (ts, ltp)
-        self._depth_history = deque(maxlen=PDR_LMS_WINDOW)  # (ts, best_bid, best_ask, spread)
+        self.depth = DepthHistory()  # per-token 5-level bid/ask price, qty, orders
+        # Spot/VIX time-series (ts, price); gaps are backfilled from broker candles
+        self._spot_history = deque(maxlen=SPOT_HISTORY_WINDOW)
+        self._vix_history = deque(maxlen=SPOT_HISTORY_WINDOW)
+        self.last_tick_ts = None  # wall-clock time of last tick on any token (gap detection)
+        self.feed = FeedHealth()  # per-token staleness and tick rate
+        # Clock-aligned OHLCV bars for spot, VIX and every option token
+        self.bars = BarAggregator()
+        # token -> [fn(token, tick, ts)] called on every tick for that token (None = all tokens)
+        self._tick_listeners = {}
+        # token -> fn(token, message, ts) for non-option instruments (index constituents)
+        self._routes = {}
+        self.recorder = None  # TickRecorder: raw feed messages for end-of-day compaction
+        self._feed_calls = deque()  # fn() to run on the feed thread before the next tick
 
     def update_spot(self, price):
         self.spot = price
+        self.last_tick_ts = time.time()
+        self._spot_history.append((self.last_tick_ts, price))
+        self.feed.on_tick(SPOT_TOKEN, self.last_tick_ts)
+        self.bars.on_tick(SPOT_TOKEN, self.last_tick_ts, price)
 
     def update_vix(self, vix):
         self.vix = vix
+        self.last_tick_ts = time.time()
+        self._vix_history.append((self.last_tick_ts, vix))
+        self.feed.on_tick(VIX_TOKEN, self.last_tick_ts)
+        self.bars.on_tick(VIX_TOKEN, self.last_tick_ts, vix)
+
+    def on_message(self, message):
+        """Route one SmartAPI feed message (spot, VIX, routed instrument or option contract)."""
+        while self._feed_calls:
+            self._feed_calls.popleft()()
+        if self.recorder is not None:
+            self.recorder.record(message, time.time())
+        token = str(message.get("token", ""))
+        if token == SPOT_TOKEN:
+            self.update_spot(message.get("last_traded_price", 0) / 100)
+            for fn in self._tick_listeners.get(SPOT_TOKEN, ()):
+                fn(token, message, self.last_tick_ts)
+        elif token == VIX_TOKEN:
+            self.update_vix(message.get("last_traded_price", 0) / 100)
+        elif token in self._routes:
+            now = time.time()
+            self.last_tick_ts = now
+            self.feed.on_tick(token, now)
+            self._routes[token](token, message, now)
+        else:
+            self.update_option(token, message)
 
-    def update_heavy(self, symbol, price):
-        self.heavy[symbol] = price
+    def add_route(self, tokens, fn):
+        """Send ticks of tokens to fn(token, message, ts) instead of the option chain."""
+        for token in tokens:
+            self._routes[str(token)] = fn
+
+    def routed(self, token):
+        return str(token) in self._routes
 
     def update_option(self, token, tick):
         """Update option tick; maintain LTP history for PDR."""
         self.option_chain[token] = tick
+        self.last_tick_ts = time.time()
+        self.feed.on_tick(token, self.last_tick_ts)
         ltp = tick.get("last_traded_price") or tick.get("ltp")
         if ltp is not None:
             if token not in self._option_ltp_history:
                 self._option_ltp_history[token] = deque(maxlen=PDR_LMS_WINDOW)
-            self._option_ltp_history[token].append((time.time(), ltp))
-        # Depth if present (for LMS)
-        depth = tick.get("depth") or tick.get("market_depth")
-        if depth:
-            best_bid = depth.get("buy", [{}])[0].get("price", 0) if isinstance(depth.get("buy"), list) else 0
-            best_ask = depth.get("sell", [{}])[0].get("price", 0) if isinstance(depth.get("sell"), list) else 0
-            spread = best_ask - best_bid if (best_bid and best_ask) else 0
-            self._depth_history.append((time.time(), best_bid, best_ask, spread))
+            self._option_ltp_history[token].append((self.last_tick_ts, ltp))
+            self.bars.on_tick(
+                token, self.last_tick_ts, ltp, tick.get("volume_trade_for_the_day")
+            )
+        if self._tick_listeners:
+            self._notify(token, tick, self.last_tick_ts)
+        # 5-level depth if present (SNAP_QUOTE) for LMS
+        levels = parse_depth(tick)
+        if levels:
+            self.depth.record(token, self.last_tick_ts, levels[0], levels[1])
+
+    def register_contracts(self, contracts):
+        """Record option basket metadata (see execution.option_symbol.get_option_chain)."""
+        for c in contracts:
+            self.contracts[c["token"]] = c
+
+    def option_premium(self, token):
+        """Option LTP in rupees (feed sends paise), or None."""
+        tick = self.option_chain.get(token)
+        if not tick:
+            return None
+        ltp = tick.get("last_traded_price")
+        return ltp / 100 if ltp else None
+
+    def call_on_feed(self, fn):
+        """Run fn() on the feed thread before the next message (cache writes stay single-threaded)."""
+        self._feed_calls.append(fn)
+
+    def add_tick_listener(self, token, fn):
+        """Call fn(token, tick, ts) from the feed thread on each tick for token (None = all options)."""
+        self._tick_listeners.setdefault(token, []).append(fn)
+
+    def _notify(self, token, tick, ts):
+        for fn in self._tick_listeners.get(token, ()):
+            fn(token, tick, ts)
+        for fn in self._tick_listeners.get(None, ()):
+            fn(token, tick, ts)
 
     def set_oi_totals(self, put_oi, call_oi):
         self.put_oi_total = put_oi
@@ -65,10 +152,54 @@ class MarketCache:
         now = time.time()
         return [(t, ltp) for t, ltp in self._option_ltp_history[token] if now - t <= window_sec]
 
-    def get_depth_history(self, window_sec=300):
-        """Last N seconds of depth for LMS."""
+    def get_depth_history(self, token, window_sec=300):
+        """Last N seconds of depth for one token: (ts array, book array (n, 6, 5))."""
+        return self.depth.window(token, window_sec, time.time())
+
+    def get_spot_history(self, window_sec=300):
+        """Last N seconds of spot (ts, price), including backfilled points."""
         now = time.time()
-        return [(t, b, a, s) for t, b, a, s in self._depth_history if now - t <= window_sec]
+        return [(t, p) for t, p in self._spot_history if now - t <= window_sec]
+
+    # ---------- Gap backfill (reconnect) ----------
+
+    def backfill_spot(self, points):
+        """Merge (ts, price) points into spot history and rewrite the gap's filled bars. Returns number inserted."""
+        self.bars.backfill(SPOT_TOKEN, points)
+        return _merge_history(self._spot_history, points)
+
+    def backfill_vix(self, points):
+        """Merge (ts, vix) points into VIX history and bars. Returns number inserted."""
+        self.bars.backfill(VIX_TOKEN, points)
+        return _merge_history(self._vix_history, points)
+
+    def backfill_option(self, token, points):
+        """
+        Merge (ts, close) candle points (rupees) into an option's LTP history and bars,
+        which hold feed units (paise). Returns number inserted.
+        """
+        if token not in self._option_ltp_history:
+            self._option_ltp_history[token] = deque(maxlen=PDR_LMS_WINDOW)
+        points = [(ts, round(close * 100)) for ts, close in points]
+        self.bars.backfill(token, points)
+        return _merge_history(self._option_ltp_history[token], points)
+
+
+def _merge_history(history, points):
+    """
+    Insert (ts, value) points into a time-ordered deque, skipping timestamps already present.
+    Rebuilds the deque in place so existing references stay valid.
+    """
+    if not points:
+        return 0
+    existing = {t for t, _ in history}
+    new = [(t, v) for t, v in points if t not in existing]
+    if not new:
+        return 0
+    merged = sorted(list(history) + new, key=lambda p: p[0])
+    history.clear()
+    history.extend(merged)
+    return len(new)
 
 
 MARKET = MarketCache()
@@ -0,0 +1,225 @@
+"""
+Shared-memory tick ring (single writer, many readers) for the multi-process topology.
+The ingest process encodes each SmartAPI message into a fixed-size record; strategy
+processes attach by name and read with their own cursor (TickRingReader).
+
+Layout: 64-byte header [magic, capacity, write_seq, ...] followed by `capacity`
+TICK_DTYPE records. Sequence numbers start at 1; record n lives in slot (n-1) % capacity.
+Each slot is a seqlock: the writer zeroes `seq`, writes the fields, then stores n.
+A reader accepts a copied record only if `seq` equals the expected number both in the
+copy and after it, so a slot overwritten mid-read counts as lost. Readers that fall
+more than `capacity` records behind skip ahead and count the gap as lost (overflow).
+Prices stay in paise, exactly as the feed sends them.
+"""
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from config.settings import TICK_RING_CAPACITY
+
+MAGIC = 0x5449434B52494E47  # "TICKRING"
+HEADER_BYTES = 64
+H_MAGIC, H_CAPACITY, H_WRITE_SEQ = range(3)
+LEVELS = 5
+LATENCY_SAMPLES = 4096
+
+MODE_LTP, MODE_QUOTE, MODE_SNAP_QUOTE = 1, 2, 3
+
+TICK_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("recv_ts", "<f8"),  # ingest wall clock at decode (latency reference)
+        ("exchange_ts", "<i8"),
+        ("token", "S16"),
+        ("exchange_type", "u1"),
+        ("mode", "u1"),
+        ("ltp", "<i8"),
+        ("volume", "<i8"),
+        ("avg_price", "<i8"),
+        ("open", "<i8"),
+        ("high", "<i8"),
+        ("low", "<i8"),
+        ("close", "<i8"),
+        ("oi", "<i8"),
+        ("bid_px", "<i8", (LEVELS,)),
+        ("bid_qty", "<i8", (LEVELS,)),
+        ("bid_orders", "<i8", (LEVELS,)),
+        ("ask_px", "<i8", (LEVELS,)),
+        ("ask_qty", "<i8", (LEVELS,)),
+        ("ask_orders", "<i8", (LEVELS,)),
+    ]
+)
+
+# SmartAPI message key -> record field (QUOTE / SNAP_QUOTE extras)
+_SCALARS = (
+    ("volume_trade_for_the_day", "volume"),
+    ("average_traded_price", "avg_price"),
+    ("open_price_of_the_day", "open"),
+    ("high_price_of_the_day", "high"),
+    ("low_price_of_the_day", "low"),
+    ("closed_price", "close"),
+    ("open_interest", "oi"),
+)
+
+
+class TickRing:
+
+    def __init__(self, name=None, capacity=TICK_RING_CAPACITY, create=True):
+        """create=True allocates a new segment (ingest side); False attaches to `name`."""
+        if create:
+            size = HEADER_BYTES + capacity * TICK_DTYPE.itemsize
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((HEADER_BYTES // 8,), dtype=np.uint64, buffer=self.shm.buf)
+        if create:
+            self.header[:] = 0
+            self.header[H_MAGIC] = MAGIC
+            self.header[H_CAPACITY] = capacity
+        elif self.header[H_MAGIC] != MAGIC:
+            raise ValueError(f"{name} is not a tick ring")
+        self.capacity = int(self.header[H_CAPACITY])
+        self.records = np.ndarray(
+            (self.capacity,), dtype=TICK_DTYPE, buffer=self.shm.buf, offset=HEADER_BYTES
+        )
+        self.name = self.shm.name
+        self.owner = create
+
+    @property
+    def write_seq(self):
+        return int(self.header[H_WRITE_SEQ])
+
+    def publish(self, message, recv_ts=None):
+        """Encode one SmartAPI message into the next slot (writer only). Returns its seq."""
+        n = int(self.header[H_WRITE_SEQ]) + 1
+        slot = self.records[(n - 1) % self.capacity]
+        slot["seq"] = 0  # slot is being written
+        encode(slot, message, time.time() if recv_ts is None else recv_ts)
+        slot["seq"] = n
+        self.header[H_WRITE_SEQ] = n
+        return n
+
+    def close(self):
+        """Detach; the creating side also unlinks the segment."""
+        self.header = None
+        self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def encode(slot, message, recv_ts):
+    """Write one SmartAPI message into a TICK_DTYPE record (ring slot or recorder row)."""
+    slot["recv_ts"] = recv_ts
+    slot["exchange_ts"] = message.get("exchange_timestamp") or 0
+    slot["token"] = str(message.get("token", "")).encode()
+    slot["exchange_type"] = message.get("exchange_type") or 0
+    slot["mode"] = message.get("subscription_mode") or MODE_LTP
+    slot["ltp"] = message.get("last_traded_price") or 0
+    for key, field in _SCALARS:
+        slot[field] = message.get(key) or 0
+    _encode_side(slot, message.get("best_5_buy_data"), "bid_px", "bid_qty", "bid_orders")
+    _encode_side(slot, message.get("best_5_sell_data"), "ask_px", "ask_qty", "ask_orders")
+
+
+def _encode_side(slot, levels, px, qty, orders):
+    if not levels:
+        slot[px] = 0
+        slot[qty] = 0
+        slot[orders] = 0
+        return
+    p, q, o = slot[px], slot[qty], slot[orders]
+    for i in range(LEVELS):
+        if i < len(levels):
+            lvl = levels[i]
+            p[i] = lvl.get("price", 0)
+            q[i] = lvl.get("quantity", 0)
+            o[i] = lvl.get("no of orders", 0)
+        else:
+            p[i] = q[i] = o[i] = 0
+
+
+def decode(record):
+    """Record -> SmartAPI-shaped message dict (what AngelWS.on_data would have received)."""
+    message = {
+        "token": record["token"].decode(),
+        "exchange_type": int(record["exchange_type"]),
+        "subscription_mode": int(record["mode"]),
+        "exchange_timestamp": int(record["exchange_ts"]),
+        "last_traded_price": int(record["ltp"]),
+    }
+    if record["mode"] >= MODE_QUOTE:
+        for key, field in _SCALARS:
+            message[key] = int(record[field])
+    if record["mode"] == MODE_SNAP_QUOTE:
+        message["best_5_buy_data"] = _decode_side(record, "bid_px", "bid_qty", "bid_orders")
+        message["best_5_sell_data"] = _decode_side(record, "ask_px", "ask_qty", "ask_orders")
+    return message
+
+
+def _decode_side(record, px, qty, orders):
+    return [
+        {"price": int(p), "quantity": int(q), "no of orders": int(o)}
+        for p, q, o in zip(record[px], record[qty], record[orders])
+    ]
+
+
+class TickRingReader:
+    """One consumer cursor over a TickRing. Each strategy process owns its own reader."""
+
+    def __init__(self, ring, from_start=False):
+        self.ring = ring
+        self.cursor = 1 if from_start else ring.write_seq + 1  # next seq to read
+        self.read = 0
+        self.lost = 0  # overflowed or overwritten mid-read
+        self._latency = np.zeros(LATENCY_SAMPLES, dtype=np.float64)
+        self._latency_n = 0
+
+    def poll(self, max_records=1024, now=None):
+        """Copy out up to max_records new records (oldest first) as a structured array."""
+        ring = self.ring
+        w = int(ring.header[H_WRITE_SEQ])
+        if self.cursor > w:
+            return ring.records[:0].copy()
+        oldest = max(1, w - ring.capacity + 1)
+        if self.cursor < oldest:
+            self.lost += oldest - self.cursor
+            self.cursor = oldest
+        n = min(w - self.cursor + 1, max_records)
+        expected = np.arange(self.cursor, self.cursor + n, dtype=np.uint64)
+        idx = (expected - 1) % ring.capacity
+        out = ring.records[idx]
+        # Seqlock check: seq in the copy and in the slot afterwards must both match
+        good = (out["seq"] == expected) & (ring.records["seq"][idx] == expected)
+        self.cursor += n
+        if not good.all():
+            self.lost += int(n - good.sum())
+            out = out[good]
+        self.read += len(out)
+        self._record_latency(out["recv_ts"], time.time() if now is None else now)
+        return out
+
+    def _record_latency(self, recv_ts, now):
+        k = len(recv_ts)
+        if not k:
+            return
+        lat = now - recv_ts[-LATENCY_SAMPLES:]
+        pos = (self._latency_n + np.arange(len(lat))) % LATENCY_SAMPLES
+        self._latency[pos] = lat
+        self._latency_n += k
+
+    def lag(self):
+        """Records published but not yet read."""
+        return max(0, self.ring.write_seq - self.cursor + 1)
+
+    def stats(self):
+        """Read/lost counters and ingest-to-consume latency over the last samples (ms)."""
+        n = min(self._latency_n, LATENCY_SAMPLES)
+        lat = self._latency[:n] * 1000
+        return {
+            "read": self.read,
+            "lost": self.lost,
+            "lag": self.lag(),
+            "p50_ms": round(float(np.percentile(lat, 50)), 3) if n else None,
+            "p99_ms": round(float(np.percentile(lat, 99)), 3) if n else None,
+            "max_ms": round(float(lat.max()), 3) if n else None,
+        }
@@ -0,0 +1,106 @@
+"""
+Raw tick recorder (input of the end-of-day compaction, data/store/tick_store.py).
+MARKET.on_message hands every feed message to record(); it is encoded in place into a
+preallocated TICK_DTYPE chunk (same record layout as the shared-memory tick ring).
+Full chunks, or partial ones every TICK_RECORD_FLUSH_SEC, are appended by a background
+thread to logs/YYYY-MM-DD/ticks.bin. The feed thread never touches the disk.
+The chunk buffer is guarded by a lock: flush() hands off the partial chunk from the
+main loop while the feed (or tick-pump) thread may still be recording.
+"""
+import json
+import os
+import threading
+from collections import deque
+from datetime import datetime
+import numpy as np
+from config.settings import EVENT_LOG_DIR, TICK_RECORD_CHUNK, TICK_RECORD_FLUSH_SEC
+from data.cache.tick_ring import TICK_DTYPE, encode
+from ops.event_log import LOG
+
+RAW_FILE = "ticks.bin"
+CONTRACTS_FILE = "contracts.json"
+
+
+def raw_path(day, log_dir=EVENT_LOG_DIR):
+    return os.path.join(log_dir, day, RAW_FILE)
+
+
+def contracts_path(day, log_dir=EVENT_LOG_DIR):
+    return os.path.join(log_dir, day, CONTRACTS_FILE)
+
+
+class TickRecorder:
+
+    def __init__(self, log_dir=EVENT_LOG_DIR, chunk=TICK_RECORD_CHUNK, flush_sec=TICK_RECORD_FLUSH_SEC):
+        self.log_dir = log_dir
+        self.chunk = chunk
+        self.flush_sec = flush_sec
+        self.count = 0
+        self.written = 0
+        self._buf = np.zeros(chunk, dtype=TICK_DTYPE)
+        self._n = 0
+        self._last_handoff = 0.0
+        self._pending = deque()  # full/partial chunks waiting for the writer
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._io_lock = threading.Lock()
+        self._buf_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="tick-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, message, ts):
+        """Append one feed message."""
+        with self._buf_lock:
+            row = self._buf[self._n]
+            encode(row, message, ts)
+            self.count += 1
+            row["seq"] = self.count
+            self._n += 1
+            if self._n == self.chunk or ts - self._last_handoff >= self.flush_sec:
+                self._handoff(ts)
+
+    def _handoff(self, ts):
+        """Queue the current chunk for the writer (caller holds _buf_lock)."""
+        if self._n:
+            self._pending.append(self._buf[: self._n])
+            self._buf = np.zeros(self.chunk, dtype=TICK_DTYPE)
+            self._n = 0
+            self._wake.set()
+        self._last_handoff = ts
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        with self._io_lock:
+            while self._pending:
+                rows = self._pending.popleft()
+                day = datetime.fromtimestamp(float(rows["recv_ts"][0])).strftime("%Y-%m-%d")
+                try:
+                    os.makedirs(os.path.join(self.log_dir, day), exist_ok=True)
+                    with open(raw_path(day, self.log_dir), "ab") as f:
+                        rows.tofile(f)
+                    self.written += len(rows)
+                except OSError as e:
+                    LOG.error("tick_record_failed", str(e), rows=len(rows))
+
+    def flush(self):
+        """Write everything recorded so far (any thread)."""
+        with self._buf_lock:
+            self._handoff(self._last_handoff)
+        self._drain()
+
+    def save_contracts(self, contracts, day):
+        """Persist token metadata (symbol, strike, side, expiry) used to partition the day."""
+        os.makedirs(os.path.join(self.log_dir, day), exist_ok=True)
+        with open(contracts_path(day, self.log_dir), "w", encoding="utf-8") as f:
+            json.dump(contracts, f)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=2)
+        self._drain()
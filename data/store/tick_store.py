@@ -0,0 +1,218 @@
+"""
+Partitioned columnar tick store (end-of-day compaction + query API).
+compact_day() turns logs/YYYY-MM-DD/ticks.bin (TickRecorder) into one directory per
+partition:
+    TICK_STORE_DIR/date=YYYY-MM-DD/index=NIFTY/expiry=<DDMMMYY|none>/token=<token>/
+        ts.npy, ltp.npy, ...   one .npy per column, sorted by ts (prices in rupees)
+        meta.json              rows, ts_min/ts_max, ltp_min/ltp_max, contract fields
+and a per-day _manifest.json with every partition's meta. TickStore.query() prunes on
+date/index/expiry/token and the meta min/max, then memory-maps only the needed
+columns and slices the time range by binary search on ts, so a query never reads a
+whole day.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+import numpy as np
+from config.settings import EVENT_LOG_DIR, TICK_STORE_DIR, INDEX
+from data.cache.tick_ring import TICK_DTYPE, MODE_QUOTE, MODE_SNAP_QUOTE
+from data.store.tick_recorder import raw_path, contracts_path
+from ops.event_log import LOG
+
+MANIFEST = "_manifest.json"
+NO_EXPIRY = "none"  # spot, VIX and other non-derivative tokens
+
+PRICE_COLUMNS = ("ltp", "avg_price", "open", "high", "low", "close")
+QUOTE_COLUMNS = ("volume", "avg_price", "open", "high", "low", "close", "oi")
+DEPTH_COLUMNS = ("bid_px", "bid_qty", "bid_orders", "ask_px", "ask_qty", "ask_orders")
+
+
+def partition_dir(store_dir, day, index, expiry, token):
+    return os.path.join(
+        store_dir, f"date={day}", f"index={index}", f"expiry={expiry or NO_EXPIRY}", f"token={token}"
+    )
+
+
+def compact_day(day, log_dir=EVENT_LOG_DIR, store_dir=TICK_STORE_DIR, index=INDEX):
+    """Compact one day's raw ticks into partitions. Returns the manifest (list of metas)."""
+    raw = np.fromfile(raw_path(day, log_dir), dtype=TICK_DTYPE)
+    contracts = {}
+    if os.path.exists(contracts_path(day, log_dir)):
+        with open(contracts_path(day, log_dir), encoding="utf-8") as f:
+            contracts = json.load(f)
+    manifest = []
+    if len(raw):
+        raw = raw[np.lexsort((raw["recv_ts"], raw["token"]))]
+        tokens, starts = np.unique(raw["token"], return_index=True)
+        bounds = list(starts[1:]) + [len(raw)]
+        for token_b, lo, hi in zip(tokens, starts, bounds):
+            token = token_b.decode()
+            manifest.append(_write_partition(store_dir, day, index, token, raw[lo:hi], contracts.get(token)))
+    day_dir = os.path.join(store_dir, f"date={day}")
+    os.makedirs(day_dir, exist_ok=True)
+    with open(os.path.join(day_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def end_of_day(recorder, contracts, day):
+    """Flush the recorder, save contract metadata and compact `day` on a background thread."""
+    recorder.flush()
+    recorder.save_contracts(contracts, day)
+
+    def run():
+        try:
+            manifest = compact_day(day, recorder.log_dir)
+        except Exception as e:
+            LOG.error("tick_compaction_failed", str(e), day=day)
+            return
+        LOG.info("ticks_compacted", day=day, partitions=len(manifest), rows=sum(m["rows"] for m in manifest))
+
+    thread = threading.Thread(target=run, name="tick-compaction", daemon=True)
+    thread.start()
+    return thread
+
+
+def _write_partition(store_dir, day, index, token, rows, contract):
+    contract = contract or {}
+    expiry = contract.get("expiry") or NO_EXPIRY
+    path = partition_dir(store_dir, day, index, expiry, token)
+    os.makedirs(path, exist_ok=True)
+    columns = {"ts": rows["recv_ts"], "exchange_ts": rows["exchange_ts"], "ltp": rows["ltp"] / 100.0}
+    if (rows["mode"] >= MODE_QUOTE).any():
+        for name in QUOTE_COLUMNS:
+            columns[name] = rows[name] / 100.0 if name in PRICE_COLUMNS else rows[name]
+    if (rows["mode"] == MODE_SNAP_QUOTE).any():
+        for name in DEPTH_COLUMNS:
+            columns[name] = rows[name] / 100.0 if name.endswith("_px") else rows[name]
+    for name, values in columns.items():
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(values))
+    meta = {
+        "date": day,
+        "index": index,
+        "expiry": expiry,
+        "token": token,
+        "symbol": contract.get("symbol"),
+        "strike": contract.get("strike"),
+        "side": contract.get("side"),
+        "rows": int(len(rows)),
+        "ts_min": float(columns["ts"][0]),
+        "ts_max": float(columns["ts"][-1]),
+        "ltp_min": float(columns["ltp"].min()),
+        "ltp_max": float(columns["ltp"].max()),
+        "columns": sorted(columns),
+    }
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def _to_ts(value):
+    """Epoch seconds from None / number / datetime / 'YYYY-MM-DD[ HH:MM[:SS]]'."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized time: {value}")
+
+
+class TickStore:
+
+    def __init__(self, store_dir=TICK_STORE_DIR):
+        self.store_dir = store_dir
+
+    def days(self):
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(d[5:] for d in os.listdir(self.store_dir) if d.startswith("date="))
+
+    def partitions(self, tokens=None, start=None, end=None, index=None, expiry=None, price=None):
+        """Metas of partitions that can hold matching rows (pruned on names and min/max)."""
+        start, end = _to_ts(start), _to_ts(end)
+        # Day pruning from the directory name (a day covers [00:00, 24:00) local time)
+        first = datetime.fromtimestamp(start).strftime("%Y-%m-%d") if start is not None else None
+        last = datetime.fromtimestamp(end).strftime("%Y-%m-%d") if end is not None else None
+        tokens = None if tokens is None else {str(t) for t in tokens}
+        out = []
+        for day in self.days():
+            if (first and day < first) or (last and day > last):
+                continue
+            with open(os.path.join(self.store_dir, f"date={day}", MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+            for meta in manifest:
+                if index is not None and meta["index"] != index:
+                    continue
+                if expiry is not None and meta["expiry"] != expiry:
+                    continue
+                if tokens is not None and meta["token"] not in tokens:
+                    continue
+                if start is not None and meta["ts_max"] < start:
+                    continue
+                if end is not None and meta["ts_min"] > end:
+                    continue
+                if price is not None and (meta["ltp_max"] < price[0] or meta["ltp_min"] > price[1]):
+                    continue
+                out.append(meta)
+        return out
+
+    def query(
+        self,
+        tokens=None,
+        start=None,
+        end=None,
+        columns=("ltp",),
+        index=None,
+        expiry=None,
+        price=None,
+        as_frame=False,
+    ):
+        """
+        Rows with start <= ts <= end for the selected partitions, ordered by ts.
+        Returns {"token", "ts", <columns>} NumPy arrays, or a pandas DataFrame (as_frame).
+        price: (lo, hi) ltp filter, also used to prune partitions.
+        """
+        start, end = _to_ts(start), _to_ts(end)
+        want = [c for c in columns if c not in ("ts", "token")]
+        if price is not None and "ltp" not in want:
+            want.append("ltp")
+        parts = {name: [] for name in ["ts"] + want}
+        token_col = []
+        for meta in self.partitions(tokens, start, end, index, expiry, price):
+            path = partition_dir(self.store_dir, meta["date"], meta["index"], meta["expiry"], meta["token"])
+            ts = np.load(os.path.join(path, "ts.npy"), mmap_mode="r")
+            lo = 0 if start is None else int(np.searchsorted(ts, start, "left"))
+            hi = len(ts) if end is None else int(np.searchsorted(ts, end, "right"))
+            if hi <= lo:
+                continue
+            chunk = {"ts": np.array(ts[lo:hi])}
+            for name in want:
+                if name in meta["columns"]:
+                    chunk[name] = np.array(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")[lo:hi])
+                else:
+                    shape = (hi - lo, 5) if name in DEPTH_COLUMNS else hi - lo
+                    chunk[name] = np.full(shape, np.nan)
+            if price is not None:
+                keep = (chunk["ltp"] >= price[0]) & (chunk["ltp"] <= price[1])
+                chunk = {k: v[keep] for k, v in chunk.items()}
+            for name, values in chunk.items():
+                parts[name].append(values)
+            token_col.append(np.full(len(chunk["ts"]), meta["token"], dtype=object))
+        result = {"token": np.concatenate(token_col) if token_col else np.empty(0, dtype=object)}
+        for name, values in parts.items():
+            result[name] = np.concatenate(values) if values else np.empty(0)
+        order = np.argsort(result["ts"], kind="stable")
+        result = {k: v[order] for k, v in result.items()}
+        if price is not None and "ltp" not in columns:
+            result.pop("ltp")
+        if as_frame:
+            import pandas as pd
+
+            frame = {k: (list(v) if v.ndim > 1 else v) for k, v in result.items()}
+            return pd.DataFrame(frame)
+        return result
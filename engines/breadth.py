@@ -0,0 +1,135 @@
+"""
+Weighted index breadth engine (per spec Participation / OI dynamics in Leading Score).
+Consumes QUOTE-mode ticks of the index constituents (BREADTH_CONSTITUENTS): LTP and
+closed_price (previous session close), both in paise. Keeps, in O(1) per tick, the
+index-weighted advancing / declining weight and the weighted % change vs the previous
+close: a tick only replaces its constituent's old contribution to the running sums.
+score() maps both to a participation score 0-1 (0.5 neutral, > 0.6 broad strength,
+< 0.4 broad weakness), None until BREADTH_MIN_COVERAGE of the index weight has a close.
+"""
+from config.settings import (
+    INDEX,
+    BREADTH_CONSTITUENTS,
+    BREADTH_AD_WEIGHT,
+    BREADTH_CHANGE_FULL_PCT,
+    BREADTH_MIN_COVERAGE,
+)
+
+
+class BreadthEngine:
+
+    def __init__(
+        self,
+        constituents=None,
+        ad_weight=BREADTH_AD_WEIGHT,
+        change_full_pct=BREADTH_CHANGE_FULL_PCT,
+        min_coverage=BREADTH_MIN_COVERAGE,
+    ):
+        """constituents: [(symbol, token, weight)]; default BREADTH_CONSTITUENTS[INDEX]."""
+        if constituents is None:
+            constituents = BREADTH_CONSTITUENTS[INDEX]
+        total = float(sum(c[2] for c in constituents))
+        self.symbols = [c[0] for c in constituents]
+        self.tokens = [str(c[1]) for c in constituents]
+        self.weights = [c[2] / total for c in constituents]
+        self._index = {token: i for i, token in enumerate(self.tokens)}
+        self.ad_weight = ad_weight
+        self.change_full_pct = change_full_pct
+        self.min_coverage = min_coverage
+        n = len(constituents)
+        self.ltp = [None] * n
+        self.prev_close = [None] * n
+        self._sign = [0] * n  # +1 advancing, -1 declining, 0 unchanged
+        self._change = [0.0] * n  # % change vs previous close
+        self._ready = [False] * n
+        # Running sums over constituents with a previous close
+        self.coverage = 0.0  # weight
+        self.adv_weight = 0.0
+        self.dec_weight = 0.0
+        self.weighted_change = 0.0  # sum of weight x % change
+        self.advancers = 0
+        self.decliners = 0
+
+    def on_tick(self, token, tick, ts=None):
+        """MarketCache route for constituent tokens (QUOTE mode)."""
+        i = self._index.get(token)
+        if i is None:
+            return
+        ltp = tick.get("last_traded_price")
+        close = tick.get("closed_price")
+        if close:
+            self.prev_close[i] = close / 100
+        if ltp:
+            self.ltp[i] = ltp / 100
+        self._update(i)
+
+    def set_prev_close(self, token, price):
+        """Seed a previous close (e.g. from daily candles) before the first QUOTE tick."""
+        i = self._index.get(str(token))
+        if i is not None and price:
+            self.prev_close[i] = price
+            self._update(i)
+
+    def _update(self, i):
+        ltp, prev = self.ltp[i], self.prev_close[i]
+        if ltp is None or not prev:
+            return
+        w = self.weights[i]
+        if self._ready[i]:
+            # Remove the old contribution
+            old = self._sign[i]
+            if old > 0:
+                self.adv_weight -= w
+                self.advancers -= 1
+            elif old < 0:
+                self.dec_weight -= w
+                self.decliners -= 1
+            self.weighted_change -= w * self._change[i]
+        else:
+            self._ready[i] = True
+            self.coverage += w
+        change = (ltp / prev - 1.0) * 100
+        sign = (change > 0) - (change < 0)
+        if sign > 0:
+            self.adv_weight += w
+            self.advancers += 1
+        elif sign < 0:
+            self.dec_weight += w
+            self.decliners += 1
+        self.weighted_change += w * change
+        self._sign[i] = sign
+        self._change[i] = change
+
+    def change_pct(self):
+        """Weighted % change of the covered constituents vs previous close."""
+        return self.weighted_change / self.coverage if self.coverage > 0 else None
+
+    def score(self):
+        """Participation 0-1 from weighted A/D balance and weighted % change, or None."""
+        if self.coverage < self.min_coverage:
+            return None
+        ad = (self.adv_weight - self.dec_weight) / self.coverage
+        move = self.weighted_change / self.coverage / self.change_full_pct
+        move = max(-1.0, min(1.0, move))
+        return 0.5 + 0.5 * (self.ad_weight * ad + (1 - self.ad_weight) * move)
+
+    def recompute(self):
+        """Rebuild the running sums from per-constituent state (drift check)."""
+        self.coverage = self.adv_weight = self.dec_weight = self.weighted_change = 0.0
+        self.advancers = self.decliners = 0
+        self._ready = [False] * len(self.tokens)
+        for i in range(len(self.tokens)):
+            self._update(i)
+
+    def report(self):
+        score = self.score()
+        change = self.change_pct()
+        return {
+            "advancers": self.advancers,
+            "decliners": self.decliners,
+            "adv_weight": round(self.adv_weight, 4),
+            "dec_weight": round(self.dec_weight, 4),
+            "change_pct": None if change is None else round(change, 3),
+            "coverage": round(self.coverage, 4),
+            "score": None if score is None else round(score, 3),
+        }
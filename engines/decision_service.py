@@ -0,0 +1,223 @@
+"""
+Off-loop decision service (per spec AI Decision Engine).
+Decision providers (rule-based, an LLM client, or the latency stub) run on a worker
+pool so a slow provider never stalls the strategy loop. Every request has a hard
+deadline: on timeout, exception or malformed output the spec's safety fallback
+(HOLD, CONFIDENCE_FALLBACK) is published instead. Results are cached by a quantized
+MarketContext fingerprint; the loop only ever reads the latest completed decision.
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from config.settings import (
+    CONFIDENCE_FALLBACK,
+    DECISION_WORKERS,
+    DECISION_DEADLINE_SEC,
+    DECISION_CACHE_TTL_SEC,
+    DECISION_CACHE_SIZE,
+    DECISION_STUB_LATENCY_SEC,
+)
+from engines.decision_engine import (
+    rule_based_decision,
+    strike_guidance,
+    ACTION_TRADE_CE,
+    ACTION_TRADE_PE,
+    ACTION_HOLD,
+    ACTION_EXIT_ALL,
+    ACTION_REVERSE,
+)
+from ops.event_log import LOG
+
+VALID_ACTIONS = (ACTION_TRADE_CE, ACTION_TRADE_PE, ACTION_HOLD, ACTION_EXIT_ALL, ACTION_REVERSE)
+
+
+def market_context(context, participation, vol_status, decay_ok, bull, bear,
+                   combined_score_val, pdr_penalty_val):
+    """MarketContext dict: the inputs of rule_based_decision by name."""
+    return {
+        "context": context,
+        "participation": participation,
+        "vol_status": vol_status,
+        "decay_ok": decay_ok,
+        "bull": bull,
+        "bear": bear,
+        "combined_score": combined_score_val,
+        "pdr_penalty": pdr_penalty_val,
+    }
+
+
+def fingerprint(ctx):
+    """Quantized, hashable MarketContext: participation to 0.05, score to 2.5 points."""
+    part = ctx.get("participation")
+    score = ctx.get("combined_score")
+    return (
+        ctx.get("context"),
+        None if part is None else round(part * 20),
+        ctx.get("vol_status"),
+        bool(ctx.get("decay_ok")),
+        bool(ctx.get("bull")),
+        bool(ctx.get("bear")),
+        None if score is None else round(score / 2.5),
+        ctx.get("pdr_penalty"),
+    )
+
+
+def fallback_decision(reason):
+    """Spec safety fallback: HOLD at CONFIDENCE_FALLBACK (below execution threshold)."""
+    return {
+        "action": ACTION_HOLD,
+        "confidence": CONFIDENCE_FALLBACK,
+        "reasoning": reason,
+        "strikeGuidance": strike_guidance(),
+    }
+
+
+def validate_decision(decision):
+    """Return a normalized copy if decision matches the spec schema, else None."""
+    if not isinstance(decision, dict):
+        return None
+    action = decision.get("action")
+    confidence = decision.get("confidence")
+    if action not in VALID_ACTIONS:
+        return None
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+        return None
+    if not 0 <= confidence <= 100:
+        return None
+    guidance = decision.get("strikeGuidance")
+    return {
+        "action": action,
+        "confidence": confidence,
+        "reasoning": str(decision.get("reasoning", "")),
+        "strikeGuidance": guidance if isinstance(guidance, dict) else strike_guidance(),
+    }
+
+
+class RuleBasedProvider:
+    """rule_based_decision behind the provider interface: fn(ctx) -> decision dict."""
+
+    def __call__(self, ctx):
+        return rule_based_decision(
+            ctx["context"],
+            ctx["participation"],
+            ctx["vol_status"],
+            ctx["decay_ok"],
+            ctx["bull"],
+            ctx["bear"],
+            ctx["combined_score"],
+            ctx["pdr_penalty"],
+        )
+
+
+class StubProvider:
+    """Test provider: sleeps `latency_sec`, then returns `response` (or the rule-based answer)."""
+
+    def __init__(self, latency_sec=DECISION_STUB_LATENCY_SEC, response=None):
+        self.latency_sec = latency_sec
+        self.response = response
+        self._rules = RuleBasedProvider()
+
+    def __call__(self, ctx):
+        time.sleep(self.latency_sec)
+        if self.response is not None:
+            return self.response
+        return self._rules(ctx)
+
+
+class DecisionService:
+
+    def __init__(
+        self,
+        provider,
+        workers=DECISION_WORKERS,
+        deadline_sec=DECISION_DEADLINE_SEC,
+        cache_ttl_sec=DECISION_CACHE_TTL_SEC,
+        cache_size=DECISION_CACHE_SIZE,
+    ):
+        self.provider = provider
+        self.deadline_sec = deadline_sec
+        self.cache_ttl_sec = cache_ttl_sec
+        self.cache_size = cache_size
+        self.stats = {"submitted": 0, "cache_hits": 0, "timeouts": 0, "invalid": 0, "errors": 0}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decision")
+        self._cache = OrderedDict()  # fingerprint -> (ts, decision)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._resolved = set()  # seqs already answered (result or deadline)
+        self._latest = None
+        self._latest_seq = 0
+
+    def submit(self, ctx):
+        """Request a decision for ctx without blocking. Returns the request sequence number."""
+        now = time.time()
+        key = fingerprint(ctx)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self.stats["submitted"] += 1
+            hit = self._cache.get(key)
+            if hit is not None and now - hit[0] <= self.cache_ttl_sec:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                self._publish_locked(seq, dict(hit[1]), now, source="cache")
+                return seq
+        future = self._pool.submit(self.provider, ctx)
+        timer = threading.Timer(self.deadline_sec, self._on_deadline, (seq, now))
+        timer.daemon = True
+        timer.start()
+        future.add_done_callback(lambda f: self._on_done(seq, key, now, f, timer))
+        return seq
+
+    def latest(self):
+        """(seq, decision) of the most recent completed request, or (0, None)."""
+        return self._latest_seq, self._latest
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _on_done(self, seq, key, submitted_ts, future, timer):
+        timer.cancel()
+        try:
+            decision = validate_decision(future.result())
+            if decision is None:
+                with self._lock:
+                    self.stats["invalid"] += 1
+                decision, source = fallback_decision("Decision provider returned malformed output."), "fallback"
+            else:
+                source = "provider"
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            LOG.error("decision_provider_error", str(e))
+            decision, source = fallback_decision("Decision engine fallback (error)."), "fallback"
+        with self._lock:
+            if source == "provider":
+                self._cache[key] = (time.time(), decision)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            if seq in self._resolved:
+                self._resolved.discard(seq)  # deadline already answered; result only cached
+                return
+            self._publish_locked(seq, dict(decision), submitted_ts, source)
+
+    def _on_deadline(self, seq, submitted_ts):
+        with self._lock:
+            if seq <= self._latest_seq and seq not in self._resolved:
+                return  # already answered by the provider
+            self.stats["timeouts"] += 1
+            self._resolved.add(seq)
+            self._publish_locked(
+                seq, fallback_decision("Decision deadline exceeded."), submitted_ts, "timeout"
+            )
+
+    def _publish_locked(self, seq, decision, submitted_ts, source):
+        """Publish unless a newer request has already been answered (caller holds lock)."""
+        if seq < self._latest_seq:
+            return
+        decision["timestamp"] = submitted_ts  # age is measured from the inputs' time
+        decision["latency_ms"] = round((time.time() - submitted_ts) * 1000, 1)
+        decision["source"] = source
+        self._latest = decision
+        self._latest_seq = seq
@@ -6,6 +6,13 @@ Lagging: RSI(14), MA crossover 9/21, Historical Volatility (max 35).
 PDR Penalty: 0 to -10 (premium decay over 5 min).
 """
 import time
+import numpy as np
+from config.settings import (
+    LMS_WINDOW_SEC,
+    LMS_SHORT_SEC,
+    LMS_LIQUIDITY_GAIN,
+    LMS_IMBALANCE_GAIN,
+)
 from data.cache.market_cache import MARKET
 
 
@@ -92,23 +99,47 @@ def pdr_penalty(option_ltp_history_5min):
     return penalty
 
 
-def lms_score(depth_history_5min):
+def lms_scores(ts, liquidity, imbalance, now, window_sec=LMS_WINDOW_SEC, short_sec=LMS_SHORT_SEC):
     """
-    Liquidity Momentum Score 0-10: rate of change in 5-level depth over last 5 min.
-    Positive = institutional liquidity inflow.
+    Liquidity Momentum Score 0-10 for every token row at once (per spec: rate of change
+    in 5-level depth over last 5 min; positive = institutional liquidity inflow).
+    ts, liquidity, imbalance: (tokens, n) arrays from DepthHistory.snapshot().
+    Compares the last `short_sec` against the rest of the `window_sec` lookback:
+    change in total resting quantity (bid + ask, all levels) and in bid/ask imbalance.
+    Rows without snapshots in both sub-windows score neutral 5.
     """
-    if not depth_history_5min or len(depth_history_5min) < 2:
-        return 5.0  # neutral
-    # Use spread narrowing as proxy for liquidity improvement
-    spreads = [s for (_, _, _, s) in depth_history_5min if s is not None]
-    if len(spreads) < 2:
+    if ts.size == 0:
+        return np.full(ts.shape[0], 5.0)
+    in_window = (ts >= now - window_sec) & (ts > 0)
+    recent = in_window & (ts >= now - short_sec)
+    base = in_window & ~recent
+    n_recent = recent.sum(axis=1)
+    n_base = base.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        liq_recent = (liquidity * recent).sum(axis=1) / n_recent
+        liq_base = (liquidity * base).sum(axis=1) / n_base
+        imb_recent = (imbalance * recent).sum(axis=1) / n_recent
+        imb_base = (imbalance * base).sum(axis=1) / n_base
+        roc = (liq_recent - liq_base) / liq_base
+    score = 5 + roc * LMS_LIQUIDITY_GAIN + (imb_recent - imb_base) * LMS_IMBALANCE_GAIN
+    valid = (n_recent > 0) & (n_base > 0) & (liq_base > 0)
+    return np.clip(np.where(valid, score, 5.0), 0, 10)
+
+
+def lms_score(token=None, now=None):
+    """
+    LMS 0-10 for one option token, or the basket average when token is None.
+    Neutral 5 when no depth has been recorded.
+    """
+    tokens, ts, liquidity, imbalance = MARKET.depth.snapshot()
+    if not tokens:
         return 5.0
-    old_avg = sum(spreads[: len(spreads) // 2]) / (len(spreads) // 2)
-    new_avg = sum(spreads[len(spreads) // 2 :]) / (len(spreads) - len(spreads) // 2)
-    if old_avg <= 0:
+    scores = lms_scores(ts, liquidity, imbalance, time.time() if now is None else now)
+    if token is None:
+        return float(scores.mean())
+    if token not in MARKET.depth.rows:
         return 5.0
-    change = (old_avg - new_avg) / old_avg  # narrowing = positive
-    return max(0, min(10, 5 + change * 50))
+    return float(scores[MARKET.depth.rows[token]])
 
 
 def ivs_score_stub():
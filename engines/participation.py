@@ -1,16 +1,11 @@
-from data.cache.market_cache import MARKET
+from engines.breadth import BreadthEngine
 
 
 class ParticipationEngine:
+    """Participation score 0-1 (None = not enough constituents yet) from index breadth."""
 
-    def score(self):
-
-        if not MARKET.heavy:
-            return 0
+    def __init__(self, breadth=None):
+        self.breadth = breadth or BreadthEngine()
 
-        bullish = 0
-        for p in MARKET.heavy.values():
-            if p > 0:
-                bullish += 1
-
-        return bullish / len(MARKET.heavy)
+    def score(self):
+        return self.breadth.score()
@@ -0,0 +1,306 @@
+"""
+Shadow-strategy runner: many parameterized variants of rule_based_decision evaluated
+side by side on the live strategy snapshots, with paper positions and PnL per variant.
+No orders are sent. The strategy loop only enqueues a snapshot dict; a background thread
+evaluates every variant at once as NumPy columns (one row per variant in the parameter
+table compiled from SHADOW_GRID) and keeps per-variant spot-level paper trades:
+SL = entry -/+ stop, target = target_ratio x stop, trailing SL 1% from the best price
+(PositionManager), checked on each snapshot, flat at the end of the day.
+Entries follow the live gates: only on snapshots flagged entry_gate (main.py sets it on
+passes that submit a decision, i.e. every decision_interval_seconds, and clear the market
+hours / feed check of step 5), at confidence >= the adaptive threshold (step 1), flat
+(step 4) and inside the daily loss and drawdown limits (step 6). Strike alignment (step 2)
+has no spot-level equivalent.
+PnL is spot points x qty x SHADOW_PNL_DELTA (premium ~ delta x spot move), as in
+backtest/vectorized.py. Each day's table is written to logs/YYYY-MM-DD/shadow.json.
+"""
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+import numpy as np
+from config.settings import (
+    EVENT_LOG_DIR,
+    LOT_SIZE,
+    MAX_TRADES,
+    MAX_DAILY_LOSS,
+    MAX_DRAWDOWN,
+    SHADOW_GRID,
+    SHADOW_CAPITAL,
+    SHADOW_PNL_DELTA,
+    SHADOW_QUEUE_MAX,
+    SHADOW_REPORT_SEC,
+    SHADOW_TOP_N,
+)
+from engines.contextual_risk import IST
+from ops.event_log import LOG
+
+SHADOW_FILE = "shadow.json"
+
+# Live rule_based_decision thresholds (variant 0 is always this row)
+LIVE_PARAMS = {
+    "participation_band": 0.1,  # CE if participation > 0.5 + band, PE if < 0.5 - band
+    "min_score": 30,
+    "pdr_block": -5,
+    "confidence": 72,
+    "require_supportive": 1,
+    "target_ratio": 1.5,
+    "stop_mult": 0.5,
+    "stop_min": 30,
+}
+
+
+def compile_variants(grid=None):
+    """Parameter table {name: array} of the cartesian product of grid over LIVE_PARAMS."""
+    grid = SHADOW_GRID if grid is None else grid
+    names = list(LIVE_PARAMS)
+    axes = [tuple(grid.get(name, (LIVE_PARAMS[name],))) for name in names]
+    rows = [tuple(LIVE_PARAMS[name] for name in names)]
+    rows += [row for row in itertools.product(*axes) if row != rows[0]]
+    table = np.array(rows, dtype=np.float64)
+    return {name: table[:, i] for i, name in enumerate(names)}
+
+
+def evaluate(params, snap):
+    """Per-variant (action, confidence) for one snapshot: +1 CE, -1 PE, 0 HOLD."""
+    part = snap.get("participation")
+    part = np.nan if part is None else part
+    score = snap.get("combined_score")
+    pdr = snap.get("pdr") or 0
+    band = params["participation_band"]
+    vol_ok = (params["require_supportive"] == 0) | (snap.get("vol_status") == "SUPPORTIVE")
+    decay_ok = bool(snap.get("decay_ok"))
+    pdr_blocked = pdr <= params["pdr_block"]
+    blocked = pdr_blocked | ((score < params["min_score"]) if score is not None else False)
+    ce = (snap.get("context") == "UPTREND") & (part > 0.5 + band) & vol_ok & decay_ok & bool(snap.get("bull"))
+    pe = (snap.get("context") == "DOWNTREND") & (part < 0.5 - band) & vol_ok & decay_ok & bool(snap.get("bear"))
+    action = np.select([blocked, ce, pe], [0, 1, -1], 0)
+    confidence = np.where(action != 0, params["confidence"], np.where(pdr_blocked, 45, 50))
+    return action, confidence
+
+
+class ShadowBook:
+    """Paper positions and PnL for every variant (columns indexed like the params table)."""
+
+    def __init__(self, params, capital=SHADOW_CAPITAL, pnl_delta=SHADOW_PNL_DELTA,
+                 max_trades=MAX_TRADES, max_daily_loss=MAX_DAILY_LOSS, max_drawdown=MAX_DRAWDOWN,
+                 lot_size=LOT_SIZE):
+        self.params = params
+        self.capital = capital
+        self.pnl_delta = pnl_delta
+        self.max_trades = max_trades
+        self.max_daily_loss = max_daily_loss
+        self.max_drawdown_limit = max_drawdown
+        self.lot_size = lot_size
+        n = len(params["min_score"])
+        self.n = n
+        self.side = np.zeros(n, dtype=np.int8)
+        self.entry = np.zeros(n)
+        self.sl = np.zeros(n)
+        self.target = np.zeros(n)
+        self.best = np.zeros(n)
+        self.qty = np.zeros(n)
+        self.realized = np.zeros(n)
+        self.unrealized = np.zeros(n)
+        self.trades = np.zeros(n, dtype=np.int64)
+        self.wins = np.zeros(n, dtype=np.int64)
+        self.day_trades = np.zeros(n, dtype=np.int64)
+        self.day_pnl = np.zeros(n)
+        self.hwm = np.zeros(n)
+        self.max_drawdown = np.zeros(n)
+        self.day_hwm = np.zeros(n)
+        self.day_breached = np.zeros(n, dtype=bool)
+        self.day = None
+        self.last_price = None
+        self.snapshots = 0
+
+    def on_snapshot(self, snap):
+        """Exits, then entries (on entry_gate snapshots), then marks at snap["spot"] for every variant."""
+        price = snap["spot"]
+        self._exits(price)
+        if snap.get("entry_gate", True):
+            self._entries(price, snap)
+        self.unrealized = np.where(self.side != 0, (price - self.entry) * self.side * self.qty * self.pnl_delta, 0.0)
+        equity = self.realized + self.unrealized
+        self.hwm = np.maximum(self.hwm, equity)
+        self.max_drawdown = np.maximum(self.max_drawdown, self.hwm - equity)
+        # RiskGovernor's breaker: latched for the day on daily loss or intraday drawdown
+        day_equity = self.day_pnl + self.unrealized
+        self.day_hwm = np.maximum(self.day_hwm, day_equity)
+        self.day_breached |= (day_equity <= -self.max_daily_loss) | (self.day_hwm - day_equity >= self.max_drawdown_limit)
+        self.last_price = price
+        self.snapshots += 1
+
+    def _entries(self, price, snap):
+        action, confidence = evaluate(self.params, snap)
+        enter = (
+            (self.side == 0)
+            & (action != 0)
+            & (confidence >= snap.get("threshold", 0))
+            & (self.day_trades < self.max_trades)
+            & (self.day_pnl > -self.max_daily_loss)
+            & ~self.day_breached
+        )
+        if enter.any():
+            stop = np.maximum(self.params["stop_min"], snap.get("momentum", 0) * self.params["stop_mult"])
+            qty = np.maximum((self.capital * 0.01 / stop // self.lot_size) * self.lot_size, self.lot_size)
+            s = action.astype(np.int8)
+            self.side = np.where(enter, s, self.side).astype(np.int8)
+            self.entry = np.where(enter, price, self.entry)
+            self.best = np.where(enter, price, self.best)
+            self.sl = np.where(enter, price - s * stop, self.sl)
+            self.target = np.where(enter, price + s * stop * self.params["target_ratio"], self.target)
+            self.qty = np.where(enter, qty, self.qty)
+            self.day_trades += enter
+            self.trades += enter
+
+    def _exits(self, price):
+        held = self.side != 0
+        if not held.any():
+            return
+        long = self.side > 0
+        short = self.side < 0
+        # PositionManager.trail: 1% from the best price, in favor only
+        self.best = np.where(long, np.maximum(self.best, price), np.where(short, np.minimum(self.best, price), self.best))
+        self.sl = np.where(long, np.maximum(self.sl, self.best * 0.99), np.where(short, np.minimum(self.sl, self.best * 1.01), self.sl))
+        hit = (long & ((price <= self.sl) | (price >= self.target))) | (short & ((price >= self.sl) | (price <= self.target)))
+        self._close(hit, price)
+
+    def flatten(self, price=None):
+        """Close every open paper position (end of day)."""
+        price = self.last_price if price is None else price
+        if price is not None:
+            self._close(self.side != 0, price)
+
+    def _close(self, mask, price):
+        if not mask.any():
+            return
+        pnl = np.where(mask, (price - self.entry) * self.side * self.qty * self.pnl_delta, 0.0)
+        self.realized += pnl
+        self.day_pnl += pnl
+        self.wins += mask & (pnl > 0)
+        self.side = np.where(mask, 0, self.side).astype(np.int8)
+        self.unrealized = np.where(mask, 0.0, self.unrealized)
+
+    def new_day(self):
+        self.day_trades[:] = 0
+        self.day_pnl[:] = 0.0
+        self.day_hwm[:] = 0.0
+        self.day_breached[:] = False
+
+    def table(self):
+        """Per-variant rows: params plus trades, win rate, realized/total PnL, max drawdown."""
+        rows = []
+        total = self.realized + self.unrealized
+        for i in range(self.n):
+            row = {name: float(values[i]) for name, values in self.params.items()}
+            row.update(
+                variant=i,
+                trades=int(self.trades[i]),
+                win_rate=round(float(self.wins[i] / self.trades[i]), 3) if self.trades[i] else 0.0,
+                realized=round(float(self.realized[i]), 2),
+                pnl=round(float(total[i]), 2),
+                max_drawdown=round(float(self.max_drawdown[i]), 2),
+                open=int(self.side[i]),
+            )
+            rows.append(row)
+        return rows
+
+    def top(self, n=SHADOW_TOP_N):
+        total = self.realized + self.unrealized
+        order = np.argsort(-total, kind="stable")[:n]
+        rows = self.table()
+        return [rows[i] for i in order]
+
+
+class ShadowRunner:
+
+    def __init__(self, grid=None, log_dir=EVENT_LOG_DIR, max_queue=SHADOW_QUEUE_MAX, report_sec=SHADOW_REPORT_SEC):
+        self.params = compile_variants(grid)
+        self.book = ShadowBook(self.params)
+        self.log_dir = log_dir
+        self.report_sec = report_sec
+        self.dropped = 0
+        self.eval_ms = 0.0  # last snapshot's evaluation time
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._last_report = time.time()
+        self._lock = threading.Lock()  # book vs report()/save() from other threads
+        self._thread = threading.Thread(target=self._run, name="shadow", daemon=True)
+        self._thread.start()
+        LOG.info("shadow_start", variants=self.book.n)
+
+    @property
+    def variants(self):
+        return self.book.n
+
+    def submit(self, snapshot):
+        """Queue one strategy snapshot (strategy loop; never blocks)."""
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            snap = self._queue.get()
+            if snap is None:
+                return
+            try:
+                self._process(snap)
+            except Exception as e:
+                LOG.error("shadow_error", str(e))
+
+    def _process(self, snap):
+        t0 = time.perf_counter()
+        day = datetime.fromtimestamp(snap.get("ts", time.time()), IST).strftime("%Y-%m-%d")
+        with self._lock:
+            book = self.book
+            if book.day is not None and day != book.day:
+                book.flatten()
+                self._save_locked(book.day)
+                book.new_day()
+            book.day = day
+            book.on_snapshot(snap)
+        self.eval_ms = (time.perf_counter() - t0) * 1000
+        if time.time() - self._last_report >= self.report_sec:
+            self._last_report = time.time()
+            best = self.top(3)
+            LOG.info(
+                "shadow_top",
+                variants=self.book.n,
+                eval_ms=round(self.eval_ms, 3),
+                dropped=self.dropped,
+                live_pnl=self.table()[0]["pnl"],
+                top=[{k: r[k] for k in ("variant", "pnl", "trades", "win_rate")} for r in best],
+            )
+
+    def table(self):
+        with self._lock:
+            return self.book.table()
+
+    def top(self, n=SHADOW_TOP_N):
+        with self._lock:
+            return self.book.top(n)
+
+    def end_of_day(self):
+        """Flatten and write the day's table (call once after the close)."""
+        with self._lock:
+            self.book.flatten()
+            if self.book.day:
+                self._save_locked(self.book.day)
+
+    def _save_locked(self, day):
+        path = os.path.join(self.log_dir, day)
+        try:
+            os.makedirs(path, exist_ok=True)
+            with open(os.path.join(path, SHADOW_FILE), "w", encoding="utf-8") as f:
+                json.dump({"day": day, "snapshots": self.book.snapshots, "variants": self.book.table()}, f)
+        except OSError as e:
+            LOG.error("shadow_save_failed", str(e), day=day)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=2)
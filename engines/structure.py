@@ -1,6 +1,7 @@
 class StructureEngine:
 
     def vwap(self, prices):
+        """Price-mean fallback when no volume feed is available (see engines/vwap.py)."""
         return sum(prices[-20:]) / 20
 
     def bullish(self, price, vwap):
@@ -0,0 +1,154 @@
+"""
+Volume-weighted VWAP engine (per spec VWAP factor in Leading Score).
+Consumes QUOTE-mode ticks (LTP + cumulative day volume) and keeps, in O(1) per tick:
+- session VWAP (reset at each new IST trading day)
+- rolling VWAP over the last VWAP_ROLLING_SEC seconds
+- anchored VWAPs started at arbitrary times (e.g. from a swing high)
+plus volume-weighted standard-deviation bands around each.
+Sums are kept relative to the session's first price so p^2*v stays well conditioned.
+"""
+import math
+from collections import deque
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from config.settings import VWAP_ROLLING_SEC, VWAP_BAND_STDDEV
+
+IST = ZoneInfo("Asia/Kolkata")
+
+
+class _Accumulator:
+    """Running sums of v, dp*v and dp^2*v (dp = price - reference)."""
+
+    __slots__ = ("v", "pv", "p2v")
+
+    def __init__(self):
+        self.v = 0.0
+        self.pv = 0.0
+        self.p2v = 0.0
+
+    def add(self, dp, volume):
+        self.v += volume
+        self.pv += dp * volume
+        self.p2v += dp * dp * volume
+
+    def remove(self, dp, volume):
+        self.v -= volume
+        self.pv -= dp * volume
+        self.p2v -= dp * dp * volume
+
+    def vwap(self, ref):
+        return ref + self.pv / self.v if self.v > 0 else None
+
+    def stddev(self):
+        if self.v <= 0:
+            return None
+        mean = self.pv / self.v
+        return math.sqrt(max(0.0, self.p2v / self.v - mean * mean))
+
+
+class VWAPEngine:
+
+    def __init__(self, rolling_sec=VWAP_ROLLING_SEC, band_mult=VWAP_BAND_STDDEV):
+        self.rolling_sec = rolling_sec
+        self.band_mult = band_mult
+        self.last_price = None
+        self._ref = None  # session reference price
+        self._day = None
+        self._last_cum_volume = None
+        self._session = _Accumulator()
+        self._rolling = _Accumulator()
+        self._window = deque()  # (ts, dp, volume) in the rolling window
+        self._anchors = {}  # name -> _Accumulator
+
+    # ---------- Feed ----------
+
+    def on_tick(self, token, tick, ts):
+        """MarketCache tick listener: QUOTE tick with last_traded_price (paise) and day volume."""
+        ltp = tick.get("last_traded_price")
+        cum_volume = tick.get("volume_trade_for_the_day")
+        if not ltp or cum_volume is None:
+            return
+        price = ltp / 100
+        if self._last_cum_volume is None or cum_volume < self._last_cum_volume:
+            volume = 0  # first tick (or new session): no traded-volume delta yet
+        else:
+            volume = cum_volume - self._last_cum_volume
+        self._last_cum_volume = cum_volume
+        self.update(ts, price, volume)
+
+    def update(self, ts, price, volume):
+        """Add one trade print. O(1) amortized."""
+        day = datetime.fromtimestamp(ts, IST).date()
+        if day != self._day:
+            self.reset_session(day, price)
+        self.last_price = price
+        dp = price - self._ref
+        if volume > 0:
+            self._session.add(dp, volume)
+            self._rolling.add(dp, volume)
+            self._window.append((ts, dp, volume))
+            for acc in self._anchors.values():
+                acc.add(dp, volume)
+        cutoff = ts - self.rolling_sec
+        while self._window and self._window[0][0] < cutoff:
+            _, old_dp, old_v = self._window.popleft()
+            self._rolling.remove(old_dp, old_v)
+        if not self._window:
+            self._rolling = _Accumulator()  # drop float drift when the window empties
+
+    def reset_session(self, day=None, ref=None):
+        """Start a new session (anchors from a previous session are cleared)."""
+        if self._day is not None:
+            self._anchors.clear()
+        self._day = day
+        self._ref = ref
+        self._session = _Accumulator()
+        self._rolling = _Accumulator()
+        self._window.clear()
+
+    def anchor(self, name):
+        """Start (or restart) an anchored VWAP from the next print."""
+        self._anchors[name] = _Accumulator()
+
+    # ---------- Readouts ----------
+
+    @property
+    def ready(self):
+        return self._session.v > 0
+
+    @property
+    def session_vwap(self):
+        return self._session.vwap(self._ref)
+
+    @property
+    def rolling_vwap(self):
+        return self._rolling.vwap(self._ref)
+
+    def anchored_vwap(self, name):
+        acc = self._anchors.get(name)
+        return acc.vwap(self._ref) if acc else None
+
+    def bands(self, which="session", k=None):
+        """(lower, vwap, upper) at k standard deviations; which = session | rolling | anchor name."""
+        k = self.band_mult if k is None else k
+        if which == "session":
+            acc = self._session
+        elif which == "rolling":
+            acc = self._rolling
+        else:
+            acc = self._anchors.get(which)
+        if acc is None or acc.v <= 0:
+            return None, None, None
+        vwap = acc.vwap(self._ref)
+        sd = acc.stddev()
+        return vwap - k * sd, vwap, vwap + k * sd
+
+    def bullish(self):
+        """Last traded price above session VWAP."""
+        vwap = self.session_vwap
+        return vwap is not None and self.last_price > vwap
+
+    def bearish(self):
+        """Last traded price below session VWAP."""
+        vwap = self.session_vwap
+        return vwap is not None and self.last_price < vwap
@@ -0,0 +1,435 @@
+"""
+Multi-account order fan-out: one strategy instance trading several client accounts.
+Each account in ACCOUNTS gets its own SmartAPI session behind its own ApiGateway (rate
+limits are per API key), PositionSizer capital, RiskGovernor limits, PositionManager,
+write-ahead log and ExitEngine. Engines, the feed and strategy passes are shared; the
+first account's session also serves the feed and data lookups (main.py).
+Per entry every account runs the validation chain against its own trade count,
+position and PnL, is sized on its own capital and checked by its own risk.allow(); the
+orders of all eligible accounts are then sent at once on a worker pool, so the last
+account is not N broker round trips behind the first. Exits (SL/target on ticks,
+EXIT_ALL) fan out the same way.
+A position is booked (position, risk fill, armed exits, trade count) only from a
+confirmed fill: an order with an id whose status is terminal with filled_qty > 0
+(COMPLETE, PARTIAL, or CANCELLED after a partial fill), at the filled quantity and
+average price. Orders still open at the ack (live orders, paper within its latency) are
+booked by the fill tracker once they turn terminal; until then the account counts as
+holding a position, so it is not entered twice. Rejected or unfilled orders book nothing.
+The same tracker confirms each account's exit SELLs for its ExitEngine.
+Per account: ack latency (submit -> order id) and fill latency (submit -> terminal
+fill; open orders are polled by one tracker thread every FANOUT_FILL_POLL_SEC, so
+polling never holds a worker the exit orders need, and the remainder is cancelled after
+FANOUT_FILL_WAIT_SEC). Per fan-out: skew, the spread of the accounts' ack times and of
+their fill prices.
+report() summarizes both (p50 / p99).
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from config.settings import (
+    ACCOUNTS,
+    LOT_SIZE,
+    LIVE_TRADING,
+    RISK_CAPITAL,
+    WAL_ENABLED,
+    FANOUT_WORKERS,
+    FANOUT_FILL_WAIT_SEC,
+    FANOUT_FILL_POLL_SEC,
+    LATENCY_SAMPLES,
+)
+from data.angel.angel_login import AngelSession
+from data.angel.api_gateway import ApiGateway
+from data.cache.market_cache import MARKET, SPOT_TOKEN
+from execution.exit_engine import ExitEngine
+from execution.order_manager import OrderManager
+from execution.order_slicer import OrderSlicer, TERMINAL
+from execution.paper_broker import PaperBroker
+from execution.position_manager import PositionManager
+from execution.position_sizer import PositionSizer
+from execution.validation_chain import run_validation_chain
+from ops.event_log import LOG
+from ops.wal import WriteAheadLog, wal_path
+from risk.risk_governor import RiskGovernor
+
+
+def login_accounts(configs=ACCOUNTS):
+    """
+    One AngelSession per account, logged in concurrently. Returns
+    [{config, api (ApiGateway), jwt, feed}] in ACCOUNTS order.
+    """
+
+    def login(config):
+        session = AngelSession(config["api_key"], config["client_id"], config["password"], config["totp_secret"])
+        api, jwt, feed = session.login()
+        return {"config": config, "api": ApiGateway(api), "jwt": jwt, "feed": feed}
+
+    with ThreadPoolExecutor(max_workers=max(1, len(configs)), thread_name_prefix="login") as pool:
+        return list(pool.map(login, configs))
+
+
+def _signed(position):
+    """Spot-position quantity as a signed fill (CE long, PE short)."""
+    return position.qty if position.side == "CE" else -position.qty
+
+
+class AccountFanout:
+
+    def __init__(self, sessions, staging=None, cache=MARKET, live=LIVE_TRADING, workers=FANOUT_WORKERS, lot_size=LOT_SIZE):
+        """sessions: login_accounts() output (api = None for a paper-only account)."""
+        self.cache = cache
+        self.live = live
+        self.staging = staging
+        self.lot_size = lot_size
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fanout")
+        self._lock = threading.Lock()
+        self._tracked = []  # open entry orders: {account, order_id, t0, deadline, entry}
+        self._tracking = threading.Event()
+        self.skew_ms = deque(maxlen=LATENCY_SAMPLES)  # per fan-out: spread of ack times across accounts
+        self.price_skew = deque(maxlen=LATENCY_SAMPLES)  # per fan-out: spread of fill prices across accounts
+        self.accounts = [self._build(s) for s in sessions]
+        self.primary = self.accounts[0]
+        threading.Thread(target=self._poll_fills, name="fanout-fills", daemon=True).start()
+
+    def _build(self, session):
+        config = session["config"]
+        name = config["name"]
+        capital = config.get("capital", RISK_CAPITAL)
+        risk = RiskGovernor(capital=capital, **config.get("risk", {}))
+        broker = OrderManager(session["api"]) if self.live else PaperBroker(self.cache)
+        orders = OrderSlicer(broker)
+        account = {
+            "name": name,
+            "sizer": PositionSizer(capital=capital),
+            "risk": risk,
+            "position": PositionManager(),
+            "orders": orders,
+            "ack_ms": deque(maxlen=LATENCY_SAMPLES),  # latest LATENCY_SAMPLES
+            "fill_ms": deque(maxlen=LATENCY_SAMPLES),
+            "pending": None,  # entry order id awaiting its fill
+        }
+        account["exit"] = ExitEngine(
+            orders,
+            cache=self.cache,
+            on_exit=lambda p, reason, price, order_id, qty: risk.on_fill(p.token, p.side, -qty, price),
+            staging=self.staging,
+            pool=self._pool,
+            account=name,
+            track=lambda order_id, on_done: self.track_order(account, order_id, time.time(), on_done),
+        )
+        self.cache.add_tick_listener(None, risk.on_tick)  # marks open premium positions
+        return account
+
+    # ---------- Startup ----------
+
+    def recover(self):
+        """
+        Replay each account's write-ahead log and re-arm recovered premium positions.
+        Returns the option tokens those positions hold (to subscribe).
+        """
+        tokens = set()
+        if not WAL_ENABLED:
+            return tokens
+        for account in self.accounts:
+            position, risk = account["position"], account["risk"]
+            path = wal_path(account=account["name"])
+            if account is self.primary and not os.path.exists(path) and os.path.exists(wal_path()):
+                # Today's log from before per-account WALs: keep replaying / appending to it
+                path = wal_path()
+            recovered = WriteAheadLog(path).recover(position, risk)
+            orders = recovered.pop("orders")
+            LOG.info(
+                "wal_recovered", account=account["name"], active=position.active, token=position.token,
+                trades=risk.trades, daily_pnl=round(risk.daily_pnl, 2), orders=len(orders), **recovered,
+            )
+            # Entry orders in flight at the crash: book or drop them before trading resumes
+            for rec in orders:
+                self._resolve_order(account, rec)
+            if position.active and position.token is not None:
+                if recovered["exit_order"]:
+                    account["exit"].resume(position, recovered["exit_order"])
+                elif not account["exit"].is_armed(position.token):
+                    account["exit"].arm(position)
+                tokens.add(position.token)
+        return tokens
+
+    def _resolve_order(self, account, rec):
+        """Recovered entry order: book its fill, keep tracking it if still open, or drop it."""
+        order_id = rec["order_id"]
+        delta = rec.get("delta")
+        entry = (rec["side"], rec["symbol"], rec["token"], rec["stop_distance"], {"delta": delta} if delta is not None else None)
+        status = account["orders"].order_status(order_id)
+        LOG.warning("wal_order_recovered", account=account["name"], order_id=order_id, status=status and status["status"], every=0)
+        if status is None:
+            self._order_done(account, order_id)  # unknown to the broker (paper orders die with the process)
+        elif status["status"] in TERMINAL:
+            self._entry_filled(account, order_id, time.time(), entry, status)
+        else:
+            account["pending"] = order_id
+            self._track_fill(account, order_id, time.time(), entry)
+
+    # ---------- Entry ----------
+
+    def any_flat(self):
+        return any(not a["position"].active and a["pending"] is None for a in self.accounts)
+
+    def validate(self, decision, vix, strike, spot, greeks=None, feed_tokens=()):
+        """{name: (passed, failed_step, reason)}: the validation chain on each account's own state."""
+        return {
+            a["name"]: run_validation_chain(
+                decision,
+                vix,
+                a["risk"].trades,
+                1 if a["position"].active or a["pending"] is not None else 0,
+                a["risk"].daily_pnl,
+                strike,
+                spot,
+                greeks,
+                feed_tokens=feed_tokens,
+                risk=a["risk"],
+            )
+            for a in self.accounts
+        }
+
+    def enter(self, names, side, symbol, token, stop_distance, greeks=None, risk_pct=0.01):
+        """
+        Size, risk-check and BUY for every account in names at once, then book the fills.
+        Returns one row per account: {account, qty, order_id, status, filled_qty, avg_price, ack_ms}.
+        """
+        premium_est = self.cache.option_premium(token) if token else None
+        jobs = []
+        rows = []
+        for account in self.accounts:
+            if account["name"] not in names or account["position"].active or account["pending"] is not None:
+                continue
+            qty = account["sizer"].size(risk_pct=risk_pct, stop_distance=stop_distance, lot_size=self.lot_size)
+            if not account["risk"].allow(side=side, token=token, notional=(premium_est or 0) * qty):
+                rows.append({"account": account["name"], "qty": qty, "status": "RISK_BLOCKED"})
+                continue
+            jobs.append((account, qty))
+        t0 = time.time()
+        futures = [(a, qty, self._pool.submit(self._send_entry, a, symbol, token, qty)) for a, qty in jobs]
+        sent = []
+        for account, qty, future in futures:
+            row = future.result()
+            row.update(account=account["name"], qty=qty, ack_ms=round((row["ack_ts"] - t0) * 1000, 2))
+            account["ack_ms"].append(row["ack_ms"])
+            sent.append((account, row))
+            rows.append(row)
+        if len(sent) > 1:
+            acks = [row["ack_ts"] for _, row in sent]
+            prices = [row["avg_price"] for _, row in sent if row.get("avg_price")]
+            with self._lock:
+                self.skew_ms.append((max(acks) - min(acks)) * 1000)
+                if len(prices) > 1:
+                    self.price_skew.append(max(prices) - min(prices))
+        for account, row in sent:
+            entry = (side, symbol, token, stop_distance, greeks)
+            if row["order_id"] is not None:
+                # Logged before it is booked, so a crash in between is resolved by recover()
+                self._wal(
+                    account, "order", order_id=row["order_id"], side=side, symbol=symbol, token=token,
+                    qty=row["qty"], stop_distance=stop_distance, delta=greeks and abs(greeks["delta"]),
+                )
+            if row["order_id"] is not None and row["status"] not in TERMINAL:
+                account["pending"] = row["order_id"]
+                self._track_fill(account, row["order_id"], row["sent_ts"], entry)
+            else:
+                row["booked"] = self._book(account, row, *entry)
+                if row["order_id"] is not None:
+                    self._order_done(account, row["order_id"])
+            row.pop("ack_ts", None)
+            row.pop("sent_ts", None)
+        if sent:
+            LOG.info(
+                "fanout_entry", side=side, symbol=symbol, accounts=len(sent),
+                skew_ms=round(self.skew_ms[-1], 2) if len(sent) > 1 else 0.0,
+                orders=[{k: r.get(k) for k in ("account", "qty", "order_id", "status", "ack_ms")} for _, r in sent],
+            )
+        return rows
+
+    def _send_entry(self, account, symbol, token, qty):
+        """Worker: place one account's BUY; paper and sliced orders report their fill at once."""
+        orders = account["orders"]
+        row = {"order_id": None, "status": None, "filled_qty": None, "avg_price": None}
+        t0 = time.time()
+        if symbol and token:
+            try:
+                staged = self.staging and self.staging.params(token, "BUY", qty)
+                row["order_id"] = orders.place(staged) if staged else orders.buy(symbol, token, qty)
+            except Exception as e:
+                row["reason"] = str(e)
+        row["ack_ts"] = time.time()
+        row["sent_ts"] = t0
+        order_id = row["order_id"]
+        if order_id is None:
+            if symbol and token:
+                LOG.error("order_failed", row.get("reason", ""), account=account["name"], symbol=symbol, qty=qty, every=0)
+            return row
+        fill = orders.order_status(order_id) if (not self.live or order_id in orders.parents) else None
+        if fill is not None:
+            row.update(status=fill["status"], filled_qty=fill["filled_qty"], avg_price=fill["avg_price"], reason=fill.get("reason"))
+            if fill["status"] in TERMINAL:
+                account["fill_ms"].append(round((time.time() - t0) * 1000, 2))
+        return row
+
+    def track_order(self, account, order_id, t0, on_done, wait_sec=FANOUT_FILL_WAIT_SEC):
+        """Hand an open order to the fill tracker; on_done(status) runs on its thread once terminal."""
+        with self._lock:
+            self._tracked.append({"account": account, "order_id": order_id, "t0": t0, "deadline": t0 + wait_sec, "on_done": on_done})
+            self._tracking.set()
+
+    def _track_fill(self, account, order_id, t0, entry):
+        """Track an open entry order; it is booked once terminal."""
+        self.track_order(account, order_id, t0, lambda status: self._entry_filled(account, order_id, t0, entry, status))
+
+    def _poll_fills(self):
+        """
+        Fill tracker thread: one status pass over every open order (entries and exits) per
+        poll. Past its deadline an order's remainder is cancelled; polling goes on until
+        the broker reports it terminal (an entry's account stays pending until then).
+        """
+        while True:
+            self._tracking.wait()
+            with self._lock:
+                tracked = list(self._tracked)
+            done = []
+            for item in tracked:
+                try:
+                    if self._poll_fill(item):
+                        done.append(item)
+                except Exception as e:
+                    LOG.error("fanout_fill_error", str(e), account=item["account"]["name"], order_id=item["order_id"])
+            with self._lock:
+                self._tracked = [item for item in self._tracked if not any(item is d for d in done)]
+                if not self._tracked:
+                    self._tracking.clear()
+            time.sleep(FANOUT_FILL_POLL_SEC)
+
+    def _poll_fill(self, item):
+        """True once the order is terminal and its on_done has run."""
+        account, order_id = item["account"], item["order_id"]
+        orders = account["orders"]
+        status = orders.order_status(order_id)
+        if not (status and status["status"] in TERMINAL):
+            if item["deadline"] is not None and time.time() >= item["deadline"]:
+                LOG.warning("fanout_fill_timeout", "cancelling the remainder", account=account["name"], order_id=order_id, every=0)
+                orders.cancel(order_id)
+                item["deadline"] = None
+            return False
+        try:
+            item["on_done"](status)
+        except Exception as e:
+            LOG.error("fanout_fill_error", str(e), account=account["name"], order_id=order_id, every=0)
+        return True
+
+    def _entry_filled(self, account, order_id, t0, entry, status):
+        """Tracker: an open entry order turned terminal; book whatever filled."""
+        account["fill_ms"].append(round((time.time() - t0) * 1000, 2))
+        row = {
+            "account": account["name"], "order_id": order_id, "status": status["status"],
+            "filled_qty": status["filled_qty"], "avg_price": status["avg_price"], "reason": status.get("reason"),
+        }
+        try:
+            row["booked"] = self._book(account, row, *entry)
+            self._order_done(account, order_id)
+        finally:
+            account["pending"] = None
+        LOG.info("fanout_fill", **row)
+
+    def _wal(self, account, kind, **fields):
+        wal = account["position"].wal
+        if wal is not None:
+            wal.append(kind, **fields)
+
+    def _order_done(self, account, order_id):
+        """The entry order is booked or dropped; recovery no longer needs to resolve it."""
+        self._wal(account, "order_done", order_id=order_id)
+
+    def _book(self, account, row, side, symbol, token, stop_distance, greeks):
+        """
+        Open the account's position from a confirmed fill and arm its exits.
+        Returns True if booked (terminal status with filled_qty > 0).
+        """
+        position, risk = account["position"], account["risk"]
+        qty = row["filled_qty"] or 0
+        if row["order_id"] is None or row["status"] not in TERMINAL or qty <= 0:
+            if row["order_id"] is not None:
+                LOG.warning(
+                    "order_unfilled", row.get("reason") or "", account=account["name"], symbol=symbol,
+                    status=row["status"], every=0,
+                )
+            return False
+        premium = row["avg_price"] or (self.cache.option_premium(token) if token else None)
+        if premium:
+            # Option premium position: stop in premium terms = spot stop x |delta|
+            stop_premium = stop_distance * (abs(greeks["delta"]) if greeks else 0.5)
+            position.enter(premium, stop_premium, qty, side=side, token=token, symbol=symbol)
+            risk.on_fill(token, side, qty, premium)
+            account["exit"].arm(position)  # SL/target/trail now run on every option tick
+        else:
+            position.enter(self.cache.spot, stop_distance, qty, side=side)
+            risk.on_fill(SPOT_TOKEN, side, _signed(position), self.cache.spot)
+        risk.record_trade()
+        return True
+
+    # ---------- Exits ----------
+
+    def check_spot_exits(self, spot):
+        """Trail + SL/target for spot-tracked positions (premium positions exit on ticks)."""
+        exited = 0
+        for account in self.accounts:
+            position = account["position"]
+            if position.active and position.token is None:
+                position.trail(spot)
+                if position.exit_check(spot):
+                    position.closed(spot)  # no order for spot-tracked positions
+                    account["risk"].on_fill(SPOT_TOKEN, position.side, -_signed(position), spot)
+                    LOG.info("exit", "SL/target", spot=spot, account=account["name"])
+                    exited += 1
+        return exited
+
+    def flatten(self, reason="EXIT_ALL"):
+        """Close every account's open position now; exit orders go out concurrently."""
+        closed = 0
+        for account in self.accounts:
+            position = account["position"]
+            if account["exit"].flatten(reason):
+                closed += 1
+            elif position.active:
+                spot = self.cache.spot
+                position.close(reason, spot)
+                position.closed(spot)
+                account["risk"].on_fill(SPOT_TOKEN, position.side, -_signed(position), spot)
+                LOG.info("exit", reason, spot=spot, account=account["name"])
+                closed += 1
+        return closed
+
+    # ---------- Reporting ----------
+
+    def report(self):
+        """Per-account ack / fill latency and per fan-out skew over the latest LATENCY_SAMPLES (ms; fill-price skew in rupees)."""
+
+        def summary(values):
+            if not values:
+                return None
+            v = np.array(values, dtype=np.float64)
+            return {"n": len(v), "p50": round(float(np.percentile(v, 50)), 2), "p99": round(float(np.percentile(v, 99)), 2)}
+
+        with self._lock:
+            skew, price_skew = list(self.skew_ms), list(self.price_skew)
+        return {
+            "accounts": {
+                a["name"]: {
+                    "ack_ms": summary(list(a["ack_ms"])),
+                    "fill_ms": summary(list(a["fill_ms"])),
+                    "trades": a["risk"].trades,
+                    "equity": round(a["risk"].equity, 2),
+                }
+                for a in self.accounts
+            },
+            "skew_ms": summary(skew),
+            "price_skew": summary(price_skew),
+        }
@@ -0,0 +1,213 @@
+"""
+Local two-leg GTT (SL + Target, one-cancels-other) evaluated on every tick.
+ExitEngine arms a PositionManager on its option token and registers a MarketCache
+tick listener; trailing and SL/target checks run inside the feed thread on the
+option's own LTP, and the closing SELL goes to the order gateway immediately.
+Trigger latency (tick received -> exit order sent) is recorded per exit.
+With several accounts on the same token (execution/account_fanout.py) each has its own
+ExitEngine; a shared pool sends their exit orders concurrently instead of one after
+another in the feed thread.
+A SELL that raises or returns no order id is retried EXIT_ORDER_ATTEMPTS times; if it
+still fails the position is reopened and re-armed (the broker still holds it) and on_exit
+is not called, so risk state keeps the position.
+A placed SELL only counts once it fills: its status is followed to a terminal state (by
+the account's fill tracker, or polled here), on_exit books the filled quantity at the
+fill's average price, and any unfilled remainder (REJECTED, CANCELLED, PARTIAL) is
+reopened and re-armed. Only a fully filled exit is logged as closed (PositionManager.closed);
+resume() settles an exit SELL recovered from the write-ahead log.
+"""
+import threading
+import time
+from collections import deque
+from config.settings import (
+    EXIT_ORDER_ATTEMPTS,
+    EXIT_RETRY_DELAY_SEC,
+    EXIT_FILL_POLL_SEC,
+    EXIT_FILL_WAIT_SEC,
+    LATENCY_SAMPLES,
+)
+from data.cache.market_cache import MARKET
+from execution.order_slicer import TERMINAL
+from ops.event_log import LOG
+
+
+class ExitEngine:
+
+    def __init__(self, gateway=None, cache=MARKET, on_exit=None, staging=None, pool=None, account=None, track=None):
+        """
+        gateway: object with sell(symbol, token, qty), order_status(order_id) and cancel(order_id)
+            (OrderSlicer / OrderManager); None = paper (no order, exits at the trigger price).
+        on_exit: optional fn(position, reason, price, order_id, qty) called per exit fill
+            (price = the fill's average price, qty = filled quantity).
+        staging: OrderStaging; a staged SELL template is sent with gateway.place() when present.
+        pool: executor for the exit order (None = send from the calling thread).
+        account: account name for the exit log.
+        track: fn(order_id, on_done) following an open order until terminal, calling
+            on_done(status) (AccountFanout.track_order); None = poll in the sending thread.
+        """
+        self.gateway = gateway
+        self.cache = cache
+        self.on_exit = on_exit
+        self.staging = staging
+        self.pool = pool
+        self.account = account
+        self.track = track
+        self.latencies_us = deque(maxlen=LATENCY_SAMPLES)  # trigger latency of the latest fired exits
+        self._armed = {}  # token -> PositionManager
+        self._listening = set()
+        self._lock = threading.Lock()
+
+    def arm(self, position):
+        """Start tick-level SL/target/trailing for an active premium position."""
+        token = position.token
+        with self._lock:
+            self._armed[token] = position
+        if token not in self._listening:
+            self._listening.add(token)
+            self.cache.add_tick_listener(token, self._on_tick)
+        LOG.info("exit_armed", token=token, sl=round(position.sl, 2), target=round(position.target, 2))
+
+    def disarm(self, token):
+        with self._lock:
+            return self._armed.pop(token, None)
+
+    def is_armed(self, token):
+        return token in self._armed
+
+    def _on_tick(self, token, tick, ts):
+        position = self._armed.get(token)
+        if position is None:
+            return
+        ltp = tick.get("last_traded_price")
+        if not ltp:
+            return
+        price = ltp / 100
+        with self._lock:
+            if self._armed.get(token) is not position or not position.active:
+                return
+            position.trail(price)
+            sl = position.sl
+            if not position.exit_check(price):
+                return
+            del self._armed[token]
+        reason = "SL" if price <= sl else "TARGET"
+        self._fire(position, reason, price, ts)
+
+    def flatten(self, reason="EXIT_ALL"):
+        """Close every armed position now at its last premium (e.g. EXIT_ALL decision)."""
+        with self._lock:
+            armed = list(self._armed.values())
+            self._armed.clear()
+        for position in armed:
+            price = self.cache.option_premium(position.token)
+            position.close(reason, price)
+            self._fire(position, reason, price, None)
+        return len(armed)
+
+    def _fire(self, position, reason, price, tick_ts):
+        latency_us = None
+        if tick_ts is not None:
+            latency_us = (time.time() - tick_ts) * 1e6  # tick received -> exit order dispatched
+            self.latencies_us.append(latency_us)
+        if self.pool is not None:
+            self.pool.submit(self._send, position, reason, price, latency_us)
+        else:
+            self._send(position, reason, price, latency_us)
+
+    def _send(self, position, reason, price, latency_us):
+        order_id = None
+        if self.gateway is not None:
+            for attempt in range(1, EXIT_ORDER_ATTEMPTS + 1):
+                try:
+                    staged = self.staging and self.staging.params(position.token, "SELL", position.qty)
+                    if staged:
+                        order_id = self.gateway.place(staged)
+                    else:
+                        order_id = self.gateway.sell(position.symbol, position.token, position.qty)
+                    error = "no order id"
+                except Exception as e:
+                    error = str(e)
+                if order_id is not None:
+                    break
+                LOG.error("exit_order_failed", error, token=position.token, account=self.account, attempt=attempt, every=0)
+                if attempt < EXIT_ORDER_ATTEMPTS:
+                    time.sleep(EXIT_RETRY_DELAY_SEC * attempt)
+            if order_id is None:
+                # Still long at the broker: keep it in our state and under SL/target
+                position.reopen()
+                self.arm(position)
+                LOG.error(
+                    "exit_unplaced", "ALERT: exit order failed, position re-armed", token=position.token,
+                    reason=reason, qty=position.qty, account=self.account, every=0,
+                )
+                return
+            position.exit_sent(order_id)
+            self._follow(position, reason, order_id, latency_us)
+        else:
+            self._settle(position, reason, order_id, latency_us, {"status": "COMPLETE", "filled_qty": position.qty, "avg_price": price})
+
+    def _follow(self, position, reason, order_id, latency_us, status=None):
+        """Settle the exit order once terminal (fill tracker, or polled here)."""
+        status = status or self.gateway.order_status(order_id)
+        if not (status and status["status"] in TERMINAL):
+            if self.track is not None:
+                self.track(order_id, lambda status: self._settle(position, reason, order_id, latency_us, status))
+                return
+            status = self._wait(order_id)
+        self._settle(position, reason, order_id, latency_us, status)
+
+    def resume(self, position, order_id):
+        """
+        Position recovered with an unconfirmed exit (restored as open). With its SELL's id
+        and a broker that knows it, settle that order; otherwise re-arm the position.
+        """
+        status = self.gateway.order_status(order_id) if (self.gateway is not None and order_id) else None
+        if status is None:
+            self.arm(position)
+            return
+        position.active = False
+        position.exit_reason = position.exit_reason or "RECOVERED"
+        self._follow(position, position.exit_reason, order_id, None, status)
+
+    def _wait(self, order_id):
+        """Poll an open exit order until terminal; cancel the remainder after EXIT_FILL_WAIT_SEC."""
+        deadline = time.time() + EXIT_FILL_WAIT_SEC
+        while True:
+            time.sleep(EXIT_FILL_POLL_SEC)
+            status = self.gateway.order_status(order_id)
+            if status and status["status"] in TERMINAL:
+                return status
+            if deadline is not None and time.time() >= deadline:
+                self.gateway.cancel(order_id)
+                deadline = None
+
+    def _settle(self, position, reason, order_id, latency_us, status):
+        """Exit order is terminal: book the filled part, reopen and re-arm any remainder."""
+        filled = min(status.get("filled_qty") or 0, position.qty)
+        price = status.get("avg_price")
+        if filled > 0:
+            LOG.info(
+                "exit",
+                reason,
+                token=position.token,
+                price=price,
+                qty=filled,
+                order_id=order_id,
+                latency_us=latency_us and round(latency_us, 1),
+                account=self.account,
+            )
+            if self.on_exit:
+                self.on_exit(position, reason, price, order_id, filled)
+        remaining = position.qty - filled
+        if remaining <= 0:
+            position.closed(price, order_id)
+        else:
+            # Still (partly) long at the broker: keep the remainder in our state and under SL/target
+            position.qty = remaining
+            position.reopen()
+            self.arm(position)
+            LOG.error(
+                "exit_unfilled", "ALERT: exit order not filled, position re-armed", token=position.token,
+                reason=reason, status=status.get("status"), filled=filled, qty=remaining, order_id=order_id,
+                detail=status.get("reason"), account=self.account, every=0,
+            )
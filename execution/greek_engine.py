@@ -1,32 +1,173 @@
-class GreekEngine:
-    """
-    Fast proxy Greeks.
-    No Black-Scholes.
-    Real-time friendly.
-    """
+"""
+Vectorized Black-Scholes Greeks for the subscribed option chain (per spec strike
+alignment: Delta >= 0.25, IV <= 25%).
+One NumPy pass per update: implied vol is back-solved from each contract's LTP
+(vectorized Newton-Raphson), then delta, gamma, theta (per day) and vega (per vol
+point) are computed. Inputs are cached per contract and only rows whose spot,
+premium or time-to-expiry bucket changed are recomputed.
+"""
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import numpy as np
+from scipy.special import ndtr
+from config.settings import RISK_FREE_RATE, GREEKS_SPOT_EPS, GREEKS_TTE_BUCKET_SEC
+from data.cache.market_cache import MARKET
+
+IST = ZoneInfo("Asia/Kolkata")
+SECONDS_PER_YEAR = 365 * 24 * 3600
+IV_MIN, IV_MAX = 0.01, 5.0
+IV_ITERATIONS = 30
+
+
+def expiry_timestamp(expiry_ddmmyy):
+    """DDMMMYY (e.g. 20FEB25) -> epoch seconds at 15:30 IST on expiry day."""
+    day = datetime.strptime(expiry_ddmmyy, "%d%b%y")
+    return day.replace(hour=15, minute=30, tzinfo=IST).timestamp()
 
-    def delta_zone(self, spot, strike):
 
-        diff = abs(spot - strike)
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
 
-        if diff <= 50:
-            return "ATM"
 
-        elif diff <= 150:
-            return "NEAR"
+def bs_price(spot, strike, tte, iv, is_call, rate=RISK_FREE_RATE):
+    """Vectorized Black-Scholes price (arrays broadcast)."""
+    sqrt_t = np.sqrt(tte)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * iv * iv) * tte) / (iv * sqrt_t)
+    d2 = d1 - iv * sqrt_t
+    disc = strike * np.exp(-rate * tte)
+    call = spot * ndtr(d1) - disc * ndtr(d2)
+    put = disc * ndtr(-d2) - spot * ndtr(-d1)
+    return np.where(is_call, call, put)
 
-        return "FAR"
 
-    def gamma_mode(self, context, momentum):
+def implied_vol(premium, spot, strike, tte, is_call, rate=RISK_FREE_RATE):
+    """
+    Vectorized Newton-Raphson IV solve. Returns NaN where the premium is below
+    intrinsic value or the solve does not converge.
+    """
+    iv = np.full(premium.shape, 0.2)
+    active = np.isfinite(premium) & (premium > 0) & (tte > 0)
+    for _ in range(IV_ITERATIONS):
+        if not active.any():
+            break
+        sqrt_t = np.sqrt(tte)
+        d1 = (np.log(spot / strike) + (rate + 0.5 * iv * iv) * tte) / (iv * sqrt_t)
+        vega = spot * _norm_pdf(d1) * sqrt_t
+        diff = bs_price(spot, strike, tte, iv, is_call, rate) - premium
+        step = np.where(active & (vega > 1e-8), diff / np.maximum(vega, 1e-8), 0.0)
+        iv = np.clip(iv - step, IV_MIN, IV_MAX)
+        active &= np.abs(diff) > 1e-4
+    price = bs_price(spot, strike, tte, iv, is_call, rate)
+    ok = np.isfinite(premium) & (np.abs(price - premium) < np.maximum(0.01, premium * 0.005))
+    return np.where(ok, iv, np.nan)
+
+
+class GreekEngine:
+
+    def __init__(self, rate=RISK_FREE_RATE):
+        self.rate = rate
+        self.tokens = []
+        self.rows = {}  # token -> row
+        self.strike = np.zeros(0)
+        self.is_call = np.zeros(0, dtype=bool)
+        self.expiry_ts = np.zeros(0)
+        # Cached inputs (NaN forces first computation)
+        self._spot_in = np.zeros(0)
+        self._premium_in = np.zeros(0)
+        self._tte_bucket_in = np.zeros(0)
+        # Outputs
+        self.iv = np.zeros(0)
+        self.delta = np.zeros(0)
+        self.gamma = np.zeros(0)
+        self.theta = np.zeros(0)
+        self.vega = np.zeros(0)
+        self.recomputed = 0  # rows recomputed on last update
+        self._lock = threading.Lock()
 
-        if context == "UPTREND" and momentum > 40:
-            return "HIGH"
+    def set_contracts(self, contracts):
+        """contracts: list of {token, strike, side ("CE"/"PE"), expiry (DDMMMYY)}."""
+        n = len(contracts)
+        with self._lock:
+            self.tokens = [c["token"] for c in contracts]
+            self.rows = {t: i for i, t in enumerate(self.tokens)}
+            self.strike = np.array([float(c["strike"]) for c in contracts])
+            self.is_call = np.array([c["side"] == "CE" for c in contracts], dtype=bool)
+            self.expiry_ts = np.array([expiry_timestamp(c["expiry"]) for c in contracts])
+            self._spot_in = np.full(n, np.nan)
+            self._premium_in = np.full(n, np.nan)
+            self._tte_bucket_in = np.full(n, np.nan)
+            for name in ("iv", "delta", "gamma", "theta", "vega"):
+                setattr(self, name, np.full(n, np.nan))
 
-        return "NORMAL"
+    def update(self, spot, premiums, now):
+        """
+        Recompute Greeks for contracts whose inputs changed.
+        premiums: array aligned with self.tokens (rupees, NaN when no quote).
+        """
+        with self._lock:
+            if not self.tokens or not spot:
+                self.recomputed = 0
+                return
+            tte_bucket = np.floor((self.expiry_ts - now) / GREEKS_TTE_BUCKET_SEC)
+            changed = (
+                ~(np.abs(self._spot_in - spot) <= GREEKS_SPOT_EPS)
+                | ~(self._premium_in == premiums)
+                | ~(self._tte_bucket_in == tte_bucket)
+            )
+            changed &= np.isfinite(premiums)
+            self.recomputed = int(changed.sum())
+            if not self.recomputed:
+                return
+            idx = np.nonzero(changed)[0]
+            k = self.strike[idx]
+            call = self.is_call[idx]
+            prem = premiums[idx]
+            tte = np.maximum(self.expiry_ts[idx] - now, 60) / SECONDS_PER_YEAR
+            s = np.full(idx.shape, float(spot))
+            iv = implied_vol(prem, s, k, tte, call, self.rate)
+            sqrt_t = np.sqrt(tte)
+            with np.errstate(invalid="ignore"):
+                d1 = (np.log(s / k) + (self.rate + 0.5 * iv * iv) * tte) / (iv * sqrt_t)
+                d2 = d1 - iv * sqrt_t
+                pdf = _norm_pdf(d1)
+                disc = k * np.exp(-self.rate * tte)
+                self.iv[idx] = iv
+                self.delta[idx] = np.where(call, ndtr(d1), ndtr(d1) - 1)
+                self.gamma[idx] = pdf / (s * iv * sqrt_t)
+                decay = -s * pdf * iv / (2 * sqrt_t)
+                self.theta[idx] = np.where(
+                    call,
+                    decay - self.rate * disc * ndtr(d2),
+                    decay + self.rate * disc * ndtr(-d2),
+                ) / 365
+                self.vega[idx] = s * pdf * sqrt_t / 100
+            self._spot_in[idx] = spot
+            self._premium_in[idx] = prem
+            self._tte_bucket_in[idx] = tte_bucket[idx]
 
-    def theta_risk(self, time_factor):
+    def refresh(self, cache=MARKET, now=None):
+        """Pull spot and premiums for every contract from the cache and update."""
+        premiums = np.array(
+            [cache.option_premium(t) or np.nan for t in self.tokens], dtype=np.float64
+        )
+        self.update(cache.spot, premiums, time.time() if now is None else now)
 
-        if time_factor > 0.7:
-            return "HIGH"
+    def greeks(self, token):
+        """{delta, gamma, theta, vega, iv} for token, or None if unknown/not yet computed."""
+        row = self.rows.get(token)
+        if row is None or not np.isfinite(self.delta[row]):
+            return None
+        return {
+            "delta": float(self.delta[row]),
+            "gamma": float(self.gamma[row]),
+            "theta": float(self.theta[row]),
+            "vega": float(self.vega[row]),
+            "iv": float(self.iv[row]),
+        }
 
-        return "LOW"
+    def eligible(self, delta_min, iv_max_pct):
+        """Boolean mask over contracts meeting |delta| >= delta_min and IV <= iv_max_pct."""
+        with np.errstate(invalid="ignore"):
+            return (np.abs(self.delta) >= delta_min) & (self.iv * 100 <= iv_max_pct)
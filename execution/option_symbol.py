@@ -4,6 +4,7 @@ Uses Angel One searchScrip API. Format: NIFTY + DD + MMM + YY + strike + CE/PE
 e.g. NIFTY20FEB2524000CE
 """
 from datetime import datetime, timedelta
+from config.settings import STRIKE_STEP, CHAIN_STRIKES_EACH_SIDE
 
 
 def next_thursday_ddmmyy():
@@ -17,6 +18,20 @@ def next_thursday_ddmmyy():
     return expiry.strftime("%d%b%y").upper()  # 20FEB25
 
 
+def last_thursday_ddmmyy():
+    """Last Thursday of the current month as DDMMMYY (monthly futures expiry); rolls after expiry."""
+    now = datetime.now()
+    year, month = now.year, now.month
+    for _ in range(2):
+        next_month = datetime(year + (month // 12), month % 12 + 1, 1).date()
+        last_day = next_month - timedelta(days=1)
+        expiry = last_day - timedelta(days=(last_day.weekday() - 3) % 7)
+        if expiry > now.date() or (expiry == now.date() and now.hour < 15):
+            return expiry.strftime("%d%b%y").upper()
+        year, month = next_month.year, next_month.month
+    return expiry.strftime("%d%b%y").upper()
+
+
 def build_option_symbol(index, strike, ce_pe, expiry_ddmmyy):
     """Build NFO option symbol: INDEX + DDMMMYY + strike + CE/PE. Strike as 5 digits for Nifty."""
     strike_str = str(int(strike)).zfill(5)  # 24000
@@ -50,3 +65,62 @@ def get_option_symbol_token(api, index, strike, ce_pe, expiry_ddmmyy=None):
         return first["tradingsymbol"], str(first["symboltoken"])
     except Exception:
         return None, None
+
+
+def get_future_symbol_token(api, index, expiry_ddmmyy=None):
+    """
+    Resolve (tradingsymbol, symboltoken) for the index future, e.g. NIFTY27FEB25FUT.
+    expiry_ddmmyy: None for the current monthly expiry. Returns (None, None) on failure.
+    """
+    if expiry_ddmmyy is None:
+        expiry_ddmmyy = last_thursday_ddmmyy()
+    symbol = f"{index}{expiry_ddmmyy}FUT"
+    try:
+        result = api.searchScrip("NFO", symbol)
+        if not result or not result.get("status") or not result.get("data"):
+            return None, None
+        for item in result["data"]:
+            if item.get("tradingsymbol") == symbol:
+                return item["tradingsymbol"], str(item["symboltoken"])
+        return None, None
+    except Exception:
+        return None, None
+
+
+def get_option_chain(api, index, spot, expiry_ddmmyy=None, width=CHAIN_STRIKES_EACH_SIDE, step=STRIKE_STEP):
+    """
+    Resolve the option basket: ATM +- width strikes, CE and PE, for one expiry.
+    One searchScrip call on the INDEX+DDMMMYY prefix; symbols are parsed for strike/side.
+    Returns list of {token, symbol, strike, side, expiry} (empty on failure).
+    """
+    if expiry_ddmmyy is None:
+        expiry_ddmmyy = next_thursday_ddmmyy()
+    prefix = f"{index}{expiry_ddmmyy}"
+    atm = round(spot / step) * step
+    lo, hi = atm - width * step, atm + width * step
+    try:
+        result = api.searchScrip("NFO", prefix)
+        if not result or not result.get("status") or not result.get("data"):
+            return []
+        chain = []
+        for item in result["data"]:
+            symbol = item.get("tradingsymbol", "")
+            side = symbol[-2:]
+            if not symbol.startswith(prefix) or side not in ("CE", "PE"):
+                continue
+            try:
+                strike = float(symbol[len(prefix):-2])
+            except ValueError:
+                continue
+            if lo <= strike <= hi:
+                chain.append({
+                    "token": str(item["symboltoken"]),
+                    "symbol": symbol,
+                    "strike": strike,
+                    "side": side,
+                    "expiry": expiry_ddmmyy,
+                })
+        chain.sort(key=lambda c: (c["strike"], c["side"]))
+        return chain
+    except Exception:
+        return []
@@ -1,37 +1,89 @@
 """
 Order placement via Angel One API.
-Used only when LIVE_TRADING is True in config; main.py otherwise only updates
-in-memory position (paper trading).
+Used only when LIVE_TRADING is True in config; otherwise main.py routes the same
+buy/sell calls to PaperBroker (execution/paper_broker.py).
 """
+import threading
+import time
+from config.settings import ORDER_BOOK_TTL_SEC
+
 # Angel One placeOrder expects: variety, tradingsymbol, symboltoken, transactiontype,
 # exchange (NFO for options), ordertype, producttype, duration, quantity (and optional price)
 
+# orderBook status -> PaperBroker-style status
+_STATUS = {"complete": "COMPLETE", "rejected": "REJECTED", "cancelled": "CANCELLED"}
+
+
+def order_params(symbol, token, qty, transaction_type):
+    """Build order dict for NFO options (INTRADAY, MARKET)."""
+    return {
+        "variety": "NORMAL",
+        "tradingsymbol": symbol,
+        "symboltoken": token,
+        "transactiontype": transaction_type,
+        "exchange": "NFO",
+        "ordertype": "MARKET",
+        "producttype": "INTRADAY",
+        "duration": "DAY",
+        "quantity": qty,
+    }
+
 
 class OrderManager:
 
-    def __init__(self, api):
+    def __init__(self, api, book_ttl_sec=ORDER_BOOK_TTL_SEC):
         self.api = api
-
-    def _order_params(self, symbol, token, qty, transaction_type):
-        """Build order dict for NFO options (INTRADAY, MARKET)."""
-        return {
-            "variety": "NORMAL",
-            "tradingsymbol": symbol,
-            "symboltoken": token,
-            "transactiontype": transaction_type,
-            "exchange": "NFO",
-            "ordertype": "MARKET",
-            "producttype": "INTRADAY",
-            "duration": "DAY",
-            "quantity": qty,
-        }
+        self.book_ttl_sec = book_ttl_sec
+        self._book = {}  # order_id -> orderBook row
+        self._book_ts = 0.0
+        self._book_lock = threading.Lock()
 
     def buy(self, symbol, token, qty):
         """Place BUY order. Returns order_id from API or None."""
-        order = self._order_params(symbol, token, qty, "BUY")
+        order = order_params(symbol, token, qty, "BUY")
         return self.api.placeOrder(order)
 
     def sell(self, symbol, token, qty):
         """Place SELL order. Returns order_id from API or None."""
-        order = self._order_params(symbol, token, qty, "SELL")
+        order = order_params(symbol, token, qty, "SELL")
         return self.api.placeOrder(order)
+
+    def place(self, params):
+        """Place a ready-made order dict (e.g. a pre-staged template). Returns order_id or None."""
+        return self.api.placeOrder(params)
+
+    def cancel(self, order_id, variety="NORMAL"):
+        """Cancel an open order. Returns True if the broker accepted the cancel."""
+        try:
+            result = self.api.cancelOrder(order_id, variety)
+        except Exception:
+            return False
+        return bool(result)
+
+    def order_status(self, order_id):
+        """
+        {status, qty, filled_qty, avg_price, reason} from the order book, or None.
+        status: COMPLETE, REJECTED, CANCELLED or OPEN. One orderBook call serves every
+        lookup within ORDER_BOOK_TTL_SEC (sliced orders query many children at once).
+        """
+        with self._book_lock:
+            if time.time() - self._book_ts > self.book_ttl_sec or order_id not in self._book:
+                try:
+                    result = self.api.orderBook()
+                except Exception:
+                    result = None
+                if result and result.get("data"):
+                    self._book = {row.get("orderid"): row for row in result["data"]}
+                    self._book_ts = time.time()
+            row = self._book.get(order_id)
+        if row is None:
+            return None
+        filled = int(float(row.get("filledshares") or 0))
+        return {
+            "order_id": order_id,
+            "status": _STATUS.get(str(row.get("status", "")).lower(), "OPEN"),
+            "qty": int(float(row.get("quantity") or 0)),
+            "filled_qty": filled,
+            "avg_price": float(row.get("averageprice") or 0) if filled else None,
+            "reason": row.get("text") or None,
+        }
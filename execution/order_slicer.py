@@ -0,0 +1,194 @@
+"""
+Freeze-quantity aware order slicing.
+Same interface as OrderManager / PaperBroker (buy / sell -> order_id, order_status,
+cancel), wrapped around either. A parent above the exchange freeze quantity for INDEX
+(FREEZE_QTY, rounded down to whole lots) is split into child orders at or below it,
+placed concurrently on a worker pool. Parents at or below the limit go straight to the
+broker and keep the broker's order id.
+If a child fails to place or is rejected, children not yet sent are dropped and open
+ones are cancelled. order_status(parent_id) aggregates the children: filled quantity,
+average price, COMPLETE / PARTIAL / REJECTED / OPEN, and the parent completion latency
+(submit -> every child terminal). Live children are polled in the background for up to
+ORDER_SLICE_WAIT_SEC; paper children settle after the simulated latency.
+"""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config.settings import (
+    INDEX,
+    LOT_SIZE,
+    FREEZE_QTY,
+    ORDER_SLICE_WORKERS,
+    ORDER_SLICE_WAIT_SEC,
+)
+from ops.event_log import LOG
+
+TERMINAL = ("COMPLETE", "PARTIAL", "REJECTED", "CANCELLED", "FAILED")
+STATUS_POLL_SEC = 0.2
+
+
+class OrderSlicer:
+
+    def __init__(
+        self,
+        broker,
+        freeze_qty=FREEZE_QTY.get(INDEX),
+        lot_size=LOT_SIZE,
+        workers=ORDER_SLICE_WORKERS,
+        wait_sec=ORDER_SLICE_WAIT_SEC,
+    ):
+        """broker: OrderManager (live) or PaperBroker."""
+        self.broker = broker
+        self.lot_size = lot_size
+        self.max_child = max(lot_size, (freeze_qty // lot_size) * lot_size) if freeze_qty else None
+        self.wait_sec = wait_sec
+        self.parents = {}  # parent_id -> parent record
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slicer")
+
+    def split(self, qty):
+        """Child quantities (each <= max_child, whole lots where qty is)."""
+        if not self.max_child or qty <= self.max_child:
+            return [qty]
+        full, rest = divmod(qty, self.max_child)
+        return [self.max_child] * full + ([rest] if rest else [])
+
+    def buy(self, symbol, token, qty):
+        return self._submit(symbol, token, qty, "BUY")
+
+    def sell(self, symbol, token, qty):
+        return self._submit(symbol, token, qty, "SELL")
+
+    def place(self, params):
+        """Ready-made order dict (pre-staged template); children patch only the quantity."""
+        return self._submit(
+            params["tradingsymbol"], params["symboltoken"], int(params["quantity"]), params["transactiontype"], params
+        )
+
+    def _submit(self, symbol, token, qty, side, params=None):
+        if params is not None:
+            place = lambda symbol, token, q: self.broker.place(dict(params, quantity=q))
+        else:
+            place = self.broker.buy if side == "BUY" else self.broker.sell
+        sizes = self.split(qty)
+        if len(sizes) == 1:
+            return place(symbol, token, qty)
+        parent_id = f"SLICE{next(self._ids)}"
+        parent = {
+            "order_id": parent_id,
+            "symbol": symbol,
+            "token": token,
+            "side": side,
+            "qty": qty,
+            "filled_qty": 0,
+            "avg_price": None,
+            "status": "OPEN",
+            "reason": None,
+            "children": [],
+            "submit_ts": time.time(),
+            "complete_ts": None,
+            "latency_ms": None,
+        }
+        futures = {self._pool.submit(place, symbol, token, q): q for q in sizes}
+        failed = False
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            child = {"order_id": None, "qty": futures[future], "status": "OPEN", "filled_qty": 0, "avg_price": None}
+            try:
+                child["order_id"] = future.result()
+            except Exception as e:
+                child["reason"] = str(e)
+            if not child["order_id"]:
+                child["status"] = "FAILED"
+                if not failed:
+                    failed = True
+                    # Children not yet sent are dropped
+                    for other in futures:
+                        other.cancel()
+            parent["children"].append(child)
+        dropped = sum(1 for f in futures if f.cancelled())
+        if dropped:
+            parent["reason"] = f"{dropped} child orders not sent after a placement failure"
+        with self._lock:
+            self.parents[parent_id] = parent
+        self._refresh(parent)
+        if parent["status"] not in TERMINAL:
+            self._pool.submit(self._track, parent)
+        LOG.info(
+            "order_sliced", side=side, symbol=symbol, qty=qty, children=len(sizes),
+            sent=len(parent["children"]), order_id=parent_id,
+        )
+        return parent_id
+
+    def _track(self, parent):
+        deadline = time.time() + self.wait_sec
+        while time.time() < deadline:
+            time.sleep(STATUS_POLL_SEC)
+            if self._refresh(parent) in TERMINAL:
+                return
+        LOG.warning("order_slice_timeout", parent["reason"] or "", order_id=parent["order_id"], every=0)
+
+    def _refresh(self, parent):
+        """Update children from the broker, cancel open ones after a failure, aggregate."""
+        with self._lock:
+            for child in parent["children"]:
+                if child["status"] in TERMINAL or not child["order_id"]:
+                    continue
+                status = self.broker.order_status(child["order_id"])
+                if status:
+                    child["status"] = status["status"]
+                    child["filled_qty"] = status.get("filled_qty") or 0
+                    child["avg_price"] = status.get("avg_price")
+                    if status.get("reason"):
+                        child["reason"] = status["reason"]
+            bad = any(c["status"] in ("FAILED", "REJECTED") for c in parent["children"])
+            if bad:
+                for child in parent["children"]:
+                    if child["status"] not in TERMINAL and not child.get("cancel_sent"):
+                        child["cancel_sent"] = True
+                        if self.broker.cancel(child["order_id"]):
+                            child["status"] = "CANCELLED"
+            filled = sum(c["filled_qty"] for c in parent["children"])
+            notional = sum(c["filled_qty"] * c["avg_price"] for c in parent["children"] if c["filled_qty"])
+            parent["filled_qty"] = filled
+            parent["avg_price"] = notional / filled if filled else None
+            if all(c["status"] in TERMINAL for c in parent["children"]):
+                if filled == parent["qty"]:
+                    parent["status"] = "COMPLETE"
+                else:
+                    parent["status"] = "PARTIAL" if filled else "REJECTED"
+                    reasons = [c.get("reason") for c in parent["children"] if c.get("reason")]
+                    parent["reason"] = parent["reason"] or (reasons[0] if reasons else "Children not filled")
+                if parent["complete_ts"] is None:
+                    parent["complete_ts"] = time.time()
+                    parent["latency_ms"] = round((parent["complete_ts"] - parent["submit_ts"]) * 1000, 1)
+                    LOG.info(
+                        "order_slice_done", parent["status"], order_id=parent["order_id"],
+                        filled=filled, qty=parent["qty"], avg_price=parent["avg_price"],
+                        latency_ms=parent["latency_ms"],
+                    )
+            return parent["status"]
+
+    def order_status(self, order_id):
+        """Parent aggregate for sliced orders, else the broker's own status."""
+        parent = self.parents.get(order_id)
+        if parent is None:
+            return self.broker.order_status(order_id)
+        if parent["status"] not in TERMINAL:
+            self._refresh(parent)
+        return parent
+
+    def cancel(self, order_id):
+        parent = self.parents.get(order_id)
+        if parent is None:
+            return self.broker.cancel(order_id)
+        with self._lock:
+            cancelled = False
+            for child in parent["children"]:
+                if child["status"] not in TERMINAL and child["order_id"]:
+                    child["cancel_sent"] = True
+                    cancelled = self.broker.cancel(child["order_id"]) or cancelled
+        return cancelled
@@ -0,0 +1,73 @@
+"""
+Pre-staged order templates for the strike neighbourhood.
+Keeps ready-to-send BUY and SELL payloads (order_manager.order_params) for ATM +-
+STAGE_STRIKES_EACH_SIDE strikes, CE and PE, of the active expiry, built from the
+resolved option basket (MARKET.contracts). refresh(spot) only rebuilds when the ATM
+strike moves or the basket is re-centred (new contracts), so the entry path is a dict
+lookup plus a quantity patch:
+    params = staging.params(token, "BUY", qty)  ->  order_manager.place(params)
+Contracts outside the staged window miss (params() returns None) and the caller
+builds the order as before.
+"""
+import time
+from config.settings import STRIKE_STEP, STAGE_STRIKES_EACH_SIDE
+from data.cache.market_cache import MARKET
+from execution.order_manager import order_params
+
+
+class OrderStaging:
+
+    def __init__(self, cache=MARKET, width=STAGE_STRIKES_EACH_SIDE, step=STRIKE_STEP):
+        self.cache = cache
+        self.width = width
+        self.step = step
+        self.atm = None
+        self.expiry = None
+        self._basket = 0
+        self._staged = {}  # (token, "BUY" / "SELL") -> order params (quantity unset)
+        self._by_strike = {}  # (strike, "CE" / "PE") -> token
+        self.stats = {"rebuilds": 0, "hits": 0, "misses": 0, "last_build_us": None}
+
+    def refresh(self, spot, expiry=None):
+        """Restage around spot's ATM strike if it moved (or the basket/expiry changed)."""
+        if spot is None or not self.cache.contracts:
+            return False
+        atm = round(spot / self.step) * self.step
+        if expiry is None:
+            expiry = next(iter(self.cache.contracts.values())).get("expiry")
+        basket = len(self.cache.contracts)  # contracts are only added (chain re-centring)
+        if atm == self.atm and expiry == self.expiry and basket == self._basket and self._staged:
+            return False
+        t0 = time.perf_counter()
+        lo, hi = atm - self.width * self.step, atm + self.width * self.step
+        staged, by_strike = {}, {}
+        for token, c in list(self.cache.contracts.items()):
+            if c.get("expiry") != expiry or not lo <= c["strike"] <= hi:
+                continue
+            for txn in ("BUY", "SELL"):
+                staged[(token, txn)] = order_params(c["symbol"], token, 0, txn)
+            by_strike[(c["strike"], c["side"])] = token
+        self._staged, self._by_strike = staged, by_strike  # swapped whole: readers never see a partial set
+        self.atm, self.expiry, self._basket = atm, expiry, basket
+        self.stats["rebuilds"] += 1
+        self.stats["last_build_us"] = round((time.perf_counter() - t0) * 1e6, 1)
+        return True
+
+    def params(self, token, transaction_type, qty):
+        """Ready order dict for a staged contract with quantity set, or None (not staged)."""
+        template = self._staged.get((token, transaction_type))
+        if template is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        order = dict(template)
+        order["quantity"] = qty
+        return order
+
+    def token_for(self, strike, side):
+        """Staged token for (strike, CE/PE), or None."""
+        return self._by_strike.get((strike, side))
+
+    def staged(self):
+        """Staged (strike, side) pairs, sorted."""
+        return sorted(self._by_strike)
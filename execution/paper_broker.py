@@ -0,0 +1,165 @@
+"""
+Paper exchange simulator (LIVE_TRADING = False).
+Same interface as OrderManager (buy / sell -> order_id) plus order_status. Market
+orders are matched level by level against the cached 5-level depth of the actual
+option token, as of submit time + simulated latency, with adverse slippage ticks.
+Unfilled remainder of a market order is cancelled (IOC): status COMPLETE, PARTIAL
+or REJECTED.
+When the depth history already reaches the fill time (replay clock in backtests) the
+match is synchronous, so backtests can push thousands of orders/s. Live, the fill time
+is in the future: the order stays OPEN and is matched against the book as of fill_ts
+once the clock passes it (timer, or the first order_status() after fill_ts).
+Only the latest PAPER_ORDERS_KEPT settled orders are kept (order_status() of an older one
+is None); open orders are never dropped.
+"""
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from config.settings import (
+    PAPER_LATENCY_MS,
+    PAPER_LATENCY_JITTER_MS,
+    PAPER_SLIPPAGE_TICKS,
+    PAPER_TICK_SIZE,
+    PAPER_ORDERS_KEPT,
+)
+from data.cache.market_cache import MARKET
+from data.cache.depth_history import BID_PX, BID_QTY, ASK_PX, ASK_QTY
+
+
+class PaperBroker:
+
+    def __init__(
+        self,
+        cache=MARKET,
+        latency_ms=PAPER_LATENCY_MS,
+        latency_jitter_ms=PAPER_LATENCY_JITTER_MS,
+        slippage_ticks=PAPER_SLIPPAGE_TICKS,
+        tick_size=PAPER_TICK_SIZE,
+        clock=time.time,
+        seed=None,
+    ):
+        """clock: returns current time (replay clock in backtests); seed: latency jitter RNG."""
+        self.cache = cache
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.tick_size = tick_size
+        self.slippage = slippage_ticks * tick_size
+        self.clock = clock
+        self.orders = {}  # order_id -> order record
+        self._settled = deque()  # settled order ids, oldest first (pruned past PAPER_ORDERS_KEPT)
+        self._ids = itertools.count(1)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def buy(self, symbol, token, qty):
+        """Simulated BUY. Returns order_id (also for rejections; see order_status)."""
+        return self._submit(symbol, token, qty, "BUY")
+
+    def sell(self, symbol, token, qty):
+        """Simulated SELL. Returns order_id (also for rejections; see order_status)."""
+        return self._submit(symbol, token, qty, "SELL")
+
+    def place(self, params):
+        """Simulated order from an OrderManager-style params dict (pre-staged templates)."""
+        return self._submit(
+            params["tradingsymbol"], params["symboltoken"], int(params["quantity"]), params["transactiontype"]
+        )
+
+    def order_status(self, order_id):
+        """{status, qty, filled_qty, avg_price, fills, submit_ts, fill_ts, reason} or None."""
+        order = self.orders.get(order_id)
+        if order is not None and order["status"] == "OPEN" and self.clock() >= order["fill_ts"]:
+            self._settle(order)
+        return order
+
+    def cancel(self, order_id):
+        """Market orders are IOC: nothing ever rests, so there is nothing to cancel."""
+        return False
+
+    def _submit(self, symbol, token, qty, side):
+        submit_ts = self.clock()
+        latency = (self.latency_ms + self._rng.uniform(0, self.latency_jitter_ms)) / 1000
+        fill_ts = submit_ts + latency
+        order_id = f"PAPER{next(self._ids)}"
+        order = {
+            "order_id": order_id,
+            "symbol": symbol,
+            "token": token,
+            "side": side,
+            "qty": qty,
+            "filled_qty": 0,
+            "avg_price": None,
+            "fills": [],
+            "submit_ts": submit_ts,
+            "fill_ts": fill_ts,
+            "status": "REJECTED",
+            "reason": None,
+        }
+        self.orders[order_id] = order
+        if qty <= 0:
+            order["reason"] = "Invalid quantity"
+            with self._lock:
+                self._done(order)
+            return order_id
+        last = self.cache.depth.last_ts(token)
+        if last is not None and last >= fill_ts:
+            self._settle(order)
+        else:
+            order["status"] = "OPEN"
+            timer = threading.Timer(latency, self._settle, (order,))
+            timer.daemon = True
+            timer.start()
+        return order_id
+
+    def _settle(self, order):
+        """Match order against the book as of its fill time (once)."""
+        with self._lock:
+            if order.get("settled"):
+                return
+            order["settled"] = True
+            order["status"] = "REJECTED"
+            book = self.cache.depth.at(order["token"], order["fill_ts"])
+            if book is None:
+                order["reason"] = "No depth for token"
+            else:
+                self._match(order, book)
+            self._done(order)
+
+    def _done(self, order):
+        """Order is terminal: keep it for order_status(), dropping the oldest settled ones."""
+        self._settled.append(order["order_id"])
+        while len(self._settled) > PAPER_ORDERS_KEPT:
+            self.orders.pop(self._settled.popleft(), None)
+
+    def _match(self, order, book):
+        """Walk the opposite side of the book (best level first)."""
+        if order["side"] == "BUY":
+            prices, sizes, slip = book[ASK_PX], book[ASK_QTY], self.slippage
+        else:
+            prices, sizes, slip = book[BID_PX], book[BID_QTY], -self.slippage
+        remaining = order["qty"]
+        notional = 0.0
+        for px, size in zip(prices.tolist(), sizes.tolist()):
+            if remaining <= 0:
+                break
+            if px <= 0 or size <= 0:
+                continue
+            take = min(remaining, int(size))
+            # Depth is stored as float32: snap back to the tick grid
+            fill_px = max(self.tick_size, round(round((px + slip) / self.tick_size) * self.tick_size, 2))
+            order["fills"].append((fill_px, take))
+            notional += fill_px * take
+            remaining -= take
+        filled = order["qty"] - remaining
+        if filled == 0:
+            order["reason"] = "No liquidity on opposite side"
+            return
+        order["filled_qty"] = filled
+        order["avg_price"] = notional / filled
+        if remaining:
+            order["status"] = "PARTIAL"
+            order["reason"] = f"Depth exhausted; {remaining} cancelled"
+        else:
+            order["status"] = "COMPLETE"
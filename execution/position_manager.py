@@ -1,7 +1,15 @@
 """
 Position Manager per spec.
 Tracks entry, stop-loss, target. Two-leg GTT (Good Till Triggered) for SL + Target
-is set at order placement (stub when broker does not support GTT).
+is emulated locally by ExitEngine (execution/exit_engine.py), which evaluates the
+held option's own LTP on every tick.
+Option positions (token set) are long premium: SL below and target above entry for
+both CE and PE. Without a token the legacy spot-based levels are used.
+With a write-ahead log attached (wal, ops/wal.py) every enter / trail / exit / reopen is logged
+with the full state, so a restart resumes the open position. Closing is two records:
+close() logs the intent (exiting, then exit_order once the SELL has an id) and only
+closed() logs exit, after the SELL is confirmed; a log ending in an unconfirmed exit is
+recovered as still open.
 """
 from config.settings import TRAIL_FACTOR
 
@@ -14,29 +22,70 @@ class PositionManager:
         self.target = 0  # per spec: two-leg GTT SL + Target
         self.qty = 0
         self.side = None  # "CE" or "PE"
+        self.token = None  # option token when the position is priced on premium
+        self.symbol = None
+        self.stop_distance = 0
         self._realized_pnl = 0  # for risk governor daily PnL
+        self.exit_reason = None
+        self.wal = None  # WriteAheadLog, attached by WriteAheadLog.recover()
 
-    def enter(self, price, stop_distance, qty, side="CE", target_ratio=1.5):
+    def state(self):
+        return {
+            "active": self.active,
+            "entry": self.entry,
+            "sl": self.sl,
+            "target": self.target,
+            "qty": self.qty,
+            "side": self.side,
+            "token": self.token,
+            "symbol": self.symbol,
+            "stop_distance": self.stop_distance,
+        }
+
+    def restore(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _log(self, kind, **fields):
+        if self.wal is not None:
+            self.wal.append(kind, state=self.state(), **fields)
+
+    def enter(self, price, stop_distance, qty, side="CE", target_ratio=1.5, token=None, symbol=None):
         """
         Enter position. target_ratio = target distance / stop distance (e.g. 1.5R).
-        Two-leg GTT (SL + Target) should be placed by execution layer after order.
+        price/stop_distance are option premium when token is given, else spot.
         """
         self.active = True
         self.entry = price
         self.qty = qty
         self.side = side
-        if side == "CE":
+        self.token = token
+        self.symbol = symbol
+        self.stop_distance = stop_distance
+        if self._long:
             self.sl = price - stop_distance
             self.target = price + (stop_distance * target_ratio)
         else:
             self.sl = price + stop_distance
             self.target = price - (stop_distance * target_ratio)
+        self._log("enter")
+
+    @property
+    def _long(self):
+        """Premium positions are always long; spot positions follow CE/PE direction."""
+        return self.token is not None or self.side == "CE" or self.side is None
 
     def trail(self, price):
-        """Trailing stop: move SL in favor (CE: raise SL when price rises; PE: lower SL when price falls)."""
+        """Trailing stop: move SL in favor only."""
         if not self.active:
             return
-        if self.side == "CE" or self.side is None:
+        sl = self.sl
+        if self.token is not None:
+            # Premium: trail at TRAIL_FACTOR x initial stop distance below the high
+            new_sl = price - self.stop_distance * TRAIL_FACTOR
+            if new_sl > self.sl:
+                self.sl = new_sl
+        elif self._long:
             new_sl = price * 0.99
             if new_sl > self.sl:
                 self.sl = new_sl
@@ -44,6 +93,8 @@ class PositionManager:
             new_sl = price * 1.01
             if new_sl < self.sl:
                 self.sl = new_sl
+        if self.sl != sl:
+            self._log("trail")
 
     def exit_check(self, price):
         """
@@ -51,22 +102,34 @@ class PositionManager:
         """
         if not self.active:
             return False
-        if self.side == "CE" or self.side is None:
-            if price <= self.sl:
-                self.active = False
-                return True
-            if self.target and price >= self.target:
-                self.active = False
-                return True
+        if self._long:
+            hit = price <= self.sl or (self.target and price >= self.target)
         else:
-            if price >= self.sl:
-                self.active = False
-                return True
-            if self.target and price <= self.target:
-                self.active = False
-                return True
+            hit = price >= self.sl or (self.target and price <= self.target)
+        if hit:
+            self.close("SL/target", price)
+            return True
         return False
 
+    def close(self, reason, price=None):
+        """Mark the position closing (exit order is the caller's; confirm with closed())."""
+        self.active = False
+        self.exit_reason = reason
+        self._log("exiting", reason=reason, price=price)
+
+    def exit_sent(self, order_id):
+        """The exit SELL is placed (recovery asks the broker about it)."""
+        self._log("exit_order", order_id=order_id)
+
+    def closed(self, price=None, order_id=None):
+        """The exit is confirmed (filled, or no order needed): the position is flat."""
+        self._log("exit", reason=self.exit_reason, price=price, order_id=order_id)
+
+    def reopen(self):
+        """Undo close() when the exit order did not go through (position still held)."""
+        self.active = True
+        self._log("reopen")
+
     def set_realized_pnl(self, pnl):
         self._realized_pnl = pnl
 
@@ -1,19 +1,128 @@
-from execution.greek_engine import GreekEngine
+"""
+Strike selection over the subscribed option chain.
+Per-strike columns (delta, IV, premium, spread, resting depth) are refreshed once
+per bar; `rank` then scores every candidate in one vectorized pass:
+hard filters (side, spec Delta >= 0.25 / IV <= 25%, quote present, premium per lot
+affordable) followed by a weighted cost on delta-target error, relative spread,
+thin depth and IV. Without a chain, `select` falls back to ATM/ITM rounding.
+"""
+import numpy as np
+from config.settings import (
+    LOT_SIZE,
+    STRIKE_STEP,
+    STRIKE_DELTA_MIN,
+    STRIKE_IV_MAX_PCT,
+    STRIKE_TARGET_DELTA_ATM,
+    STRIKE_TARGET_DELTA_ITM,
+    STRIKE_W_DELTA,
+    STRIKE_W_SPREAD,
+    STRIKE_W_DEPTH,
+    STRIKE_W_IV,
+)
+from data.cache.market_cache import MARKET
+from data.cache.depth_history import BID_PX, BID_QTY, ASK_PX, ASK_QTY
 
 
 class StrikeEngine:
 
-    def __init__(self):
-        self.greeks = GreekEngine()
+    def __init__(self, greeks=None, step=STRIKE_STEP, lot_size=LOT_SIZE):
+        """greeks: shared GreekEngine over the subscribed chain (None = rounding only)."""
+        self.greeks = greeks
+        self.step = step
+        self.lot_size = lot_size
+        # Per-strike columns aligned with greeks.tokens (see refresh)
+        self.premium = np.zeros(0)
+        self.spread_pct = np.zeros(0)
+        self.depth_lots = np.zeros(0)
 
-    def select(self, spot, context, momentum):
+    def gamma_mode(self, context, momentum):
 
-        gamma = self.greeks.gamma_mode(context, momentum)
+        if context == "UPTREND" and momentum > 40:
+            return "HIGH"
+
+        return "NORMAL"
+
+    def refresh(self, cache=MARKET):
+        """Rebuild premium / spread / depth columns from the cache (call once per bar)."""
+        if self.greeks is None or not self.greeks.tokens:
+            return
+        tokens = self.greeks.tokens
+        self.premium = np.array(
+            [cache.option_premium(t) or np.nan for t in tokens], dtype=np.float64
+        )
+        book = cache.depth.latest_many(tokens).astype(np.float64)
+        bid, ask = book[:, BID_PX, 0], book[:, ASK_PX, 0]
+        mid = (bid + ask) / 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            spread = np.where((bid > 0) & (ask > 0), (ask - bid) / mid * 100, np.nan)
+        self.spread_pct = spread
+        self.depth_lots = np.nan_to_num(
+            book[:, BID_QTY, :].sum(axis=1) + book[:, ASK_QTY, :].sum(axis=1)
+        ) / self.lot_size
+
+    def rank(self, side, context, momentum, budget=None,
+             delta_min=STRIKE_DELTA_MIN, iv_max_pct=STRIKE_IV_MAX_PCT):
+        """
+        Score every chain contract for side ("CE"/"PE").
+        budget: max premium per lot (rupees); None = no affordability filter.
+        Returns (best, ranked): contract dicts {token, strike, side, delta, iv, premium,
+        spread_pct, depth_lots, cost}, best first; best is None when nothing qualifies.
+        """
+        g = self.greeks
+        if g is None or not g.tokens or self.premium.shape[0] != len(g.tokens):
+            return None, []
+        target = (
+            STRIKE_TARGET_DELTA_ATM
+            if self.gamma_mode(context, momentum) == "HIGH"
+            else STRIKE_TARGET_DELTA_ITM
+        )
+        abs_delta = np.abs(g.delta)
+        ok = g.eligible(delta_min, iv_max_pct)
+        ok &= g.is_call == (side == "CE")
+        ok &= np.isfinite(self.premium) & np.isfinite(self.spread_pct)
+        if budget is not None:
+            ok &= self.premium * self.lot_size <= budget
+        if not ok.any():
+            return None, []
+        cost = (
+            STRIKE_W_DELTA * np.abs(abs_delta - target)
+            + STRIKE_W_SPREAD * self.spread_pct
+            + STRIKE_W_DEPTH / (1 + self.depth_lots)
+            + STRIKE_W_IV * g.iv
+        )
+        idx = np.nonzero(ok)[0]
+        order = idx[np.argsort(cost[idx], kind="stable")]
+        ranked = [
+            {
+                "token": g.tokens[i],
+                "strike": float(g.strike[i]),
+                "side": side,
+                "delta": float(g.delta[i]),
+                "iv": float(g.iv[i]),
+                "premium": float(self.premium[i]),
+                "spread_pct": float(self.spread_pct[i]),
+                "depth_lots": float(self.depth_lots[i]),
+                "cost": float(cost[i]),
+            }
+            for i in order
+        ]
+        return ranked[0], ranked
+
+    def select(self, spot, context, momentum, side="CE"):
+        """Best strike from `rank` when a chain is loaded, else ATM / one strike ITM by rounding."""
+        best, _ = self.rank(side, context, momentum)
+        if best is not None:
+            return best["strike"]
+
+        gamma = self.gamma_mode(context, momentum)
 
         if gamma == "HIGH":
-            strike = round(spot / 50) * 50  # ATM
+            strike = round(spot / self.step) * self.step  # ATM
+
+        elif side == "PE":
+            strike = round((spot + self.step) / self.step) * self.step  # ITM bias (put)
 
         else:
-            strike = round((spot - 50) / 50) * 50  # ITM bias
+            strike = round((spot - self.step) / self.step) * self.step  # ITM bias
 
         return strike
@@ -5,7 +5,7 @@ Every AI decision must pass sequential validation before order placement:
 2. Strike Alignment Check: selected strike adheres to strikeGuidance (Delta >= 0.25, IV <= 25%).
 3. Margin Check: sufficient free margin via API.
 4. Position Limits: user-defined max positions.
-5. Market Hours Check: 9:20 AM - 3:28 PM IST.
+5. Market Hours Check: 9:20 AM - 3:28 PM IST, and spot/VIX/contract feeds not stale.
 6. Circuit Breaker Check: daily loss and drawdown limits not breached.
 7. Order Execution: place order and set two-leg GTT (SL + Target).
 """
@@ -29,7 +29,7 @@ from config.settings import (
     STRIKE_DELTA_MIN,
     STRIKE_IV_MAX_PCT,
 )
-from data.cache.market_cache import MARKET
+from data.cache.market_cache import MARKET, SPOT_TOKEN, VIX_TOKEN
 
 
 # Decision max age (seconds) - treat as stale after this
@@ -62,14 +62,24 @@ def step1_ai_gating(decision, vix, trade_count):
     return True, "OK"
 
 
-def step2_strike_alignment(strike, spot, decision_strike_guidance):
+def step2_strike_alignment(strike, spot, decision_strike_guidance, greeks=None):
     """
     Step 2: Strike adheres to strikeGuidance (e.g. Delta >= 0.25, IV <= 25%).
+    greeks: {delta, iv, ...} for the selected contract from GreekEngine.
     When Greeks/IV not available we use distance-from-ATM as proxy for delta zone.
     """
     if decision_strike_guidance is None:
         return True, "OK"
+    if strike is None:
+        return False, "No strike meets delta/IV guidance"
     delta_min = decision_strike_guidance.get("delta_min", STRIKE_DELTA_MIN)
+    iv_max_pct = decision_strike_guidance.get("iv_max_pct", STRIKE_IV_MAX_PCT)
+    if greeks is not None:
+        if abs(greeks["delta"]) < delta_min:
+            return False, f"Delta {abs(greeks['delta']):.2f} < {delta_min}"
+        if greeks["iv"] * 100 > iv_max_pct:
+            return False, f"IV {greeks['iv'] * 100:.1f}% > {iv_max_pct}%"
+        return True, "OK"
     # Proxy: ATM ± 50 ~ delta in range; far OTM = reject
     diff = abs(spot - strike) if (spot and strike) else 0
     if diff > 200:  # far OTM proxy
@@ -89,17 +99,19 @@ def step4_position_limits(active_positions, max_positions=1):
     return True, "OK"
 
 
-def step5_market_hours():
-    """Step 5: Trade within 9:20 AM - 3:28 PM IST."""
+def step5_market_hours(feed_tokens=()):
+    """Step 5: Trade within 9:20 AM - 3:28 PM IST, on live (non-stale) data."""
     if not is_market_hours():
         return False, "Outside market hours"
-    return True, "OK"
+    return MARKET.feed.gate(feed_tokens, time.time())
 
 
-def step6_circuit_breaker(daily_pnl, max_daily_loss=MAX_DAILY_LOSS):
-    """Step 6: Daily loss and drawdown limits not breached."""
+def step6_circuit_breaker(daily_pnl, max_daily_loss=MAX_DAILY_LOSS, risk=None):
+    """Step 6: Daily loss and drawdown limits not breached (RiskGovernor state when given)."""
     if daily_pnl is not None and daily_pnl <= -max_daily_loss:
         return False, "Daily loss limit breached"
+    if risk is not None and risk.circuit_breaker_breached():
+        return False, risk.breach_reason
     return True, "OK"
 
 
@@ -111,9 +123,15 @@ def run_validation_chain(
     daily_pnl,
     strike,
     spot,
+    greeks=None,
+    feed_tokens=(SPOT_TOKEN, VIX_TOKEN),
+    risk=None,
 ):
     """
     Run all 7 steps. Returns (passed: bool, failed_step: int 1-7 or 0, reason: str).
+    greeks: Greeks of the selected contract (None = distance proxy in step 2).
+    feed_tokens: tokens whose feed must be live (step 5); add the contract token.
+    risk: RiskGovernor for the drawdown limit in step 6.
     Step 7 (order execution) is done by caller after validation passes.
     """
     # Step 1
@@ -123,7 +141,7 @@ def run_validation_chain(
     # Step 2 (only for trade actions)
     if decision.get("action") in (ACTION_TRADE_CE, ACTION_TRADE_PE):
         ok, msg = step2_strike_alignment(
-            strike, spot, decision.get("strikeGuidance")
+            strike, spot, decision.get("strikeGuidance"), greeks
         )
         if not ok:
             return False, 2, msg
@@ -136,11 +154,11 @@ def run_validation_chain(
     if not ok:
         return False, 4, msg
     # Step 5
-    ok, msg = step5_market_hours()
+    ok, msg = step5_market_hours(feed_tokens)
     if not ok:
         return False, 5, msg
     # Step 6
-    ok, msg = step6_circuit_breaker(daily_pnl)
+    ok, msg = step6_circuit_breaker(daily_pnl, risk=risk)
     if not ok:
         return False, 6, msg
     return True, 0, "OK"
@@ -4,27 +4,47 @@ Multi-layered, event-driven: data -> metrics -> contextual risk -> decision -> 7
 """
 import time
 import threading
+from datetime import datetime
 from config.settings import (
     INDEX,
-    LOT_SIZE,
-    API_KEY,
-    CLIENT_ID,
-    PASSWORD,
-    TOTP_SECRET,
     DECISION_INTERVAL_LOW_VOL,
-    LIVE_TRADING,
+    DECISION_PROVIDER,
+    DECISION_JOURNAL,
+    SHADOW_ENABLED,
+    INGEST_PROCESS,
+    TICK_RECORD,
+    TICK_COMPACT_AT,
+    FEED_OPTION_STALE_SEC,
+    STRIKE_STEP,
+    CHAIN_STRIKES_EACH_SIDE,
+    CHAIN_RECENTER_STRIKES,
     OPTION_EXPIRY_DDMMMYY,
+    STRATEGY_BAR_SEC,
+    STRIKE_MAX_PREMIUM_PCT,
+    STRIKE_FALLBACKS,
+    VWAP_TOKEN,
+    FUTURES_EXPIRY_DDMMMYY,
 )
-from data.angel.angel_login import AngelSession
 from data.angel.angel_ws import AngelWS
+from data.angel.ingest_process import IngestProcess
+from data.store.tick_recorder import TickRecorder
+from data.store.tick_store import end_of_day
 from data.angel.angel_subscribe import AngelSubscribe
-from data.cache.market_cache import MARKET
+from data.angel.ws_supervisor import ReconnectSupervisor
+from data.angel.candle_backfill import CandleBackfill
+from data.cache.market_cache import MARKET, SPOT_TOKEN, VIX_TOKEN
+from ops.event_log import LOG
+from ops.decision_journal import JOURNAL
+from ops.profiler import PROFILER
 
 from engines.context import ContextEngine
+from engines.breadth import BreadthEngine
 from engines.participation import ParticipationEngine
+from engines.shadow import ShadowRunner
 from engines.volatility import VolatilityEngine
 from engines.decay import DecayEngine
 from engines.structure import StructureEngine
+from engines.vwap import VWAPEngine
 from engines.metrics import (
     rsi,
     ma_crossover_score,
@@ -40,59 +60,117 @@ from engines.contextual_risk import (
     vix_regime,
     market_phase,
     decision_interval_seconds,
+    required_confidence,
+    threshold_penalty_pct,
     is_market_hours,
+    IST,
 )
 from engines.decision_engine import (
-    rule_based_decision,
     ACTION_TRADE_CE,
     ACTION_TRADE_PE,
     ACTION_HOLD,
     ACTION_EXIT_ALL,
 )
+from engines.decision_service import (
+    DecisionService,
+    RuleBasedProvider,
+    StubProvider,
+    market_context,
+)
 
-from execution.position_manager import PositionManager
 from execution.strike_engine import StrikeEngine
-from execution.position_sizer import PositionSizer
-from execution.validation_chain import run_validation_chain
-from execution.order_manager import OrderManager
-from execution.option_symbol import get_option_symbol_token
-
-from risk.risk_governor import RiskGovernor
+from execution.account_fanout import AccountFanout, login_accounts
+from execution.order_staging import OrderStaging
+from execution.option_symbol import (
+    get_option_symbol_token,
+    get_future_symbol_token,
+    get_option_chain,
+)
+from execution.greek_engine import GreekEngine
+from execution.validation_chain import step5_market_hours
 
 # ===============================
 # 1. LOGIN
 # ===============================
-session = AngelSession(API_KEY, CLIENT_ID, PASSWORD, TOTP_SECRET)
-api, jwt, feed = session.login()
+if INGEST_PROCESS:
+    # Fork the ingest process first, while this is still the only thread; the feed
+    # session follows after login. Ticks arrive through a shared-memory ring.
+    ws_engine = IngestProcess()
+    ws_engine.start()
+PROFILER.install()  # on-demand cProfile/sampling, tracemalloc and GC capture
+# One session per account (ACCOUNTS), each behind its own rate-limited, prioritized
+# ApiGateway; the first account's session also serves the feed and data calls
+sessions = login_accounts()
+api, jwt, feed = sessions[0]["api"], sessions[0]["jwt"], sessions[0]["feed"]
+feed_account = sessions[0]["config"]
 
 # ===============================
 # 2. WEBSOCKET (run in background - SmartAPI connect() blocks with run_forever())
+# Supervisor reconnects with backoff, resubscribes and backfills gaps from candles.
 # ===============================
-ws_engine = AngelWS(jwt, API_KEY, CLIENT_ID, feed)
-ws_thread = threading.Thread(target=ws_engine.connect, daemon=True)
+if TICK_RECORD:
+    MARKET.recorder = TickRecorder()  # raw ticks for the end-of-day columnar store
+if INGEST_PROCESS:
+    ws_engine.authenticate(jwt, feed_account["api_key"], feed_account["client_id"], feed)
+else:
+    ws_engine = AngelWS(jwt, feed_account["api_key"], feed_account["client_id"], feed)
+supervisor = ReconnectSupervisor(ws_engine, backfill=CandleBackfill(api))
+ws_thread = threading.Thread(target=supervisor.run, daemon=True)
 ws_thread.start()
 # Wait for connection to be established (on_open sets is_connected)
 while not ws_engine.is_connected:
     time.sleep(0.2)
-print("Connected to WebSocket - started")
-subscriber = AngelSubscribe(ws_engine.ws)
+LOG.info("startup", "Connected to WebSocket")
+subscriber = AngelSubscribe(ws_engine)
 subscriber.core()
-print("Subscribed to tokens. Strategy loop starting...")
+MARKET.feed.watch(SPOT_TOKEN)
+MARKET.feed.watch(VIX_TOKEN)
+
+# True VWAP needs traded volume: index futures in QUOTE mode feed the VWAP engine
+vwap_engine = VWAPEngine()
+vwap_token = VWAP_TOKEN or get_future_symbol_token(api, INDEX, FUTURES_EXPIRY_DDMMMYY)[1]
+if vwap_token:
+    # Routed like breadth: futures ticks stay out of the option chain, PDR history and bars
+    MARKET.add_route([vwap_token], vwap_engine.on_tick)
+    subscriber.quote([vwap_token], correlation_id="vwap")
+    MARKET.feed.watch(vwap_token)
+else:
+    LOG.warning("vwap_unavailable", "Futures token not resolved; VWAP falls back to price mean")
+
+# Index constituents in QUOTE mode (LTP + previous close) drive weighted breadth
+breadth_engine = BreadthEngine()
+MARKET.add_route(breadth_engine.tokens, breadth_engine.on_tick)
+subscriber.quote(breadth_engine.tokens, exchange_type=1, correlation_id="breadth")
+LOG.info("startup", "Subscribed to tokens")
 
 # ===============================
 # 3. STRATEGY ENGINES
 # ===============================
 context_engine = ContextEngine()
-participation_engine = ParticipationEngine()
+participation_engine = ParticipationEngine(breadth_engine)
 volatility_engine = VolatilityEngine()
 decay_engine = DecayEngine()
 structure_engine = StructureEngine()
 
-position = PositionManager()
-strike_engine = StrikeEngine()
-sizer = PositionSizer(capital=200000)
-risk = RiskGovernor()
-order_manager = OrderManager(api) if LIVE_TRADING else None
+greek_engine = GreekEngine()  # Black-Scholes Greeks over the subscribed chain
+strike_engine = StrikeEngine(greek_engine)
+# Ready BUY/SELL payloads for ATM +- N strikes, restaged on spot ticks when ATM moves
+staging = OrderStaging()
+MARKET.add_tick_listener(SPOT_TOKEN, lambda token, tick, ts: staging.refresh(MARKET.spot))
+# Per account: sizer capital, RiskGovernor, position, write-ahead log and tick-level exit
+# engine (local two-leg GTT); paper or live orders (sliced above the freeze quantity)
+# fan out to every account concurrently
+fanout = AccountFanout(sessions, staging=staging)
+primary = fanout.primary
+risk, sizer = primary["risk"], primary["sizer"]  # strike budget and the status line
+# Crash recovery: replay today's state transitions, then log every new one
+for token in fanout.recover():
+    subscriber.depth([token], correlation_id="recovered")
+    MARKET.feed.watch(token, FEED_OPTION_STALE_SEC)
+# Decisions run off-loop with a hard deadline; the loop reads the latest completed one
+decision_service = DecisionService(StubProvider() if DECISION_PROVIDER == "stub" else RuleBasedProvider())
+# Rule variants paper-traded on a background thread from each pass's snapshot
+shadow = ShadowRunner() if SHADOW_ENABLED else None
 
 # ===============================
 # 4. MEMORY & DECISION INTERVAL
@@ -100,55 +178,116 @@ order_manager = OrderManager(api) if LIVE_TRADING else None
 prices = []
 prev_vix = None
 last_decision_ts = 0
+last_decision_seq = 0
 decision_interval_sec = DECISION_INTERVAL_LOW_VOL
+last_chain_attempt = 0
+chain_atm = None  # ATM strike the option basket is centred on
+compacted_day = None
+
+# Strategy pass runs on each spot bar close (clock-aligned), not on loop timing
+spot_bar_closed = threading.Event()
+MARKET.bars.on_close(SPOT_TOKEN, STRATEGY_BAR_SEC, lambda token, tf, bar: spot_bar_closed.set())
 
 # ===============================
 # 5. MAIN LOOP
 # ===============================
-print("Options Oracle running (per spec)...")
-last_wait_print = 0
+LOG.info("startup", "Options Oracle running (per spec)")
 
 while True:
     # -------- WAIT FOR LIVE DATA --------
     if MARKET.spot is None:
-        if time.time() - last_wait_print >= 5:
-            print("Waiting for market data (Nifty spot token 26000)...")
-            last_wait_print = time.time()
+        LOG.info("waiting_for_data", "Waiting for market data (Nifty spot token 26000)", every=5)
         time.sleep(1)
         continue
 
+    # -------- FEED RECOVERY (reconnect + candle backfill in progress) --------
+    # The gap's forward-filled bars are rewritten from the candles before recovering clears.
+    if supervisor.recovering:
+        time.sleep(0.5)
+        continue
+
     # -------- MARKET HOURS --------
     if not is_market_hours():
+        # After the close (once): compact today's raw ticks into the columnar store and
+        # close out the shadow variants' paper positions
+        today = time.strftime("%Y-%m-%d")
+        if compacted_day != today and datetime.now(IST).strftime("%H:%M") >= TICK_COMPACT_AT:
+            compacted_day = today
+            if MARKET.recorder:
+                end_of_day(MARKET.recorder, MARKET.contracts, today)
+            if shadow:
+                shadow.end_of_day()
+            LOG.info("fanout_report", **fanout.report())
         time.sleep(10)
         continue
 
-    # -------- PRICE HISTORY --------
-    prices.append(MARKET.spot)
-    if len(prices) > 300:
-        prices.pop(0)
+    # -------- FEED HEALTH (stale tokens block entries in validation step 5) --------
+    stale = MARKET.feed.stale_tokens(time.time())
+    if stale:
+        LOG.warning("feed_stale", tokens=stale[:10], count=len(stale), every=10)
+
+    # -------- BAR CLOSE (PRICE HISTORY) --------
+    # Wait for the next spot bar; in a quiet market close it on the clock instead.
+    if not spot_bar_closed.wait(STRATEGY_BAR_SEC - time.time() % STRATEGY_BAR_SEC + 0.05):
+        MARKET.bars.roll(time.time())
+    spot_bar_closed.clear()
+    prices = MARKET.bars.closes(SPOT_TOKEN, STRATEGY_BAR_SEC, 300)
+    if not prices:
+        continue
+
+    # -------- OPTION CHAIN (ATM +- N strikes, SNAP_QUOTE) + GREEKS --------
+    # Re-centred once ATM drifts within CHAIN_RECENTER_STRIKES of the basket edge. Contracts
+    # that leave the basket stay subscribed and in MARKET.contracts (a held position may be one).
+    atm = round(MARKET.spot / STRIKE_STEP) * STRIKE_STEP
+    recenter = chain_atm is not None and abs(atm - chain_atm) >= (CHAIN_STRIKES_EACH_SIDE - CHAIN_RECENTER_STRIKES) * STRIKE_STEP
+    if (chain_atm is None or recenter) and time.time() - last_chain_attempt >= 30:
+        last_chain_attempt = time.time()
+        chain = get_option_chain(api, INDEX, MARKET.spot, OPTION_EXPIRY_DDMMMYY)
+        if chain:
+            added = [c["token"] for c in chain if c["token"] not in MARKET.contracts]
+            MARKET.register_contracts(chain)
+            greek_engine.set_contracts(chain)
+            if added:
+                subscriber.depth(added, correlation_id="chain")
+            for token in added:
+                MARKET.feed.watch(token, FEED_OPTION_STALE_SEC)
+            if recenter:
+                LOG.info("chain_recentred", from_atm=chain_atm, atm=atm, added=len(added))
+            chain_atm = atm
+        else:
+            LOG.warning("chain_unavailable", "Option chain not resolved; strike alignment uses proxy")
+    greek_engine.refresh()
+    strike_engine.refresh()
 
     # -------- CONTEXT --------
     context = context_engine.detect(prices)
     participation = participation_engine.score()
     vol_status = volatility_engine.check(prev_vix)
-    prev_vix = MARKET.vix
     decay_ok = decay_engine.allow(prices)
 
-    if len(prices) > 20:
-        vwap = structure_engine.vwap(prices)
+    if vwap_engine.ready:
+        # Futures price vs futures session VWAP (spot vs futures VWAP would carry the basis)
+        vwap = vwap_engine.session_vwap
+        bull = vwap_engine.bullish()
+        bear = vwap_engine.bearish()
     else:
-        vwap = MARKET.spot
-    bull = structure_engine.bullish(MARKET.spot, vwap)
-    bear = structure_engine.bearish(MARKET.spot, vwap)
+        if len(prices) > 20:
+            vwap = structure_engine.vwap(prices)
+        else:
+            vwap = MARKET.spot
+        bull = structure_engine.bullish(MARKET.spot, vwap)
+        bear = structure_engine.bearish(MARKET.spot, vwap)
 
     # -------- METRICS LAYER (Combined Score) --------
     vix_mom = "SUPPORTIVE" if (prev_vix and MARKET.vix and MARKET.vix > prev_vix) else "WEAK"
     volume_impulse = abs(prices[-1] - prices[-5]) if len(prices) >= 5 else 0
-    opt_tokens = list(MARKET.option_chain.keys())
-    opt_ltp_5m = MARKET.get_option_ltp_history(opt_tokens[0], 300) if opt_tokens else []
-    depth_5m = MARKET.get_depth_history(300)
+    # PDR on the held contract, else the ATM contract of the chain
+    pdr_token = primary["position"].token if primary["position"].active else None
+    if pdr_token is None and MARKET.contracts:
+        pdr_token = min(MARKET.contracts.values(), key=lambda c: abs(c["strike"] - MARKET.spot))["token"]
+    opt_ltp_5m = MARKET.get_option_ltp_history(pdr_token, 300) if pdr_token else []
     pdr_val = pdr_penalty(opt_ltp_5m)
-    lms_val = lms_score(depth_5m)
+    lms_val = lms_score()  # basket average over every option token with depth
     ivs_val = ivs_score_stub()
     lead_pts = leading_score(
         vix_mom, participation, volume_impulse, ivs_val, lms_val, bull
@@ -158,12 +297,44 @@ while True:
     hv = historical_volatility(prices, 20)
     lag_pts = lagging_score(rsi_val, ma_bull, min(11, hv))
     combined_score_val = combined_score_fn(lead_pts, lag_pts, pdr_val)
+    # Journal entry for this pass: inputs here, decision / validation / order below
+    journal = {
+        "inputs": {
+            "spot": MARKET.spot,
+            "vix": MARKET.vix,
+            "prev_vix": prev_vix,
+            "context": context,
+            "participation": participation,
+            "breadth": breadth_engine.report(),
+            "vol_status": vol_status,
+            "decay_ok": decay_ok,
+            "vwap": vwap,
+            "bull": bull,
+            "bear": bear,
+            "vix_mom": vix_mom,
+            "volume_impulse": volume_impulse,
+            "pdr": pdr_val,
+            "lms": lms_val,
+            "ivs": ivs_val,
+            "rsi": rsi_val,
+            "ma_bull": ma_bull,
+            "hv": hv,
+            "lead": lead_pts,
+            "lag": lag_pts,
+            "combined_score": combined_score_val,
+        },
+    }
+    # Both VIX rules above compare against the previous pass; roll it only now
+    prev_vix = MARKET.vix
 
     # -------- DECISION ENGINE (per spec: action, confidence, reasoning, strikeGuidance) --------
     reg = vix_regime(MARKET.vix)
-    decision_interval_sec = decision_interval_seconds(reg, market_phase())
-    if time.time() - last_decision_ts >= decision_interval_sec:
-        decision = rule_based_decision(
+    journal["inputs"]["vix_regime"] = reg
+    phase = market_phase()
+    decision_interval_sec = decision_interval_seconds(reg, phase)
+    decide = time.time() - last_decision_ts >= decision_interval_sec
+    if decide:
+        ctx = market_context(
             context,
             participation,
             vol_status,
@@ -173,72 +344,133 @@ while True:
             combined_score_val,
             pdr_val,
         )
-        decision["timestamp"] = time.time()
+        journal["request"] = {"seq": decision_service.submit(ctx), "ctx": ctx}
         last_decision_ts = time.time()
+    seq, latest = decision_service.latest()
+    if latest is not None and seq != last_decision_seq:
+        decision = latest  # each completed decision is acted on once
+        last_decision_seq = seq
+        journal["decision"] = dict(decision, seq=seq)
     else:
         decision = {"action": ACTION_HOLD, "confidence": 50, "reasoning": "Interval", "strikeGuidance": {}}
 
+    # -------- SHADOW VARIANTS (paper only, evaluated off-loop) --------
+    # Every pass marks and exits; entries only on decision passes that would clear step 5
+    if shadow:
+        shadow.submit({
+            "ts": time.time(),
+            "spot": MARKET.spot,
+            "entry_gate": decide and step5_market_hours((SPOT_TOKEN, VIX_TOKEN))[0],
+            "context": context,
+            "participation": participation,
+            "vol_status": vol_status,
+            "decay_ok": decay_ok,
+            "bull": bull,
+            "bear": bear,
+            "combined_score": combined_score_val,
+            "pdr": pdr_val,
+            "momentum": abs(prices[-1] - prices[-5]) if len(prices) > 10 else 0,
+            "threshold": required_confidence(reg) + threshold_penalty_pct(phase),
+        })
+
     # -------- ENTRY: 7-STEP VALIDATION THEN EXECUTE --------
-    if decision.get("action") in (ACTION_TRADE_CE, ACTION_TRADE_PE) and not position.active:
+    if decision.get("action") in (ACTION_TRADE_CE, ACTION_TRADE_PE) and fanout.any_flat():
         if len(prices) > 10:
             momentum = abs(prices[-1] - prices[-5])
         else:
             momentum = 0
-        strike = strike_engine.select(MARKET.spot, context, momentum)
-        stop_distance = max(30, momentum * 0.5)
-        qty = sizer.size(risk_pct=0.01, stop_distance=stop_distance, lot_size=LOT_SIZE)
-
-        passed, failed_step, reason = run_validation_chain(
-            decision,
-            MARKET.vix,
-            risk.trades,
-            1 if position.active else 0,
-            risk.daily_pnl,
-            strike,
-            MARKET.spot,
+        side = "CE" if decision["action"] == ACTION_TRADE_CE else "PE"
+        # Rank the whole chain; the next STRIKE_FALLBACKS contracts are tried when the best
+        # fails strike alignment (step 2) or an account's order is rejected
+        _, ranked = strike_engine.rank(
+            side, context, momentum, budget=sizer.capital * STRIKE_MAX_PREMIUM_PCT
         )
-        if passed and risk.allow(risk.daily_pnl):
-            side = "CE" if decision["action"] == ACTION_TRADE_CE else "PE"
-            print(
-                f"TRADE → {decision['action']} | Spot: {MARKET.spot} | Strike: {strike} | Qty: {qty}"
+        candidates = ranked[:1 + STRIKE_FALLBACKS] or [None]
+        stop_distance = max(30, momentum * 0.5)
+
+        for tried, contract in enumerate(candidates):
+            if contract is not None:
+                strike, contract_token = contract["strike"], contract["token"]
+                greeks = greek_engine.greeks(contract_token)
+            else:
+                # Chain loaded but nothing qualifies -> step 2 rejects; no chain -> rounding
+                strike = None if greek_engine.tokens else strike_engine.select(
+                    MARKET.spot, context, momentum, side=side
+                )
+                contract_token, greeks = None, None
+            # Each account is validated on its own trade count, position and PnL
+            checks = fanout.validate(
+                decision,
+                MARKET.vix,
+                strike,
+                MARKET.spot,
+                greeks,
+                feed_tokens=(SPOT_TOKEN, VIX_TOKEN, contract_token),
             )
-            position.enter(MARKET.spot, stop_distance, qty, side=side)
-            risk.record_trade()
-            if LIVE_TRADING and order_manager:
+            eligible = [name for name, (ok, _, _) in checks.items() if ok]
+            if eligible or all(step != 2 for _, step, _ in checks.values()):
+                break
+        passed, failed_step, reason = checks[eligible[0] if eligible else primary["name"]]
+        journal["validation"] = {
+            "passed": passed,
+            "failed_step": failed_step,
+            "reason": reason,
+            "accounts": {name: step for name, (_, step, _) in checks.items()},
+            "strike": strike,
+            "token": contract_token,
+            "fallback": tried,
+        }
+        if passed:
+            LOG.info(
+                "trade", decision["action"], spot=MARKET.spot, strike=strike, side=side, accounts=len(eligible),
+                delta=greeks and round(greeks["delta"], 3), iv=greeks and round(greeks["iv"], 4),
+            )
+            if contract_token:
+                symbol, token = MARKET.contracts[contract_token]["symbol"], contract_token
+            else:
                 symbol, token = get_option_symbol_token(
                     api, INDEX, strike, side, OPTION_EXPIRY_DDMMMYY
                 )
-                if symbol and token:
-                    if side == "CE":
-                        order_id = order_manager.buy(symbol, token, qty)
-                    else:
-                        order_id = order_manager.sell(symbol, token, qty)
-                    if order_id:
-                        print(f"Broker order placed: {side} {symbol} qty={qty} order_id={order_id}")
-                    else:
-                        print(f"Broker order failed: {side} {symbol} qty={qty}")
-                else:
-                    print(f"Could not resolve option symbol/token for strike={strike} {side}")
-        elif not passed:
-            pass  # optional: log validation failure (failed_step, reason)
-
-    # -------- TRAILING + EXIT --------
-    if position.active:
-        position.trail(MARKET.spot)
-        if position.exit_check(MARKET.spot):
-            print("EXIT TRADE at", MARKET.spot)
+            if symbol and token:
+                # Long premium for both sides: BUY the CE or PE (exit SELLs it), every account at once
+                rows = fanout.enter(eligible, side, symbol, token, stop_distance, greeks)
+            else:
+                LOG.error("symbol_unresolved", strike=strike, side=side)
+                rows = []
+            journal["order"] = {"symbol": symbol, "token": token, "accounts": rows}
+            # Accounts whose BUY was rejected retry on the next ranked contracts
+            for contract in candidates[tried + 1:]:
+                rejected = [r["account"] for r in rows if r.get("status") == "REJECTED"]
+                if not rejected:
+                    break
+                token = contract["token"]
+                symbol = MARKET.contracts[token]["symbol"]
+                rows = fanout.enter(rejected, side, symbol, token, stop_distance, greek_engine.greeks(token))
+                journal["order"].setdefault("fallbacks", []).append({"symbol": symbol, "token": token, "accounts": rows})
+        else:
+            LOG.info("entry_rejected", reason, step=failed_step, action=decision["action"], every=60)
+
+    # -------- TRAILING + EXIT (spot fallback; premium positions exit on ticks) --------
+    if fanout.check_spot_exits(MARKET.spot):
+        journal["exit"] = "SL/target"
 
     # -------- EXIT_ALL (per spec) --------
-    if decision.get("action") == ACTION_EXIT_ALL and position.active:
-        position.active = False
-        print("EXIT_ALL at", MARKET.spot)
-    
+    if decision.get("action") == ACTION_EXIT_ALL and fanout.flatten("EXIT_ALL"):
+        journal["exit"] = "EXIT_ALL"
+
+    if DECISION_JOURNAL:
+        JOURNAL.record(journal)
+
     # -------- DEBUG --------
     part_val = participation if participation is not None else 0
     score_val = combined_score_val if combined_score_val is not None else 0
-    print(
-        f"Context: {context} | Part: {part_val:.2f} "
-        f"| VIX: {MARKET.vix} | Vol: {vol_status} | Score: {score_val:.1f}"
+    LOG.info(
+        "status",
+        context=context,
+        part=round(part_val, 2),
+        vix=MARKET.vix,
+        vol=vol_status,
+        score=round(score_val, 1),
+        equity=round(risk.equity, 2),
+        dd=round(risk.drawdown, 2),
     )
-
-    time.sleep(1)
@@ -0,0 +1,134 @@
+"""
+Decision journal: one JSON line per strategy pass, for live-vs-replay comparison.
+Each entry carries the pass inputs (metrics layer, MarketContext of any decision request
+submitted that pass), the decision acted on (with its request seq and source), the
+validation outcome and the order result. The strategy loop only appends to a deque;
+a background writer appends batches of DECISION_JOURNAL_BATCH lines (or whatever is
+queued every DECISION_JOURNAL_FLUSH_SEC) to logs/YYYY-MM-DD/decisions.jsonl.
+tools/replay_journal.py replays the inputs through the current code and diffs.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from config.settings import (
+    EVENT_LOG_DIR,
+    DECISION_JOURNAL_BATCH,
+    DECISION_JOURNAL_FLUSH_SEC,
+    DECISION_JOURNAL_QUEUE_MAX,
+)
+from ops.event_log import LOG
+
+JOURNAL_FILE = "decisions.jsonl"
+
+
+def journal_path(day, log_dir=EVENT_LOG_DIR):
+    return os.path.join(log_dir, day, JOURNAL_FILE)
+
+
+def _default(value):
+    """NumPy scalars -> Python (np.bool_ is not a JSON type); anything else as text."""
+    if hasattr(value, "item"):
+        return value.item()
+    return str(value)
+
+
+class DecisionJournal:
+
+    def __init__(
+        self,
+        log_dir=EVENT_LOG_DIR,
+        batch=DECISION_JOURNAL_BATCH,
+        flush_sec=DECISION_JOURNAL_FLUSH_SEC,
+        max_queue=DECISION_JOURNAL_QUEUE_MAX,
+    ):
+        self.log_dir = log_dir
+        self.batch = batch
+        self.flush_sec = flush_sec
+        self.written = 0
+        self.dropped = 0
+        self._queue = deque(maxlen=max_queue)
+        self._max_queue = max_queue
+        self._seq = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._io_lock = threading.Lock()
+        self._thread = None
+
+    def record(self, entry):
+        """Queue one pass entry (strategy loop). Adds seq and ts if missing."""
+        self._seq += 1
+        entry.setdefault("seq", self._seq)
+        entry.setdefault("ts", time.time())
+        if len(self._queue) == self._max_queue:
+            self.dropped += 1
+        self._queue.append(entry)
+        if self._thread is None:
+            self.start()
+        if len(self._queue) >= self.batch:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="decision-journal", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._drain()
+
+    def _after_fork(self):
+        self._queue.clear()
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_sec)
+            self._wake.clear()
+            self._drain()
+
+    def _drain(self):
+        with self._io_lock:
+            by_day = {}
+            while self._queue:
+                try:
+                    entry = self._queue.popleft()
+                except IndexError:
+                    break
+                day = datetime.fromtimestamp(entry["ts"]).strftime("%Y-%m-%d")
+                by_day.setdefault(day, []).append(json.dumps(entry, separators=(",", ":"), default=_default))
+            for day, lines in by_day.items():
+                try:
+                    os.makedirs(os.path.join(self.log_dir, day), exist_ok=True)
+                    with open(journal_path(day, self.log_dir), "a", encoding="utf-8") as f:
+                        f.write("\n".join(lines) + "\n")
+                    self.written += len(lines)
+                except OSError as e:
+                    self.dropped += len(lines)
+                    LOG.error("decision_journal_failed", str(e), lines=len(lines))
+
+
+def read_journal(path):
+    """Entries of a journal file, oldest first (a torn last line is skipped)."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+JOURNAL = DecisionJournal()
+os.register_at_fork(after_in_child=JOURNAL._after_fork)
@@ -0,0 +1,200 @@
+"""
+Structured, non-blocking event log.
+Hot path (strategy loop, WebSocket thread) only appends a tuple to a bounded deque;
+a background writer serializes JSON lines to logs/YYYY-MM-DD/events.jsonl (new file
+per day) and optionally echoes a human-readable line to stdout. Repeated messages
+(same event name + message) are rate-limited; the next emitted record carries the
+suppressed count.
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from config.settings import (
+    EVENT_LOG_DIR,
+    EVENT_LOG_CONSOLE,
+    EVENT_LOG_REPEAT_SEC,
+    EVENT_LOG_QUEUE_MAX,
+    EVENT_LOG_FLUSH_SEC,
+    EVENT_LOG_THROTTLE_KEYS,
+)
+
+# Levels that are rate-limited by default (INFO only when `every=` is passed)
+_THROTTLED_LEVELS = ("WARNING", "ERROR")
+
+
+class EventLog:
+
+    def __init__(
+        self,
+        log_dir=EVENT_LOG_DIR,
+        console=EVENT_LOG_CONSOLE,
+        repeat_sec=EVENT_LOG_REPEAT_SEC,
+        max_queue=EVENT_LOG_QUEUE_MAX,
+        flush_sec=EVENT_LOG_FLUSH_SEC,
+        stream=None,
+        max_keys=EVENT_LOG_THROTTLE_KEYS,
+    ):
+        self.log_dir = log_dir
+        self.console = console
+        self.repeat_sec = repeat_sec
+        self.flush_sec = flush_sec
+        self.stream = stream
+        self.dropped = 0  # records lost because the queue was full
+        self._queue = deque(maxlen=max_queue)
+        self._max_queue = max_queue
+        self._last = {}  # (name, msg) -> [last_emit_ts, suppressed_count]
+        self._max_keys = max_keys
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._file = None
+        self._file_day = None
+
+    # ---------- Hot path ----------
+
+    def log(self, level, name, msg="", every=None, **fields):
+        """Queue one event. every: min seconds between identical (name, msg) events."""
+        now = time.time()
+        if every is None:
+            every = self.repeat_sec if level in _THROTTLED_LEVELS else 0
+        suppressed = 0
+        if every:
+            key = (name, msg)
+            state = self._last.get(key)
+            if state is not None:
+                if now - state[0] < every:
+                    state[1] += 1
+                    return
+                suppressed = state[1]
+                state[0] = now
+                state[1] = 0
+            else:
+                if len(self._last) >= self._max_keys:
+                    self._prune()
+                self._last[key] = [now, 0]
+        if len(self._queue) == self._max_queue:
+            self.dropped += 1
+        self._queue.append((now, level, name, msg, fields, suppressed))
+        if self._thread is None:
+            self.start()
+
+    def _prune(self):
+        """Forget the least recently emitted half of the throttle keys (messages can carry unbounded text)."""
+        recent = sorted(self._last.items(), key=lambda kv: kv[1][0])[len(self._last) // 2:]
+        self._last = dict(recent)
+
+    def info(self, name, msg="", every=None, **fields):
+        self.log("INFO", name, msg, every, **fields)
+
+    def warning(self, name, msg="", every=None, **fields):
+        self.log("WARNING", name, msg, every, **fields)
+
+    def error(self, name, msg="", every=None, **fields):
+        self.log("ERROR", name, msg, every, **fields)
+
+    # ---------- Writer ----------
+
+    def start(self):
+        """Start the background writer (idempotent; first records can come from several threads)."""
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        """Stop the writer and flush everything queued."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+        self._drain()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _after_fork(self):
+        """Child of os.fork: the writer thread did not survive; drop the parent's backlog."""
+        self._queue.clear()
+        self._last = {}
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._file = None
+        self._file_day = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._drain()
+            self._stop.wait(self.flush_sec)
+
+    def _drain(self):
+        if not self._queue:
+            return
+        lines = []
+        console = []
+        day = None
+        while self._queue:
+            try:
+                ts, level, name, msg, fields, suppressed = self._queue.popleft()
+            except IndexError:
+                break
+            rec_day = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+            if day is not None and rec_day != day:
+                self._write(day, lines)
+                lines = []
+            day = rec_day
+            record = {"ts": round(ts, 6), "lvl": level, "ev": name}
+            if msg:
+                record["msg"] = msg
+            if fields:
+                record.update(fields)
+            if suppressed:
+                record["suppressed"] = suppressed
+            lines.append(json.dumps(record, separators=(",", ":"), default=str))
+            if self.console:
+                console.append(_format_console(ts, level, name, msg, fields, suppressed))
+        self._write(day, lines)
+        if console:
+            stream = self.stream or sys.stdout
+            try:
+                stream.write("\n".join(console) + "\n")
+                stream.flush()
+            except Exception:
+                pass
+
+    def _write(self, day, lines):
+        if not lines:
+            return
+        try:
+            if day != self._file_day:
+                if self._file:
+                    self._file.close()
+                path = os.path.join(self.log_dir, day)
+                os.makedirs(path, exist_ok=True)
+                self._file = open(os.path.join(path, "events.jsonl"), "a", encoding="utf-8")
+                self._file_day = day
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+        except OSError:
+            self.dropped += len(lines)
+
+
+def _format_console(ts, level, name, msg, fields, suppressed):
+    """Human-readable line for stdout."""
+    parts = [datetime.fromtimestamp(ts).strftime("%H:%M:%S"), level[0], name]
+    if msg:
+        parts.append(str(msg))
+    parts.extend(f"{k}={v}" for k, v in fields.items())
+    if suppressed:
+        parts.append(f"(+{suppressed} suppressed)")
+    return " ".join(parts)
+
+
+LOG = EventLog()
+os.register_at_fork(after_in_child=LOG._after_fork)
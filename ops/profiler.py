@@ -0,0 +1,248 @@
+"""
+Runtime profiling of the live process, off by default and free when idle.
+Trigger a capture with `kill -USR1 <pid>` or by creating PROFILE_CONTROL_FILE
+(optional content: "<cprofile|sample> [seconds]"). A capture runs for a fixed time:
+    cprofile   cProfile of the strategy (main) thread, or
+    sample     stack sampler over the main thread every PROFILE_SAMPLE_MS (folded stacks)
+plus a tracemalloc diff (start -> end) and a GC pause summary from gc.callbacks.
+SIGALRM ends the capture. Output goes to logs/YYYY-MM-DD/profile-HHMMSS/.
+Idle cost: installed signal handlers and one os.path.exists per control-poll tick.
+Nothing is attached to the hot path until a capture starts.
+"""
+import cProfile
+import gc
+import io
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from config.settings import (
+    EVENT_LOG_DIR,
+    PROFILE_MODE,
+    PROFILE_DURATION_SEC,
+    PROFILE_SAMPLE_MS,
+    PROFILE_CONTROL_FILE,
+    PROFILE_CONTROL_POLL_SEC,
+    PROFILE_TRACEMALLOC_FRAMES,
+    PROFILE_TOP_N,
+)
+from ops.event_log import LOG
+
+MODES = ("cprofile", "sample")
+
+
+class Profiler:
+
+    def __init__(
+        self,
+        log_dir=EVENT_LOG_DIR,
+        mode=PROFILE_MODE,
+        duration_sec=PROFILE_DURATION_SEC,
+        sample_ms=PROFILE_SAMPLE_MS,
+        control_file=PROFILE_CONTROL_FILE,
+        poll_sec=PROFILE_CONTROL_POLL_SEC,
+        top_n=PROFILE_TOP_N,
+    ):
+        self.log_dir = log_dir
+        self.mode = mode
+        self.duration_sec = duration_sec
+        self.sample_ms = sample_ms
+        self.control_file = control_file
+        self.poll_sec = poll_sec
+        self.top_n = top_n
+        self.active = False
+        self.last_output = None  # directory of the last finished capture
+        self._pending = None  # (mode, duration) requested via control file
+        self._main_ident = threading.main_thread().ident
+        self._stop_watch = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self._profile = None
+        self._samples = None
+        self._sampler_stop = None
+        self._mem_start = None
+        self._gc_pauses = None
+        self._gc_t0 = None
+        self._started = None
+        self._capture_mode = None
+
+    # ---------- Triggers ----------
+
+    def install(self):
+        """Install SIGUSR1/SIGALRM handlers (main thread only) and the control-file watcher."""
+        signal.signal(signal.SIGUSR1, self._on_start_signal)
+        signal.signal(signal.SIGALRM, self._on_stop_signal)
+        if self.control_file:
+            threading.Thread(target=self._watch, name="profiler-control", daemon=True).start()
+        LOG.info("profiler_ready", pid=os.getpid(), control_file=self.control_file)
+
+    def _watch(self):
+        while not self._stop_watch.wait(self.poll_sec):
+            if not os.path.exists(self.control_file):
+                continue
+            try:
+                with open(self.control_file, encoding="utf-8") as f:
+                    args = f.read().split()
+                os.remove(self.control_file)
+            except OSError:
+                continue
+            mode = args[0] if args and args[0] in MODES else self.mode
+            duration = float(args[1]) if len(args) > 1 else self.duration_sec
+            self._pending = (mode, duration)
+            os.kill(os.getpid(), signal.SIGUSR1)  # start on the main thread
+
+    def _on_start_signal(self, signum, frame):
+        mode, duration = self._pending or (self.mode, self.duration_sec)
+        self._pending = None
+        self.start(mode, duration)
+
+    def _on_stop_signal(self, signum, frame):
+        self.stop()
+
+    # ---------- Capture ----------
+
+    def start(self, mode=None, duration_sec=None):
+        """Begin a capture on the calling (main) thread; SIGALRM stops it after duration_sec."""
+        if self.active:
+            LOG.warning("profiler_busy", "Capture already running", every=0)
+            return False
+        mode = mode or self.mode
+        duration_sec = duration_sec or self.duration_sec
+        self.active = True
+        self._capture_mode = mode
+        self._started = time.time()
+        self._gc_pauses = []
+        gc.callbacks.append(self._on_gc)
+        tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        self._mem_start = tracemalloc.take_snapshot()
+        if mode == "sample":
+            self._samples = Counter()
+            self._sampler_stop = threading.Event()
+            threading.Thread(target=self._sample, name="profiler-sampler", daemon=True).start()
+        else:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        signal.setitimer(signal.ITIMER_REAL, duration_sec)
+        LOG.info("profiler_start", mode=mode, duration_sec=duration_sec)
+        return True
+
+    def stop(self):
+        """End the capture; results are written from a background thread."""
+        if not self.active:
+            return None
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        if self._profile is not None:
+            self._profile.disable()
+        if self._sampler_stop is not None:
+            self._sampler_stop.set()
+        gc.callbacks.remove(self._on_gc)
+        mem_end = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        capture = {
+            "mode": self._capture_mode,
+            "started": self._started,
+            "elapsed_sec": time.time() - self._started,
+            "profile": self._profile,
+            "samples": self._samples,
+            "mem_start": self._mem_start,
+            "mem_end": mem_end,
+            "gc_pauses": self._gc_pauses,
+        }
+        self._reset()
+        self.active = False
+        threading.Thread(target=self._write, args=(capture,), name="profiler-writer", daemon=True).start()
+        return capture
+
+    def _sample(self):
+        interval = self.sample_ms / 1000.0
+        samples = self._samples
+        stop = self._sampler_stop
+        while not stop.wait(interval):
+            frame = sys._current_frames().get(self._main_ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            samples[";".join(reversed(stack))] += 1
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_t0 = time.perf_counter()
+        elif self._gc_t0 is not None:
+            self._gc_pauses.append((info["generation"], time.perf_counter() - self._gc_t0, info["collected"]))
+            self._gc_t0 = None
+
+    # ---------- Output ----------
+
+    def _write(self, capture):
+        started = datetime.fromtimestamp(capture["started"])
+        out = os.path.join(self.log_dir, started.strftime("%Y-%m-%d"), started.strftime("profile-%H%M%S"))
+        try:
+            os.makedirs(out, exist_ok=True)
+            if capture["profile"] is not None:
+                capture["profile"].dump_stats(os.path.join(out, "cprofile.prof"))
+                text = io.StringIO()
+                stats = pstats.Stats(capture["profile"], stream=text)
+                stats.sort_stats("cumulative").print_stats(self.top_n)
+                _write_text(os.path.join(out, "cprofile.txt"), text.getvalue())
+            if capture["samples"] is not None:
+                lines = [f"{stack} {n}" for stack, n in capture["samples"].most_common()]
+                _write_text(os.path.join(out, "samples.folded"), "\n".join(lines) + "\n")
+            diff = capture["mem_end"].compare_to(capture["mem_start"], "lineno")
+            top = capture["mem_end"].statistics("lineno")[: self.top_n]
+            _write_text(
+                os.path.join(out, "tracemalloc.txt"),
+                "# Top allocations at end of capture\n"
+                + "\n".join(str(s) for s in top)
+                + "\n\n# Growth during capture\n"
+                + "\n".join(str(s) for s in diff[: self.top_n])
+                + "\n",
+            )
+            summary = gc_summary(capture["gc_pauses"])
+            summary["elapsed_sec"] = round(capture["elapsed_sec"], 3)
+            _write_text(os.path.join(out, "gc.json"), json.dumps(summary, indent=2))
+        except Exception as e:
+            LOG.error("profiler_write_failed", str(e), path=out)
+            return
+        self.last_output = out
+        LOG.info("profiler_done", mode=capture["mode"], path=out, gc_pauses=summary["count"])
+
+    def close(self):
+        self._stop_watch.set()
+        self.stop()
+
+
+def gc_summary(pauses):
+    """Count / total / max pause (ms) overall and per generation from (gen, sec, collected)."""
+    out = {"count": len(pauses), "total_ms": 0.0, "max_ms": 0.0, "by_generation": {}}
+    for gen, sec, collected in pauses:
+        ms = sec * 1000
+        out["total_ms"] += ms
+        out["max_ms"] = max(out["max_ms"], ms)
+        g = out["by_generation"].setdefault(str(gen), {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "collected": 0})
+        g["count"] += 1
+        g["total_ms"] += ms
+        g["max_ms"] = max(g["max_ms"], ms)
+        g["collected"] += collected
+    out["total_ms"] = round(out["total_ms"], 3)
+    out["max_ms"] = round(out["max_ms"], 3)
+    for g in out["by_generation"].values():
+        g["total_ms"] = round(g["total_ms"], 3)
+        g["max_ms"] = round(g["max_ms"], 3)
+    return out
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+PROFILER = Profiler()
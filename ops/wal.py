@@ -0,0 +1,237 @@
+"""
+Write-ahead log of position and risk state transitions (crash recovery).
+PositionManager logs enter / trail / exiting / exit_order / exit with its full state; RiskGovernor logs fills,
+trade counts and daily PnL overrides; AccountFanout logs each entry order when placed
+(order) and when resolved (order_done). append() only queues the record; a writer thread
+group-commits everything queued within WAL_GROUP_COMMIT_MS with one write + fsync, so
+durability never stalls the strategy loop or the feed thread (wait_durable() is there
+for callers that must block).
+File: logs/YYYY-MM-DD/state.wal, or state-<account>.wal per account (a new log per
+trading day, like MAX_TRADES), one record per line: "<crc32 hex> <json>". On restart recover() replays the day's log into fresh
+PositionManager / RiskGovernor objects, drops a torn or corrupt tail and continues
+appending after the last good record.
+A failed write + fsync keeps its batch at the head of the queue and is retried every
+WAL_RETRY_SEC (the partial write is truncated away first); durable_seq only advances
+over records that are on disk, so wait_durable() keeps returning False meanwhile.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime
+from config.settings import EVENT_LOG_DIR, WAL_FILE, WAL_GROUP_COMMIT_MS, WAL_RETRY_SEC
+from ops.event_log import LOG
+
+
+def wal_path(day=None, log_dir=EVENT_LOG_DIR, account=None):
+    day = day or datetime.now().strftime("%Y-%m-%d")
+    name = WAL_FILE
+    if account:
+        root, ext = os.path.splitext(WAL_FILE)
+        name = f"{root}-{account}{ext}"
+    return os.path.join(log_dir, day, name)
+
+
+def encode_record(record):
+    payload = json.dumps(record, separators=(",", ":"), default=str)
+    return f"{zlib.crc32(payload.encode()):08x} {payload}\n"
+
+
+def read_wal(path):
+    """(records, good_bytes): records up to the first torn or corrupt line."""
+    records = []
+    good = 0
+    if not os.path.exists(path):
+        return records, good
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            crc, _, payload = line.rstrip(b"\n").partition(b" ")
+            try:
+                if int(crc, 16) != zlib.crc32(payload):
+                    break
+                records.append(json.loads(payload))
+            except ValueError:
+                break
+            good += len(line)
+    return records, good
+
+
+class WriteAheadLog:
+
+    def __init__(self, path=None, group_commit_ms=WAL_GROUP_COMMIT_MS):
+        self.path = path or wal_path()
+        self.group_commit_sec = group_commit_ms / 1000
+        self.seq = 0  # last appended
+        self.durable_seq = 0  # last fsynced
+        self.commits = 0
+        self.fsync_ms_max = 0.0
+        self.failures = 0  # failed write + fsync attempts
+        self.failing = False  # last attempt failed; records are queued, not durable
+        self._pending = []
+        self._file = None
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    # ---------- Recovery ----------
+
+    def recover(self, position=None, risk=None):
+        """
+        Replay the log into position (PositionManager) and risk (RiskGovernor), truncate a
+        torn tail, then attach this log to both. Returns {records, ms, dropped_bytes, orders,
+        exit_order}: orders are the "order" records (entry orders placed) with no booking or
+        "order_done" after them; exit_order is the SELL of an exit that was never confirmed
+        (the position is restored as open). The caller resolves both against the broker.
+        """
+        t0 = time.perf_counter()
+        records, good = read_wal(self.path)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        last_position = None
+        exit_order = None
+        orders = {}  # entry orders placed but not yet booked or dropped
+        for rec in records:
+            kind = rec.get("type")
+            if kind in ("enter", "trail", "exit", "reopen"):
+                last_position = rec["state"]
+                exit_order = None
+                if kind == "enter":
+                    orders.clear()  # the pending entry was booked
+            elif kind in ("exiting", "exit_order"):
+                # Exit not confirmed: the broker may still hold the position
+                last_position = dict(rec["state"], active=True)
+                exit_order = rec.get("order_id")
+            elif kind == "order":
+                orders[rec["order_id"]] = rec
+            elif kind == "order_done":
+                orders.pop(rec["order_id"], None)
+            elif risk is not None and kind == "fill":
+                risk.on_fill(rec["token"], rec["side"], rec["qty"], rec["price"], rec["ts"])
+            elif risk is not None and kind == "trade":
+                risk.trades = rec["trades"]
+            elif risk is not None and kind == "pnl":
+                risk.update_daily_pnl(rec["pnl"])
+        if position is not None and last_position is not None:
+            position.restore(last_position)
+        self.seq = self.durable_seq = records[-1]["seq"] if records else 0
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "ab")
+        if good < size:
+            self._file.truncate(good)
+            LOG.warning("wal_torn_tail", path=self.path, dropped_bytes=size - good, every=0)
+        if position is not None:
+            position.wal = self
+        if risk is not None:
+            risk.wal = self
+        return {
+            "records": len(records),
+            "ms": round((time.perf_counter() - t0) * 1000, 2),
+            "dropped_bytes": size - good,
+            "orders": list(orders.values()),
+            "exit_order": exit_order,
+        }
+
+    # ---------- Hot path ----------
+
+    def append(self, kind, **fields):
+        """Queue one state transition. Returns its seq (see wait_durable)."""
+        with self._cond:
+            self.seq += 1
+            record = {"seq": self.seq, "ts": time.time(), "type": kind}
+            record.update(fields)
+            self._pending.append(encode_record(record))
+            if self._thread is None:
+                self._start_locked()
+            self._cond.notify()
+            return self.seq
+
+    def wait_durable(self, seq=None, timeout=1.0):
+        """Block until record seq (default: the last appended) is fsynced."""
+        seq = self.seq if seq is None else seq
+        deadline = time.time() + timeout
+        with self._cond:
+            while self.durable_seq < seq:
+                left = deadline - time.time()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+        return True
+
+    # ---------- Writer ----------
+
+    def _start_locked(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "ab")
+        self._thread = threading.Thread(target=self._run, name="wal", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed and not self._pending:
+                    return
+            time.sleep(self.group_commit_sec)  # let concurrent transitions join this commit
+            if not self._commit():
+                time.sleep(WAL_RETRY_SEC)
+
+    def _commit(self):
+        """Write + fsync everything queued. False if it failed (the batch stays queued)."""
+        with self._cond:
+            batch, self._pending = self._pending, []
+            last = self.seq
+        if not batch:
+            return True
+        t0 = time.perf_counter()
+        start = None
+        try:
+            start = self._file.tell()
+            self._file.write("".join(batch).encode())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except (OSError, ValueError) as e:
+            if start is not None:
+                try:
+                    self._file.truncate(start)  # no half-written record ahead of the retry
+                    self._file.seek(start)
+                except (OSError, ValueError):
+                    pass
+            with self._cond:
+                self._pending = batch + self._pending
+                self.failures += 1
+                self.failing = True
+            LOG.error("wal_write_failed", str(e), records=len(batch), queued=len(self._pending))
+            return False
+        fsync_ms = (time.perf_counter() - t0) * 1000
+        with self._cond:
+            self.failing = False
+            self.durable_seq = last
+            self.commits += 1
+            self.fsync_ms_max = max(self.fsync_ms_max, fsync_ms)
+            self._cond.notify_all()
+
+    def stats(self):
+        return {
+            "records": self.seq,
+            "durable": self.durable_seq,
+            "commits": self.commits,
+            "records_per_commit": round(self.durable_seq / self.commits, 2) if self.commits else None,
+            "fsync_ms_max": round(self.fsync_ms_max, 2),
+            "failures": self.failures,
+            "failing": self.failing,
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._commit()
+        if self._file:
+            self._file.close()
+            self._file = None
@@ -3,37 +3,216 @@ Risk Governor per spec.
 Circuit breaker: daily loss and drawdown limits.
 Failure constraints: block if historical win rate in current conditions < 40% (stub).
 Position limits and trade count.
+
+State is kept incrementally as fills (on_fill) and marks (on_mark / on_tick) arrive:
+per-instrument position, average price, mark and notional; per-side (CE/PE) exposure;
+realized and unrealized PnL; the intraday equity curve, high-water mark, drawdown and
+max drawdown. Each update is O(1) and refreshes the breach flag, so allow() and
+circuit_breaker_breached() are only comparisons against precomputed state
+(benchmark: python -m tools.bench_risk).
+Updates arrive from several threads (marks on the feed thread, entry fills on the main
+loop, exit fills on the exit pool), so on_fill / on_mark / update_daily_pnl run under
+one lock; the running sums would otherwise lose interleaved read-modify-writes. allow()
+stays lock-free.
+Fills, trade counts and PnL overrides go to the write-ahead log when one is attached
+(wal, ops/wal.py); marks are not logged, they come back with the next ticks.
 """
-from config.settings import MAX_TRADES, MAX_DAILY_LOSS, MIN_WIN_RATE_PCT
+import threading
+import time
+import numpy as np
+from config.settings import (
+    MAX_TRADES,
+    MAX_DAILY_LOSS,
+    MIN_WIN_RATE_PCT,
+    MAX_DRAWDOWN,
+    MAX_SIDE_EXPOSURE,
+    MAX_INSTRUMENT_NOTIONAL,
+    RISK_CAPITAL,
+    RISK_CURVE_POINTS,
+)
 
 
 class RiskGovernor:
-    def __init__(self, max_trades=MAX_TRADES, max_daily_loss=MAX_DAILY_LOSS):
+    def __init__(
+        self,
+        max_trades=MAX_TRADES,
+        max_daily_loss=MAX_DAILY_LOSS,
+        max_drawdown=MAX_DRAWDOWN,
+        max_side_exposure=MAX_SIDE_EXPOSURE,
+        max_instrument_notional=MAX_INSTRUMENT_NOTIONAL,
+        capital=RISK_CAPITAL,
+        curve_points=RISK_CURVE_POINTS,
+    ):
         self.trades = 0
         self.max_trades = max_trades
         self.max_daily_loss = max_daily_loss
-        self.daily_pnl = 0  # running daily P&L (updated by execution layer)
+        self.max_drawdown = max_drawdown
+        self.max_side_exposure = max_side_exposure
+        self.max_instrument_notional = max_instrument_notional
+        self.capital = capital
+        self.daily_pnl = 0  # realized + unrealized, kept current by on_fill / on_mark
         self._min_win_rate_pct = MIN_WIN_RATE_PCT
 
-    def allow(self, daily_pnl=None):
-        """Allow new trade only if under limits. Uses instance daily_pnl if not passed."""
-        pnl = daily_pnl if daily_pnl is not None else self.daily_pnl
-        if self.trades >= self.max_trades:
+        self.realized_pnl = 0.0
+        self.unrealized_pnl = 0.0
+        self.equity = float(capital)
+        self.hwm = float(capital)  # high-water mark of equity
+        self.drawdown = 0.0  # hwm - equity
+        self.max_drawdown_seen = 0.0
+        # token -> [qty (signed), avg_price, mark, side]
+        self.positions = {}
+        self.notional = {}  # token -> |qty| x mark
+        self.side_exposure = {"CE": 0.0, "PE": 0.0}
+        self.breached = False
+        self.breach_reason = None
+        self.wal = None  # WriteAheadLog, attached by WriteAheadLog.recover()
+        self._lock = threading.Lock()
+
+        self._curve_ts = np.zeros(curve_points, dtype=np.float64)
+        self._curve_equity = np.zeros(curve_points, dtype=np.float64)
+        self._curve_n = 0
+
+    # ---------- Pre-trade checks (precomputed state only) ----------
+
+    def allow(self, daily_pnl=None, side=None, token=None, notional=0.0):
+        """
+        Allow new trade only if under limits. Uses instance daily_pnl if not passed.
+        side/token/notional: the prospective order, checked against exposure limits.
+        """
+        if self.trades >= self.max_trades or self.breached:
             return False
-        if pnl is not None and pnl <= -self.max_daily_loss:
+        if daily_pnl is not None and daily_pnl <= -self.max_daily_loss:
             return False
+        if notional:
+            if side in self.side_exposure and self.side_exposure[side] + notional > self.max_side_exposure:
+                return False
+            if self.notional.get(token, 0.0) + notional > self.max_instrument_notional:
+                return False
         return True
 
+    def circuit_breaker_breached(self, daily_pnl=None):
+        """Daily loss or drawdown limit hit (from state updated on every fill/mark)."""
+        if daily_pnl is not None and daily_pnl <= -self.max_daily_loss:
+            return True
+        return self.breached
+
     def record_trade(self):
-        self.trades += 1
+        with self._lock:
+            self.trades += 1
+            if self.wal is not None:
+                self.wal.append("trade", trades=self.trades)
 
     def update_daily_pnl(self, pnl):
-        """Update running daily P&L (e.g. from position manager)."""
-        self.daily_pnl = pnl
+        """Override running daily P&L (e.g. from the broker's positions); open marks are kept."""
+        with self._lock:
+            self.realized_pnl = pnl - self.unrealized_pnl
+            self._update(time.time())
+            if self.wal is not None:
+                self.wal.append("pnl", pnl=pnl)
 
-    def circuit_breaker_breached(self, daily_pnl=None):
-        pnl = daily_pnl if daily_pnl is not None else self.daily_pnl
-        return pnl is not None and pnl <= -self.max_daily_loss
+    # ---------- Incremental state ----------
+
+    def on_fill(self, token, side, qty, price, ts=None):
+        """Fill of qty (signed: + buy, - sell) at price on instrument token (side: CE/PE)."""
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if self.wal is not None:
+                self.wal.append("fill", token=token, side=side, qty=qty, price=price, ts=ts)
+            self._fill(token, side, qty, price, ts)
+
+    def _fill(self, token, side, qty, price, ts):
+        pos = self.positions.get(token)
+        if pos is None:
+            pos = self.positions[token] = [0, 0.0, price, side]
+        old_qty, avg, mark = pos[0], pos[1], pos[2]
+        self.unrealized_pnl -= (mark - avg) * old_qty
+        new_qty = old_qty + qty
+        if old_qty == 0 or (old_qty > 0) == (qty > 0):
+            # Opening or adding: weighted average price
+            avg = (avg * old_qty + price * qty) / new_qty if new_qty else 0.0
+        else:
+            # Reducing / closing / flipping: realize on the closed quantity
+            closed = min(abs(qty), abs(old_qty))
+            self.realized_pnl += (price - avg) * closed * (1 if old_qty > 0 else -1)
+            if new_qty == 0:
+                avg = 0.0
+            elif (new_qty > 0) != (old_qty > 0):
+                avg = price  # flipped: remainder opened at this fill
+        pos[0], pos[1], pos[2] = new_qty, avg, price
+        if new_qty == 0:
+            del self.positions[token]
+        self.unrealized_pnl += (price - avg) * new_qty
+        self._set_notional(token, side, abs(new_qty) * price)
+        self._update(ts)
+
+    def on_mark(self, token, price, ts=None):
+        """New market price for a held instrument."""
+        if not price:
+            return
+        with self._lock:
+            pos = self.positions.get(token)
+            if pos is None:
+                return
+            self.unrealized_pnl += (price - pos[2]) * pos[0]
+            pos[2] = price
+            self._set_notional(token, pos[3], abs(pos[0]) * price)
+            self._update(time.time() if ts is None else ts)
+
+    def on_tick(self, token, tick, ts):
+        """MarketCache tick listener: marks held option positions (LTP in paise)."""
+        if token in self.positions:
+            ltp = tick.get("last_traded_price")
+            if ltp:
+                self.on_mark(token, ltp / 100, ts)
+
+    def _set_notional(self, token, side, value):
+        old = self.notional.pop(token, 0.0)
+        if value:
+            self.notional[token] = value
+        if side in self.side_exposure:
+            self.side_exposure[side] += value - old
+
+    def _update(self, ts):
+        self.daily_pnl = self.realized_pnl + self.unrealized_pnl
+        self.equity = self.capital + self.daily_pnl
+        if self.equity > self.hwm:
+            self.hwm = self.equity
+        self.drawdown = self.hwm - self.equity
+        if self.drawdown > self.max_drawdown_seen:
+            self.max_drawdown_seen = self.drawdown
+        # Latched for the day once hit
+        if not self.breached:
+            if self.daily_pnl <= -self.max_daily_loss:
+                self.breached, self.breach_reason = True, "Daily loss limit breached"
+            elif self.drawdown >= self.max_drawdown:
+                self.breached, self.breach_reason = True, "Drawdown limit breached"
+        i = self._curve_n % len(self._curve_ts)
+        self._curve_ts[i] = ts
+        self._curve_equity[i] = self.equity
+        self._curve_n += 1
+
+    def equity_curve(self):
+        """(ts, equity) arrays of every update, oldest first (last RISK_CURVE_POINTS)."""
+        cap = len(self._curve_ts)
+        n = min(self._curve_n, cap)
+        idx = np.arange(self._curve_n - n, self._curve_n) % cap
+        return self._curve_ts[idx], self._curve_equity[idx]
+
+    def snapshot(self):
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        return {
+            "equity": round(self.equity, 2),
+            "daily_pnl": round(self.daily_pnl, 2),
+            "realized": round(self.realized_pnl, 2),
+            "hwm": round(self.hwm, 2),
+            "drawdown": round(self.drawdown, 2),
+            "max_drawdown": round(self.max_drawdown_seen, 2),
+            "exposure": {k: round(v, 2) for k, v in self.side_exposure.items()},
+            "breached": self.breach_reason,
+        }
 
     def failure_constraint_block(self, vix_regime, market_phase):
         """
@@ -0,0 +1,53 @@
+"""
+Check that reconnect backfill reaches the bars the strategy reads.
+Replays the outage sequence on a MarketCache: spot ticks at 101 up to the disconnect,
+a silent gap, live ticks from 130 after the reconnect (they close the gap's bars as flat
+forward fills at 101), and only then the candle merge (as ReconnectSupervisor runs it
+via call_on_feed). The gap's 1m and 1s closes must follow the candles, not stay flat
+at 101 and jump.
+Usage (from the repo root):
+    python -m tools.bar_backfill_check
+Exits 1 on failure.
+"""
+import sys
+from data.cache.market_cache import MarketCache, SPOT_TOKEN
+
+T0 = 1_800_000_000  # minute-aligned
+GAP_MIN = 5
+
+
+def run():
+    cache = MarketCache()
+    bars = cache.bars
+    for s in range(60):
+        bars.on_tick(SPOT_TOKEN, T0 + s, 101.0)
+    # Disconnected for GAP_MIN minutes; live ticks resume at 130
+    resume = T0 + 60 * (1 + GAP_MIN)
+    for s in range(0, 60, 5):
+        bars.on_tick(SPOT_TOKEN, resume + s, 130.0 + s / 30)
+    bars.roll(resume + 60)
+    # 1m candle closes for the gap, stamped at the candle end: 106, 111, ..., 126
+    candles = [(T0 + 60 * (m + 2), 101.0 + 5 * (m + 1)) for m in range(GAP_MIN)]
+    before = bars.closes(SPOT_TOKEN, 60)
+    cache.backfill_spot(candles)
+    after = bars.closes(SPOT_TOKEN, 60)
+    ones = bars.closes(SPOT_TOKEN, 1, 60 * (GAP_MIN + 2))
+    return before, after, ones
+
+
+def main():
+    before, after, ones = run()
+    print("1m closes before merge:", before)
+    print("1m closes after merge: ", after)
+    expected = [101.0, 106.0, 111.0, 116.0, 121.0, 126.0]
+    ok = after[:len(expected)] == expected
+    # 1s bars inside the gap step with the candles instead of staying at 101
+    gap_ones = ones[60:60 + 60 * GAP_MIN]
+    ok = ok and min(gap_ones) >= 101.0 and gap_ones[-1] == 126.0 and len(set(gap_ones)) > 1
+    print("1s gap closes: first", gap_ones[:2], "last", gap_ones[-2:])
+    print("OK" if ok else "FAIL")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+"""
+Latency benchmark for the pre-trade risk checks.
+Usage (from the repo root):
+    python -m tools.bench_risk [iterations]
+Reports p50 / p99 / max (microseconds) for allow(), circuit_breaker_breached(),
+on_mark() and on_fill() against RISK_LATENCY_BUDGET_US.
+"""
+import random
+import sys
+import time
+from config.settings import LOT_SIZE, RISK_LATENCY_BUDGET_US
+from risk.risk_governor import RiskGovernor
+
+
+def _timeit(fn, n):
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(n):
+        t0 = clock()
+        fn()
+        samples.append(clock() - t0)
+    samples.sort()
+    return {
+        "p50_us": samples[n // 2] / 1000,
+        "p99_us": samples[int(n * 0.99)] / 1000,
+        "max_us": samples[-1] / 1000,
+    }
+
+
+def main(n=100000):
+    risk = RiskGovernor()
+    tokens = [str(40000 + i) for i in range(20)]
+    for i, token in enumerate(tokens):
+        risk.on_fill(token, "CE" if i % 2 else "PE", LOT_SIZE, 100.0 + i)
+    rnd = random.Random(1)
+    marks = [(rnd.choice(tokens), 100 + rnd.uniform(-5, 5)) for _ in range(n)]
+    it = iter(marks)
+
+    results = {
+        "allow": _timeit(lambda: risk.allow(side="CE", token=tokens[1], notional=6500.0), n),
+        "circuit_breaker_breached": _timeit(risk.circuit_breaker_breached, n),
+        "on_mark": _timeit(lambda: risk.on_mark(*next(it)), n),
+        "on_fill": _timeit(lambda: risk.on_fill(tokens[0], "PE", LOT_SIZE, 101.0), n // 10),
+    }
+    for name, r in results.items():
+        within = "ok" if name not in ("allow", "circuit_breaker_breached") or r["p99_us"] <= RISK_LATENCY_BUDGET_US else "OVER BUDGET"
+        print(f"{name:26s} p50={r['p50_us']:.2f}us p99={r['p99_us']:.2f}us max={r['max_us']:.1f}us {within}")
+    return results
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
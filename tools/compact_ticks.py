@@ -0,0 +1,19 @@
+"""
+End-of-day tick compaction (normally run by main.py after TICK_COMPACT_AT).
+Usage (from the repo root):
+    python -m tools.compact_ticks [YYYY-MM-DD ...]     default: today
+"""
+import sys
+import time
+from data.store.tick_store import compact_day
+
+
+def main(days):
+    for day in days or [time.strftime("%Y-%m-%d")]:
+        manifest = compact_day(day)
+        rows = sum(m["rows"] for m in manifest)
+        print(f"{day}: {len(manifest)} partitions, {rows} rows")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
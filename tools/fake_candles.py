@@ -0,0 +1,100 @@
+"""
+Local fake of the SmartAPI getCandleData REST endpoint for reconnect tests.
+Answers POST .../historical/v1/getCandleData in the broker's response shape
+([[ts, open, high, low, close, volume], ...], prices in rupees) from a SyntheticMarket:
+spot and VIX candles from its current levels, option candles from its premiums (any
+other token gets a flat 100.0). Each response is delayed by delay_sec to stand in for
+the gateway's rate limit (0.5 s ~ 2 calls/s).
+Point SmartConnect at it with SmartConnect(api_key=..., root=server.url).
+candle_sec sets the candle spacing (60 as the broker; shorter so a few-second test gap
+contains candle closes - set CandleBackfill.interval_sec to match).
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from zoneinfo import ZoneInfo
+from config.settings import SPOT_CANDLE_TOKEN, VIX_CANDLE_TOKEN
+from tools.synthetic_feed import SyntheticMarket
+
+IST = ZoneInfo("Asia/Kolkata")
+CANDLE_PATH = "/rest/secure/angelbroking/historical/v1/getCandleData"
+
+
+class FakeCandleServer:
+
+    def __init__(self, market=None, delay_sec=0.5, candle_sec=60, port=0):
+        self.market = market or SyntheticMarket()
+        self.delay_sec = delay_sec
+        self.candle_sec = candle_sec
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="fake-candles", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _price(self, token):
+        market = self.market
+        if token == SPOT_CANDLE_TOKEN:
+            return market.spot
+        if token == VIX_CANDLE_TOKEN:
+            return market.vix
+        i = market.index.get(token)
+        return float(market.premium[i]) if i is not None else 100.0
+
+    def candles(self, params):
+        """Candles opening in [fromdate, todate + 1 min) at candle_sec spacing."""
+        start = datetime.strptime(params["fromdate"], "%Y-%m-%d %H:%M").replace(tzinfo=IST).timestamp()
+        end = datetime.strptime(params["todate"], "%Y-%m-%d %H:%M").replace(tzinfo=IST).timestamp() + 60
+        with self._lock:
+            self.market.advance()
+            price = self._price(str(params["symboltoken"]))
+        rows = []
+        ts = start
+        while ts < min(end, time.time()):
+            stamp = datetime.fromtimestamp(ts, IST).isoformat()
+            rows.append([stamp, price, price, price, price, 0])
+            ts += self.candle_sec
+        return rows
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with server._lock:
+                    server.requests += 1
+                time.sleep(server.delay_sec)
+                if self.path != CANDLE_PATH:
+                    self._reply(404, {"status": False, "message": "Not found", "errorcode": "AB404", "data": None})
+                    return
+                try:
+                    data = server.candles(json.loads(body))
+                except (ValueError, KeyError) as e:
+                    self._reply(400, {"status": False, "message": str(e), "errorcode": "AB400", "data": None})
+                    return
+                self._reply(200, {"status": True, "message": "SUCCESS", "errorcode": "", "data": data})
+
+            def _reply(self, code, payload):
+                out = json.dumps(payload).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
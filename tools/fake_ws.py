@@ -0,0 +1,270 @@
+"""
+Local fake of the SmartAPI market feed (smart-stream) for load tests.
+A minimal RFC 6455 server: HTTP upgrade, masked client frames, text subscribe /
+unsubscribe requests in the SmartWebSocketV2 JSON shape, "ping" -> "pong" heartbeats and
+ping / close control frames. Subscribed tokens are streamed round-robin as binary ticks
+from a SyntheticMarket (tools/synthetic_feed.py) at `rate` ticks/s, paced in batches
+against the wall clock. Unsubscribed tokens are never sent.
+By default the server runs in a forked process, so tick generation does not compete
+with the pipeline under test for the GIL. rate can be changed while streaming; drop()
+closes the live session and refuses handshakes for a while (reconnect tests).
+Counters (shared with the parent): sent ticks, backlog (ticks due but not yet written,
+i.e. the server is blocked on a slow reader or cannot generate fast enough), time spent
+generating vs blocked in send.
+Usage (from the repo root):
+    python -m tools.fake_ws [--port 8766] [--rate 1000]    serve until Ctrl-C
+Point AngelWS at it with ws_factory=smart_ws_factory(server.url).
+"""
+import base64
+import hashlib
+import json
+import multiprocessing as mp
+import socket
+import struct
+import sys
+import threading
+import time
+from tools.synthetic_feed import SyntheticMarket
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+MAX_BATCH_SEC = 0.01  # at most this much of the rate per write
+IDLE_SLEEP_SEC = 0.0005
+
+
+def frame(payload, opcode=OP_BINARY):
+    """Unmasked server frame."""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack("!BB", 0x80 | opcode, n)
+    elif n < 65536:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, n)
+    return head + payload
+
+
+def read_frame(rfile):
+    """(opcode, payload) of the next client frame, or None at EOF."""
+    head = rfile.read(2)
+    if len(head) < 2:
+        return None
+    opcode = head[0] & 0x0F
+    n = head[1] & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", rfile.read(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", rfile.read(8))[0]
+    mask = rfile.read(4) if head[1] & 0x80 else None
+    data = rfile.read(n)
+    if mask:
+        data = bytes(b ^ mask[i & 3] for i, b in enumerate(data))
+    return opcode, data
+
+
+def smart_ws_factory(url):
+    """
+    SmartWebSocketV2 subclass connecting to url (AngelWS ws_factory). The library's own
+    retry-after-error is off, so reconnects are left to ReconnectSupervisor.
+    """
+    from SmartApi.smartWebSocketV2 import SmartWebSocketV2
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("max_retry_attempt", 0)
+        SmartWebSocketV2.__init__(self, *args, **kwargs)
+
+    return type("LocalSmartWebSocketV2", (SmartWebSocketV2,), {"ROOT_URI": url, "__init__": __init__})
+
+
+class FakeSmartStream:
+
+    def __init__(self, market=None, rate=1000, port=0):
+        self.market = market or SyntheticMarket()
+        self.rate = mp.Value("d", float(rate), lock=False)
+        self.sent = mp.Value("Q", 0, lock=False)
+        self.backlog = mp.Value("Q", 0, lock=False)
+        self.gen_sec = mp.Value("d", 0.0, lock=False)
+        self.send_sec = mp.Value("d", 0.0, lock=False)
+        self.connections = mp.Value("I", 0, lock=False)
+        self.down_until = mp.Value("d", 0.0, lock=False)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", port))
+        self.sock.listen(4)
+        self.port = self.sock.getsockname()[1]
+        self.url = f"ws://127.0.0.1:{self.port}/smart-stream"
+        self._proc = None
+        self._thread = None
+
+    def start(self, process=True):
+        if process:
+            self._proc = mp.get_context("fork").Process(target=self.serve_forever, name="fake-ws", daemon=True)
+            self._proc.start()
+        else:
+            self._thread = threading.Thread(target=self.serve_forever, name="fake-ws", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._proc is not None:
+            self._proc.terminate()
+            self._proc.join(timeout=2)
+        self.sock.close()
+
+    def set_rate(self, rate):
+        self.rate.value = float(rate)
+
+    def drop(self, down_sec=0.0):
+        """Close the current session (close frame) and refuse handshakes for down_sec."""
+        self.down_until.value = time.time() + down_sec
+
+    def stats(self):
+        return {
+            "rate": self.rate.value,
+            "sent": self.sent.value,
+            "backlog": self.backlog.value,
+            "gen_sec": round(self.gen_sec.value, 3),
+            "send_sec": round(self.send_sec.value, 3),
+            "connections": self.connections.value,
+        }
+
+    # ---------- Server ----------
+
+    def serve_forever(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                if time.time() < self.down_until.value:
+                    conn.sendall(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n\r\n")
+                else:
+                    self._session(conn)
+            except OSError:
+                pass
+            finally:
+                conn.close()
+
+    def _handshake(self, conn, rfile):
+        headers = {}
+        line = rfile.readline()
+        while True:
+            line = rfile.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key or not headers.get("authorization") or not headers.get("x-feed-token"):
+            conn.sendall(b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 0\r\n\r\n")
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        conn.sendall(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        return True
+
+    def _session(self, conn):
+        rfile = conn.makefile("rb")
+        if not self._handshake(conn, rfile):
+            return
+        self.connections.value += 1
+        session = {"subs": {}, "order": [], "closed": False, "lock": threading.Lock()}
+        threading.Thread(target=self._read_loop, args=(conn, rfile, session), name="fake-ws-read", daemon=True).start()
+        self._send_loop(conn, session)
+
+    def _send(self, conn, session, data):
+        with session["lock"]:
+            conn.sendall(data)
+
+    def _read_loop(self, conn, rfile, session):
+        try:
+            while True:
+                msg = read_frame(rfile)
+                if msg is None or msg[0] == OP_CLOSE:
+                    if msg is not None:
+                        self._send(conn, session, frame(b"", OP_CLOSE))
+                    break
+                opcode, data = msg
+                if opcode == OP_PING:
+                    self._send(conn, session, frame(data, OP_PONG))
+                elif opcode == OP_TEXT:
+                    self._on_text(conn, session, data.decode())
+        except OSError:
+            pass
+        session["closed"] = True
+
+    def _on_text(self, conn, session, text):
+        if text == "ping":
+            self._send(conn, session, frame(b"pong", OP_TEXT))
+            return
+        try:
+            request = json.loads(text)
+            mode = request["params"]["mode"]
+            token_list = request["params"]["tokenList"]
+        except (ValueError, KeyError, TypeError):
+            return
+        subs = dict(session["subs"])
+        for group in token_list:
+            for token in group.get("tokens", []):
+                if request.get("action") == 0:
+                    subs.pop(str(token), None)
+                else:
+                    subs[str(token)] = (mode, group.get("exchangeType"))
+        session["subs"] = subs
+        session["order"] = [(token, mode, exchange_type) for token, (mode, exchange_type) in subs.items()]
+
+    def _send_loop(self, conn, session):
+        market = self.market
+        rate = self.rate.value
+        t0 = time.time()
+        emitted = 0
+        k = 0
+        opened = time.time()
+        while not session["closed"]:
+            order = session["order"]
+            now = time.time()
+            if self.down_until.value > opened:
+                self._send(conn, session, frame(struct.pack("!H", 1001), OP_CLOSE))
+                return
+            if self.rate.value != rate or not order:
+                rate, t0, emitted = self.rate.value, now, 0
+                if not order:
+                    time.sleep(0.01)
+                    continue
+            due = int((now - t0) * rate) - emitted
+            self.backlog.value = max(due, 0)
+            if due <= 0:
+                time.sleep(IDLE_SLEEP_SEC)
+                continue
+            n = min(due, max(1, int(rate * MAX_BATCH_SEC)))
+            market.advance(now)
+            parts = []
+            for _ in range(n):
+                parts.append(frame(market.tick(*order[k % len(order)])))
+                k += 1
+            t1 = time.time()
+            self._send(conn, session, b"".join(parts))
+            t2 = time.time()
+            self.gen_sec.value += t1 - now
+            self.send_sec.value += t2 - t1
+            emitted += n
+            self.sent.value += n
+
+
+def main(argv):
+    port = int(argv[argv.index("--port") + 1]) if "--port" in argv else 8766
+    rate = float(argv[argv.index("--rate") + 1]) if "--rate" in argv else 1000
+    server = FakeSmartStream(rate=rate, port=port)
+    print(f"fake smart-stream on {server.url} at {rate:.0f} ticks/s")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
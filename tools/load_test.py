@@ -0,0 +1,201 @@
+"""
+Load test of the feed ingest path on synthetic data.
+fake smart-stream (tools/fake_ws.py, forked) -> SmartWebSocketV2 (websocket-client,
+binary parse) -> AngelWS.on_data -> MarketCache.on_message (option chain, depth, bars,
+feed health, tick listeners incl. RiskGovernor marks), with a strategy thread running
+GreekEngine.refresh() + lms_score() every STRATEGY_PASS_SEC as main.py does.
+The target rate is stepped up; per step it reports server sent/s, processed/s, queue
+growth/s (ticks due at the server + in flight, end minus start), tick latency
+(exchange timestamp -> processed; ms resolution, as the feed stamps) and the strategy
+pass time. A step saturates when processed/s < SATURATION_DELIVERY x target, the queue
+grows by more than SATURATION_QUEUE_SEC x target per second, or latency p99 exceeds
+SATURATION_P99_MS; the run stops at the first saturated step.
+Usage (from the repo root):
+    python -m tools.load_test [--rates 1000,2000,5000,10000,20000,50000,100000]
+                              [--step-sec 5] [--width 10] [--thread]
+--thread runs the server in this process (shares the GIL with the pipeline).
+Needs smartapi-python and websocket-client.
+"""
+import sys
+import threading
+import time
+import numpy as np
+from data.angel.angel_ws import AngelWS
+from data.angel.angel_subscribe import AngelSubscribe
+from data.cache.market_cache import MARKET
+from engines.metrics import lms_score
+from execution.greek_engine import GreekEngine
+from ops.event_log import LOG
+from risk.risk_governor import RiskGovernor
+from tools.fake_ws import FakeSmartStream, smart_ws_factory
+from tools.synthetic_feed import SyntheticMarket
+
+DEFAULT_RATES = (1000, 2000, 5000, 10000, 20000, 50000, 100000)
+WARMUP_SEC = 1.0
+STRATEGY_PASS_SEC = 1.0
+SATURATION_DELIVERY = 0.95
+SATURATION_QUEUE_SEC = 0.05  # queue growth per second, in seconds of target rate
+SATURATION_P99_MS = 100
+CONNECT_TIMEOUT_SEC = 10
+
+
+class Probe:
+    """Feed sink wrapper: counts processed ticks and samples latency after the cache update."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.processed = 0
+        self.latency_ms = []
+
+    def __call__(self, message):
+        self.sink(message)
+        self.processed += 1
+        ts = message.get("exchange_timestamp")
+        if ts:
+            self.latency_ms.append(time.time() * 1000 - ts)
+
+    def take_latencies(self):
+        samples, self.latency_ms = self.latency_ms, []
+        return np.array(samples)
+
+
+class StrategyLoad(threading.Thread):
+    """GreekEngine refresh + LMS over the chain every STRATEGY_PASS_SEC; records pass time."""
+
+    def __init__(self, greeks):
+        super().__init__(name="strategy-load", daemon=True)
+        self.greeks = greeks
+        self.pass_ms = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(STRATEGY_PASS_SEC):
+            t0 = time.perf_counter()
+            self.greeks.refresh()
+            lms_score()
+            self.pass_ms.append((time.perf_counter() - t0) * 1000)
+
+    def take(self):
+        samples, self.pass_ms = self.pass_ms, []
+        return samples
+
+
+def _pct(values, q):
+    return round(float(np.percentile(values, q)), 2) if len(values) else None
+
+
+def run_step(rate, step_sec, server, probe, strategy):
+    server.set_rate(rate)
+    time.sleep(WARMUP_SEC)
+    probe.take_latencies()
+    strategy.take()
+    s0, p0, t0 = server.stats(), probe.processed, time.time()
+    time.sleep(step_sec)
+    s1, p1, t1 = server.stats(), probe.processed, time.time()
+    elapsed = t1 - t0
+    queue0 = s0["backlog"] + s0["sent"] - p0
+    queue1 = s1["backlog"] + s1["sent"] - p1
+    lat = probe.take_latencies()
+    passes = strategy.take()
+    row = {
+        "target": rate,
+        "sent_per_sec": round((s1["sent"] - s0["sent"]) / elapsed),
+        "processed_per_sec": round((p1 - p0) / elapsed),
+        "queue": queue1,
+        "queue_growth_per_sec": round((queue1 - queue0) / elapsed),
+        "latency_p50_ms": _pct(lat, 50),
+        "latency_p99_ms": _pct(lat, 99),
+        "latency_max_ms": round(float(lat.max()), 1) if lat.size else None,
+        "strategy_pass_p99_ms": _pct(passes, 99),
+        "server_send_blocked_sec": round(s1["send_sec"] - s0["send_sec"], 2),
+        "server_generate_sec": round(s1["gen_sec"] - s0["gen_sec"], 2),
+    }
+    reasons = []
+    if row["processed_per_sec"] < SATURATION_DELIVERY * rate:
+        reasons.append("throughput")
+    if row["queue_growth_per_sec"] > SATURATION_QUEUE_SEC * rate:
+        reasons.append("queue")
+    if row["latency_p99_ms"] is not None and row["latency_p99_ms"] > SATURATION_P99_MS:
+        reasons.append("latency")
+    row["saturated"] = ",".join(reasons) or None
+    if reasons and row["server_generate_sec"] > 0.9 * elapsed:
+        row["note"] = "generator-bound (server could not produce the rate)"
+    return row
+
+
+def iv_check(market, greeks):
+    """Median |IV from the cache premiums - generator IV surface| in vol points."""
+    if not MARKET.spot or not MARKET.vix or not np.isfinite(greeks.iv).any():
+        return None
+    market.spot, market.vix = MARKET.spot, MARKET.vix
+    err = np.abs(greeks.iv - market.iv()) * 100
+    return round(float(np.nanmedian(err)), 3)
+
+
+def main(argv):
+    rates = DEFAULT_RATES
+    if "--rates" in argv:
+        rates = [int(r) for r in argv[argv.index("--rates") + 1].split(",")]
+    step_sec = float(argv[argv.index("--step-sec") + 1]) if "--step-sec" in argv else 5.0
+    width = int(argv[argv.index("--width") + 1]) if "--width" in argv else None
+    market = SyntheticMarket() if width is None else SyntheticMarket(width=width)
+    chain = market.chain()
+    server = FakeSmartStream(market, rate=rates[0]).start(process="--thread" not in argv)
+
+    MARKET.register_contracts(chain)
+    greeks = GreekEngine()
+    greeks.set_contracts(chain)
+    risk = RiskGovernor()
+    risk.on_fill(chain[len(chain) // 2]["token"], chain[len(chain) // 2]["side"], market.lot_size, 100.0)
+    MARKET.add_tick_listener(None, risk.on_tick)
+
+    probe = Probe(MARKET.on_message)
+    ws = AngelWS("jwt", "api-key", "client", "feed", ws_factory=smart_ws_factory(server.url), sink=probe)
+    threading.Thread(target=ws.connect, name="ws", daemon=True).start()
+    deadline = time.time() + CONNECT_TIMEOUT_SEC
+    while not ws.is_connected and time.time() < deadline:
+        time.sleep(0.05)
+    if not ws.is_connected:
+        print("could not connect to the fake server")
+        server.stop()
+        return 1
+    subscriber = AngelSubscribe(ws)
+    subscriber.core()
+    subscriber.depth([c["token"] for c in chain], correlation_id="chain")
+    strategy = StrategyLoad(greeks)
+    strategy.start()
+
+    print(f"{len(chain) + 2} tokens, {step_sec:.0f}s per step, server {'thread' if '--thread' in argv else 'process'}")
+    print(f"{'target':>8} {'sent/s':>8} {'proc/s':>8} {'queue+/s':>9} {'p50ms':>7} {'p99ms':>7} {'maxms':>7} {'strat99':>7}  saturated")
+    results = []
+    for rate in rates:
+        row = run_step(rate, step_sec, server, probe, strategy)
+        results.append(row)
+        print(
+            f"{row['target']:>8} {row['sent_per_sec']:>8} {row['processed_per_sec']:>8} {row['queue_growth_per_sec']:>9} "
+            f"{row['latency_p50_ms']!s:>7} {row['latency_p99_ms']!s:>7} {row['latency_max_ms']!s:>7} "
+            f"{row['strategy_pass_p99_ms']!s:>7}  {row['saturated'] or '-'} {row.get('note', '')}"
+        )
+        if row["saturated"]:
+            break
+
+    ok = [r for r in results if not r["saturated"]]
+    bad = [r for r in results if r["saturated"]]
+    summary = {
+        "sustained_per_sec": max((r["processed_per_sec"] for r in ok), default=0),
+        "saturates_at": bad[0]["target"] if bad else None,
+        "saturation_p99_ms": bad[0]["latency_p99_ms"] if bad else None,
+        "iv_median_err_vol_pts": iv_check(market, greeks),
+        "risk_equity": risk.snapshot()["equity"],
+    }
+    print(summary)
+    LOG.info("load_test", **summary)
+    strategy.stopped.set()
+    ws.disconnect()
+    server.stop()
+    LOG.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,200 @@
+"""
+Local mock of the Angel One SmartAPI REST endpoints with per-endpoint rate limits.
+Requests over a route's per-second limit get HTTP 403 "Access denied because of
+exceeding access rate", as the broker answers. Every route returns canned success
+payloads after MOCK_LATENCY_MS, so the gateway (data/angel/api_gateway.py) can be
+checked without a broker session.
+Usage (from the repo root):
+    python -m tools.mock_broker [--port 8765]        serve until Ctrl-C
+    python -m tools.mock_broker --check [--port 0]   burst of orders + lookups + candles,
+                                                     direct vs through ApiGateway
+The check needs smartapi-python (SmartConnect pointed at the mock with root=...).
+"""
+import json
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MOCK_LATENCY_MS = 20
+RATE_LIMITED_BODY = b"Access denied because of exceeding access rate"
+
+# Last path segment of the SmartAPI route -> per-second limit
+ROUTE_LIMITS = {
+    "placeOrder": 20,
+    "modifyOrder": 20,
+    "cancelOrder": 20,
+    "getOrderBook": 1,
+    "getTradeBook": 1,
+    "getRMS": 2,
+    "getPosition": 1,
+    "getLtpData": 10,
+    "getCandleData": 3,
+    "searchScrip": 1,
+    "loginByPassword": 1,
+}
+
+
+def _payload(route, body):
+    if route == "placeOrder":
+        return {"orderid": f"MOCK{int(time.time() * 1e6)}", "script": body.get("tradingsymbol")}
+    if route == "searchScrip":
+        return [{"exchange": body.get("exchange"), "tradingsymbol": body.get("searchscrip"), "symboltoken": "99999"}]
+    if route == "getCandleData":
+        return [["2026-01-01T09:15:00+05:30", 100.0, 101.0, 99.0, 100.5, 1000]]
+    if route == "loginByPassword":
+        return {"jwtToken": "mock-jwt", "refreshToken": "mock-refresh", "feedToken": "mock-feed"}
+    if route in ("getOrderBook", "getTradeBook", "getPosition"):
+        return []
+    return {}
+
+
+class MockBroker:
+
+    def __init__(self, port=0, latency_ms=MOCK_LATENCY_MS, limits=ROUTE_LIMITS):
+        self.latency_ms = latency_ms
+        self.limits = limits
+        self.counts = {}  # route -> {"ok": n, "rejected": n}
+        self._hits = {}  # route -> deque of accept times (sliding 1 s window)
+        self._lock = threading.Lock()
+        broker = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                broker._handle(self)
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mock-broker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def admit(self, route, now):
+        """Sliding-window limit check for one request."""
+        limit = self.limits.get(route)
+        with self._lock:
+            count = self.counts.setdefault(route, {"ok": 0, "rejected": 0})
+            if limit is not None:
+                hits = self._hits.setdefault(route, deque())
+                while hits and now - hits[0] >= 1.0:
+                    hits.popleft()
+                if len(hits) >= limit:
+                    count["rejected"] += 1
+                    return False
+                hits.append(now)
+            count["ok"] += 1
+            return True
+
+    def _handle(self, req):
+        route = req.path.rstrip("/").rsplit("/", 1)[-1]
+        length = int(req.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(req.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+        if not self.admit(route, time.monotonic()):
+            req.send_response(403)
+            req.send_header("Content-Type", "text/plain")
+            req.end_headers()
+            req.wfile.write(RATE_LIMITED_BODY)
+            return
+        time.sleep(self.latency_ms / 1000)
+        out = json.dumps({"status": True, "message": "SUCCESS", "errorcode": "", "data": _payload(route, body)}).encode()
+        req.send_response(200)
+        req.send_header("Content-Type", "application/json")
+        req.send_header("Content-Length", str(len(out)))
+        req.end_headers()
+        req.wfile.write(out)
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+            self._hits = {}
+
+
+def burst(api, orders=30, searches=10, candles=10):
+    """Fire orders, lookups and candle requests at once from threads. Returns order latencies."""
+    order_params = {
+        "variety": "NORMAL", "tradingsymbol": "NIFTY-MOCK", "symboltoken": "99999",
+        "transactiontype": "BUY", "exchange": "NFO", "ordertype": "MARKET",
+        "producttype": "INTRADAY", "duration": "DAY", "quantity": 65,
+    }
+    latencies = []
+    errors = []
+
+    def run(fn, timed=False):
+        t0 = time.monotonic()
+        try:
+            fn()
+        except Exception as e:
+            errors.append(str(e)[:80])
+            return
+        if timed:
+            latencies.append(time.monotonic() - t0)
+
+    jobs = [lambda i=i: api.searchScrip("NFO", f"NIFTY{i}") for i in range(searches)]
+    jobs += [lambda: api.getCandleData({"exchange": "NSE", "symboltoken": "99926000", "interval": "ONE_MINUTE",
+                                        "fromdate": "2026-01-01 09:15", "todate": "2026-01-01 15:30"})
+             for _ in range(candles)]
+    threads = [threading.Thread(target=run, args=(job,)) for job in jobs]
+    threads += [threading.Thread(target=run, args=(lambda: api.placeOrder(order_params), True)) for _ in range(orders)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def check(port=0):
+    from SmartApi import SmartConnect
+    from data.angel.api_gateway import ApiGateway
+
+    broker = MockBroker(port).start()
+    raw = SmartConnect(api_key="mock", root=broker.url)
+    for name, api in (("direct", raw), ("gateway", ApiGateway(raw))):
+        broker.reset()
+        time.sleep(1.1)  # empty the mock's windows
+        latencies, errors = burst(api)
+        rejected = {r: c["rejected"] for r, c in broker.counts.items() if c["rejected"]}
+        lat = sorted(latencies)
+        print(
+            f"{name:8s} orders_ok={len(lat)} errors={len(errors)} rejected={rejected or 0}"
+            + (f" order_p50_ms={lat[len(lat) // 2] * 1000:.0f} order_max_ms={lat[-1] * 1000:.0f}" if lat else "")
+        )
+        if name == "gateway":
+            print(json.dumps(api.stats(), indent=1))
+            api.close()
+    broker.stop()
+
+
+def main(argv):
+    port = int(argv[argv.index("--port") + 1]) if "--port" in argv else (0 if "--check" in argv else 8765)
+    if "--check" in argv:
+        check(port)
+        return
+    broker = MockBroker(port).start()
+    print(f"mock broker on {broker.url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        broker.stop()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,116 @@
+"""
+Reconnect test of ReconnectSupervisor against local fakes.
+fake smart-stream (tools/fake_ws.py, forked) -> SmartWebSocketV2 -> AngelWS ->
+MarketCache, with the supervisor's CandleBackfill pointed at a fake getCandleData server
+(tools/fake_candles.py, delay per call ~ the gateway's rate limit). The server drops the
+session OUTAGES times (refusing handshakes for --down-sec); per outage it reports
+recovery time, gap, backfill time and points merged, how many ticks were processed
+while the backfill was running (0 means the feed thread was blocked), and whether the
+backfilled option history stayed in feed units (no ~100x step against live ticks).
+Usage (from the repo root):
+    python -m tools.reconnect_test [--outages 3] [--down-sec 3] [--delay-sec 0.5] [--rate 1000]
+Needs smartapi-python and websocket-client.
+"""
+import sys
+import threading
+import time
+from SmartApi.smartConnect import SmartConnect
+from data.angel.angel_ws import AngelWS
+from data.angel.angel_subscribe import AngelSubscribe
+from data.angel.candle_backfill import CandleBackfill
+from data.angel.ws_supervisor import ReconnectSupervisor
+from data.cache.market_cache import MARKET
+from ops.event_log import LOG
+from tools.fake_candles import FakeCandleServer
+from tools.fake_ws import FakeSmartStream, smart_ws_factory
+from tools.synthetic_feed import SyntheticMarket
+
+CANDLE_SEC = 1  # test candles close every second so a few-second gap has points
+SETTLE_SEC = 2.0
+RECOVERY_TIMEOUT_SEC = 120
+
+
+class TickTimes:
+    """Feed sink wrapper: wall-clock time of every processed tick."""
+
+    def __init__(self, sink):
+        self.sink = sink
+        self.times = []
+
+    def __call__(self, message):
+        self.sink(message)
+        self.times.append(time.time())
+
+    def between(self, t0, t1):
+        return sum(1 for t in self.times if t0 <= t <= t1)
+
+
+def units_ok(token, window_sec=300):
+    """Backfilled and live LTPs of one option within 10x of each other."""
+    values = [ltp for _, ltp in MARKET.get_option_ltp_history(token, window_sec) if ltp]
+    return bool(values) and max(values) / min(values) < 10
+
+
+def main(argv):
+    outages = int(argv[argv.index("--outages") + 1]) if "--outages" in argv else 3
+    down_sec = float(argv[argv.index("--down-sec") + 1]) if "--down-sec" in argv else 3.0
+    delay_sec = float(argv[argv.index("--delay-sec") + 1]) if "--delay-sec" in argv else 0.5
+    rate = float(argv[argv.index("--rate") + 1]) if "--rate" in argv else 1000
+    market = SyntheticMarket(width=3)
+    chain = market.chain()
+    server = FakeSmartStream(market, rate=rate).start()
+    candles = FakeCandleServer(SyntheticMarket(width=3), delay_sec=delay_sec, candle_sec=CANDLE_SEC).start()
+
+    MARKET.register_contracts(chain)
+    backfill = CandleBackfill(SmartConnect(api_key="api-key", root=candles.url))
+    backfill.interval_sec = CANDLE_SEC
+    probe = TickTimes(MARKET.on_message)
+    ws = AngelWS("jwt", "api-key", "client", "feed", ws_factory=smart_ws_factory(server.url), sink=probe)
+    supervisor = ReconnectSupervisor(ws, backfill=backfill, base_delay=0.5, max_delay=2)
+    threading.Thread(target=supervisor.run, name="ws", daemon=True).start()
+    while not ws.is_connected:
+        time.sleep(0.05)
+    subscriber = AngelSubscribe(ws)
+    subscriber.core()
+    subscriber.depth([c["token"] for c in chain], correlation_id="chain")
+
+    results = []
+    for _ in range(outages):
+        time.sleep(SETTLE_SEC)
+        done = supervisor.recoveries
+        server.drop(down_sec)
+        deadline = time.time() + RECOVERY_TIMEOUT_SEC
+        while supervisor.recoveries == done and time.time() < deadline:
+            time.sleep(0.05)
+        report = supervisor.last_report if supervisor.recoveries > done else None
+        if report is None:
+            print("no recovery within", RECOVERY_TIMEOUT_SEC, "s")
+            break
+        row = {
+            "recovery_sec": round(report["recovery_sec"], 2),
+            "gap_sec": round(report["gap_sec"], 2),
+            "backfill_sec": round(report["backfill_sec"], 2),
+            "backfilled": report["backfilled"],
+            "ticks_during_backfill": probe.between(report["gap_end"], report["gap_end"] + report["backfill_sec"]),
+            "option_units_ok": units_ok(chain[0]["token"]),
+        }
+        results.append(row)
+        print(row)
+
+    summary = {
+        "outages": len(results),
+        "candle_requests": candles.requests,
+        "feed_blocked": any(r["ticks_during_backfill"] == 0 for r in results),
+        "units_ok": all(r["option_units_ok"] for r in results),
+    }
+    print(summary)
+    LOG.info("reconnect_test", **summary)
+    supervisor.stop()
+    server.stop()
+    candles.stop()
+    LOG.close()
+    return 0 if results and not summary["feed_blocked"] and summary["units_ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,110 @@
+"""
+Replay a decision journal (ops/decision_journal.py) through the current code and diff.
+Usage (from the repo root):
+    python -m tools.replay_journal [YYYY-MM-DD | path/to/decisions.jsonl ...] [--show N]
+Default: today's journal. For every pass the metrics layer is recomputed from the
+journaled inputs (leading / lagging / combined score, VIX regime); every decision the
+loop acted on is recomputed from the MarketContext of the request that produced it.
+Timeout / fallback decisions are counted but not replayed (they depend on timing, not
+inputs). Exit status 1 if anything differs.
+"""
+import math
+import os
+import sys
+import time
+from engines.contextual_risk import vix_regime
+from engines.decision_service import RuleBasedProvider
+from engines.metrics import leading_score, lagging_score, combined_score
+from ops.decision_journal import journal_path, read_journal
+
+DECISION_FIELDS = ("action", "confidence", "reasoning")
+REPLAYED_SOURCES = ("provider", "cache")
+
+
+def _same(a, b):
+    if isinstance(a, float) and isinstance(b, float) and math.isnan(a) and math.isnan(b):
+        return True
+    return a == b
+
+
+def replay_inputs(inputs):
+    """Metrics-layer values recomputed from one pass's raw inputs."""
+    lead = leading_score(
+        inputs["vix_mom"],
+        inputs["participation"],
+        inputs["volume_impulse"],
+        inputs["ivs"],
+        inputs["lms"],
+        inputs["bull"],
+    )
+    lag = lagging_score(inputs["rsi"], inputs["ma_bull"], min(11, inputs["hv"]))
+    out = {"lead": lead, "lag": lag, "combined_score": combined_score(lead, lag, inputs["pdr"])}
+    if "vix_regime" in inputs:
+        out["vix_regime"] = vix_regime(inputs["vix"])
+    return out
+
+
+def replay(entries):
+    """Diff journaled values against a replay. Returns (stats, diffs)."""
+    provider = RuleBasedProvider()
+    stats = {"passes": len(entries), "decisions": 0, "replayed": 0, "skipped": 0, "diffs": 0}
+    diffs = []
+    requests = {}  # request seq -> MarketContext
+    for entry in entries:
+        request = entry.get("request")
+        if request:
+            requests[request["seq"]] = request["ctx"]
+        inputs = entry.get("inputs")
+        if inputs:
+            for field, value in replay_inputs(inputs).items():
+                if not _same(inputs.get(field), value):
+                    diffs.append({"pass": entry.get("seq"), "field": field, "live": inputs.get(field), "replay": value})
+        decision = entry.get("decision")
+        if not decision:
+            continue
+        stats["decisions"] += 1
+        ctx = requests.get(decision.get("seq"))
+        if ctx is None or decision.get("source") not in REPLAYED_SOURCES:
+            stats["skipped"] += 1
+            continue
+        stats["replayed"] += 1
+        again = provider(ctx)
+        for field in DECISION_FIELDS:
+            if not _same(decision.get(field), again.get(field)):
+                diffs.append({
+                    "pass": entry.get("seq"),
+                    "field": f"decision.{field}",
+                    "source": decision.get("source"),
+                    "live": decision.get(field),
+                    "replay": again.get(field),
+                })
+    stats["diffs"] = len(diffs)
+    return stats, diffs
+
+
+def _paths(args):
+    if not args:
+        args = [time.strftime("%Y-%m-%d")]
+    return [a if os.path.isfile(a) else journal_path(a) for a in args]
+
+
+def main(argv):
+    show = 20
+    if "--show" in argv:
+        i = argv.index("--show")
+        show = int(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    failed = False
+    for path in _paths(argv):
+        stats, diffs = replay(read_journal(path))
+        print(f"{path}: " + " ".join(f"{k}={v}" for k, v in stats.items()))
+        for d in diffs[:show]:
+            print("  " + " ".join(f"{k}={v}" for k, v in d.items()))
+        if len(diffs) > show:
+            print(f"  ... {len(diffs) - show} more")
+        failed = failed or bool(diffs)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
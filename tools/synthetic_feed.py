@@ -0,0 +1,171 @@
+"""
+Synthetic market for feed load tests (tools/fake_ws.py, tools/load_test.py).
+- Spot: geometric Brownian motion with volatility = VIX / 100.
+- VIX: mean-reverting (Ornstein-Uhlenbeck) around its starting level.
+- Option chain: ATM +- width strikes, CE and PE, one expiry, priced with Black-Scholes
+  (execution/greek_engine.bs_price) off a smile IV surface around the VIX level, so
+  premiums, put-call parity and implied vols stay consistent with spot.
+- 5-level depth around each option LTP; other subscribed tokens (stocks, futures) get
+  their own random walk.
+encode() packs SmartWebSocketV2 binary packets byte for byte (LTP 51 B, QUOTE 123 B,
+SNAP_QUOTE 379 B, little endian, prices in paise), so the client library's own parser
+decodes them.
+"""
+import struct
+import time
+import numpy as np
+from config.settings import LOT_SIZE, STRIKE_STEP, CHAIN_STRIKES_EACH_SIDE, OPTION_EXPIRY_DDMMMYY
+from data.cache.market_cache import SPOT_TOKEN, VIX_TOKEN
+from execution.greek_engine import bs_price, expiry_timestamp, SECONDS_PER_YEAR
+from execution.option_symbol import next_thursday_ddmmyy
+
+MODE_LTP, MODE_QUOTE, MODE_SNAP_QUOTE = 1, 2, 3
+NSE_CM, NSE_FO = 1, 2
+PRICE_TICK = 5  # paise (0.05)
+FIRST_OPTION_TOKEN = 70000
+IV_SKEW = -0.8  # IV change per unit log-moneyness (puts richer)
+IV_SMILE = 2.5  # curvature
+VIX_REVERSION = 0.5  # per day
+VIX_VOL = 0.6  # annualized vol of VIX
+MIN_TTE_SEC = 3600
+
+_HEAD = struct.Struct("<BB25sqqq")  # mode, exchange type, token, sequence, exchange ts (ms), LTP
+_QUOTE = struct.Struct("<qqqddqqqq")  # LTQ, ATP, volume, total buy/sell qty, OHLC (close = previous close)
+_SNAP = struct.Struct("<qqq")  # last traded ts, OI, OI change %
+_LEVEL = struct.Struct("<HqqH")  # flag (1 buy, 0 sell), qty, price, orders
+_LIMITS = struct.Struct("<qqqq")  # upper/lower circuit, 52-week high/low
+_EMPTY_LEVELS = b"\x00" * (_LEVEL.size * 10)
+
+
+def encode(mode, exchange_type, token, seq, ts_ms, ltp, quote=None, snap=None, bids=None, asks=None):
+    """
+    One SmartWebSocketV2 binary packet. Prices in paise.
+    quote: (ltq, atp, volume, total_buy, total_sell, open, high, low, close) for QUOTE / SNAP_QUOTE.
+    snap: (last_traded_ts, oi, oi_change_pct, upper, lower, high_52w, low_52w) for SNAP_QUOTE.
+    bids / asks: 5 (price, qty, orders) levels each for SNAP_QUOTE.
+    """
+    out = _HEAD.pack(mode, exchange_type, token.encode(), seq, ts_ms, ltp)
+    if mode == MODE_LTP:
+        return out
+    out += _QUOTE.pack(*quote)
+    if mode == MODE_QUOTE:
+        return out
+    levels = b"".join(_LEVEL.pack(1, q, p, o) for p, q, o in bids) + b"".join(_LEVEL.pack(0, q, p, o) for p, q, o in asks)
+    return out + _SNAP.pack(*snap[:3]) + (levels or _EMPTY_LEVELS) + _LIMITS.pack(*snap[3:])
+
+
+class SyntheticMarket:
+
+    def __init__(self, spot=24000.0, vix=14.0, expiry=OPTION_EXPIRY_DDMMMYY, width=CHAIN_STRIKES_EACH_SIDE,
+                 step=STRIKE_STEP, lot_size=LOT_SIZE, seed=1, clock=time.time):
+        self.clock = clock
+        self.rng = np.random.default_rng(seed)
+        self.spot = float(spot)
+        self.vix = float(vix)
+        self.vix_mean = float(vix)
+        self.expiry = expiry or next_thursday_ddmmyy()
+        self.expiry_ts = expiry_timestamp(self.expiry)
+        self.lot_size = lot_size
+        self.prev_close = {SPOT_TOKEN: self.spot, VIX_TOKEN: self.vix}
+        atm = round(spot / step) * step
+        strikes = np.arange(atm - width * step, atm + (width + 1) * step, step, dtype=np.float64)
+        self.strikes = np.repeat(strikes, 2)
+        self.is_call = np.tile([True, False], len(strikes))
+        self.tokens = [str(FIRST_OPTION_TOKEN + i) for i in range(len(self.strikes))]
+        self.index = {token: i for i, token in enumerate(self.tokens)}
+        self.premium = np.zeros(len(self.tokens))
+        self.volume = np.zeros(len(self.tokens), dtype=np.int64)
+        self.oi = self.rng.integers(50, 500, len(self.tokens)) * lot_size
+        self.others = {}  # token -> [price, prev close, volume]
+        self.seq = 0
+        self.ts = clock()
+        self._price_options()
+        self.open = self.premium.copy()
+        self.high = self.premium.copy()
+        self.low = self.premium.copy()
+
+    def chain(self, index="NIFTY"):
+        """Contracts as execution.option_symbol.get_option_chain returns them."""
+        return [
+            {
+                "token": token,
+                "symbol": f"{index}{self.expiry}{int(self.strikes[i])}{'CE' if self.is_call[i] else 'PE'}",
+                "strike": float(self.strikes[i]),
+                "side": "CE" if self.is_call[i] else "PE",
+                "expiry": self.expiry,
+            }
+            for i, token in enumerate(self.tokens)
+        ]
+
+    def iv(self):
+        m = np.log(self.strikes / self.spot)
+        return np.maximum(self.vix / 100 * (1 + IV_SKEW * m + IV_SMILE * m * m), 0.02)
+
+    def _price_options(self):
+        tte = max(self.expiry_ts - self.ts, MIN_TTE_SEC) / SECONDS_PER_YEAR
+        price = bs_price(self.spot, self.strikes, tte, self.iv(), self.is_call)
+        self.premium = np.maximum(np.round(price * 100 / PRICE_TICK) * PRICE_TICK, PRICE_TICK) / 100
+
+    def advance(self, now=None):
+        """Move spot, VIX, other instruments and the chain forward to now (wall clock)."""
+        now = self.clock() if now is None else now
+        dt = max(now - self.ts, 0.0) / SECONDS_PER_YEAR
+        self.ts = now
+        if dt <= 0:
+            return
+        z = self.rng.standard_normal(2)
+        sigma = self.vix / 100
+        self.spot *= np.exp(-0.5 * sigma * sigma * dt + sigma * np.sqrt(dt) * z[0])
+        self.vix += VIX_REVERSION * 365 * (self.vix_mean - self.vix) * dt + VIX_VOL * self.vix * np.sqrt(dt) * z[1]
+        self.vix = max(self.vix, 5.0)
+        for other in self.others.values():
+            other[0] *= np.exp(sigma * np.sqrt(dt) * self.rng.standard_normal())
+        self._price_options()
+        np.maximum(self.high, self.premium, out=self.high)
+        np.minimum(self.low, self.premium, out=self.low)
+
+    def tick(self, token, mode, exchange_type):
+        """Packet for token at the current state."""
+        self.seq += 1
+        ts_ms = int(self.ts * 1000)
+        i = self.index.get(token)
+        if i is not None:
+            return self._option(i, token, mode, exchange_type, ts_ms)
+        if token == SPOT_TOKEN:
+            price, prev = self.spot, self.prev_close[SPOT_TOKEN]
+            volume = 0
+        elif token == VIX_TOKEN:
+            price, prev = self.vix, self.prev_close[VIX_TOKEN]
+            volume = 0
+        else:
+            other = self.others.get(token)
+            if other is None:
+                start = float(self.rng.uniform(200, 4000))
+                other = self.others[token] = [start, start * (1 + self.rng.normal(0, 0.01)), 0]
+            other[2] += int(self.rng.integers(1, 50))
+            price, prev, volume = other
+        ltp = int(round(price * 100))
+        if mode == MODE_LTP:
+            return encode(mode, exchange_type, token, self.seq, ts_ms, ltp)
+        prev = int(round(prev * 100))
+        quote = (1, ltp, volume, 0.0, 0.0, prev, max(ltp, prev), min(ltp, prev), prev)
+        snap = (ts_ms // 1000, 0, 0, int(prev * 1.2), int(prev * 0.8), int(prev * 1.3), int(prev * 0.7))
+        return encode(mode, exchange_type, token, self.seq, ts_ms, ltp, quote, snap, [], [])
+
+    def _option(self, i, token, mode, exchange_type, ts_ms):
+        ltp = int(round(self.premium[i] * 100))
+        if mode == MODE_LTP:
+            return encode(mode, exchange_type, token, self.seq, ts_ms, ltp)
+        lots = int(self.rng.integers(1, 20))
+        self.volume[i] += lots * self.lot_size
+        spread = PRICE_TICK * (1 + int(ltp > 10000))
+        bids = [(max(ltp - spread * (k + 1), PRICE_TICK), self.lot_size * (5 + 3 * k), 2 + k) for k in range(5)]
+        asks = [(ltp + spread * (k + 1), self.lot_size * (5 + 3 * k), 2 + k) for k in range(5)]
+        open_, high, low = (int(round(x * 100)) for x in (self.open[i], self.high[i], self.low[i]))
+        quote = (
+            lots * self.lot_size, ltp, int(self.volume[i]),
+            float(sum(q for _, q, _ in bids)), float(sum(q for _, q, _ in asks)),
+            open_, high, low, open_,
+        )
+        snap = (ts_ms // 1000, int(self.oi[i]), 0, ltp * 3, PRICE_TICK, high * 2, PRICE_TICK)
+        return encode(mode, exchange_type, token, self.seq, ts_ms, ltp, quote, snap, bids, asks)